@@ -16,10 +16,19 @@
 # limitations under the License.
 #
 
-from ._core.driver.drivers import RemoteTestRunner
-from ._core.driver.drivers import RemoteDexRunner
-
 __all__ = [
     "RemoteTestRunner",
     "RemoteDexRunner"
 ]
+
+
+def __getattr__(name):
+    # the drivers are imported on first access, so that loading the device
+    # manager or another plugin of the extension does not import them
+    if name not in __all__:
+        raise AttributeError("module {} has no attribute {}".format(
+            __name__, name))
+    from ._core.driver import drivers
+    value = getattr(drivers, name)
+    globals()[name] = value
+    return value
@@ -31,13 +31,14 @@ from xdevice import ExecuteTerminate
 from xdevice import IDriver
 from xdevice import platform_logger
 from xdevice import Plugin
-from xdevice import get_plugin
+from xdevice import create_plugin
 from xdevice import JsonParser
 from xdevice import ShellHandler
 from xdevice import TestDescription
 from xdevice import ResourceManager
 from xdevice import get_device_log_file
 from xdevice import check_result_report
+from xdevice import is_result_passed
 from xdevice import get_kit_instances
 from xdevice import get_config_value
 from xdevice import do_module_kit_setup
@@ -56,6 +57,8 @@ from xdevice_extension._core.testkit.kit import junit_para_parse
 from xdevice_extension._core.testkit.kit import reset_junit_para
 from xdevice_extension._core.utils import get_filename_extension
 from xdevice_extension._core.utils import start_standing_subprocess
+from xdevice_extension._core.utils import read_standing_subprocess
+from xdevice_extension._core.utils import LogFileFollower
 from xdevice_extension._core.executor.listener import CollectingTestListener
 from xdevice_extension._core.testkit.kit import gtest_para_parse
 from xdevice_extension._core.environment.dmlib import process_command_ret
@@ -69,8 +72,19 @@ DEFAULT_TEST_PATH = "/%s/%s/" % ("data", "test")
 ON_DEVICE_TEST_DIR_LOCATION = "/%s/%s/%s/" % ("data", "local", "tmp")
 
 FAILED_RUN_TEST_ATTEMPTS = 3
+# keep the rerun command line within the shell limit of the device
+GTEST_FILTER_MAX_LENGTH = 4096
 TIME_OUT = 900 * 1000
 
+JSUNIT_LOG_WAIT_TIME = 1
+JSAPP_PATTERN = re.compile(rb"jsapp:", re.IGNORECASE)
+LOG_PID_PATTERN = re.compile(
+    rb"^\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d{3}\s+(\d+)")
+SUITES_START_MARK = b"[start] start run suites"
+SUITES_END_MARK = b"[end] run suites end"
+SUITE_START_MARK = b"[suite start]"
+SUITE_END_MARK = b"[suite end]"
+
 
 @dataclass
 class ZunitConst(object):
@@ -346,7 +360,8 @@ class CppTestDriver(IDriver):
             self._run_cpp_test(config_file, listeners=request.listeners,
                                request=request)
             with os.fdopen(hilog_open, "a") as hilog_file_pipe:
-                self.config.device.start_catch_device_log(hilog_file_pipe)
+                self.config.device.start_catch_device_log(hilog_file_pipe,
+                                                          ring_buffer=True)
                 time.sleep(30)
                 hilog_file_pipe.flush()
 
@@ -358,7 +373,8 @@ class CppTestDriver(IDriver):
             raise exception
 
         finally:
-            self.config.device.stop_catch_device_log()
+            self.config.device.stop_catch_device_log(
+                passed=is_result_passed(self.result, self.error_message))
             self.result = check_result_report(
                 request.config.report_path, self.result, self.error_message)
 
@@ -443,19 +459,63 @@ class CppTestDriver(IDriver):
                 self._rerun_serially(expected_tests, listener)
 
     def _rerun_all(self, expected_tests, listener):
-        tests = []
-        for test in expected_tests:
-            tests.append("%s.%s" % (test.class_name, test.test_name))
-        self.runner.add_instrumentation_arg("gtest_filter", ":".join(tests))
-        LOG.debug("ready to rerun file, expect run: %s" % len(expected_tests))
-        test_run = self._run_tests(listener)
-        LOG.debug("rerun file, has run: %s" % len(test_run))
-        if len(test_run) < len(expected_tests):
+        """
+        Reruns the remaining tests in gtest_filter batches, a crashed batch
+        resumes after its last started test and is bisected only when none
+        of its tests starts. The batch size is kept after a test is isolated
+        and doubled only after a launch makes progress, so the tests which
+        never start cost one launch each.
+        """
+        if not expected_tests:
+            return
+        launches = self.runner.launches
+        rerun_count = len(expected_tests)
+        batch_size = len(expected_tests)
+        while expected_tests:
+            batch = self._get_rerun_batch(expected_tests, batch_size)
+            if len(batch) == 1:
+                rerun_attempt = self.runner.rerun_attempt
+                self.runner.add_instrumentation_arg(
+                    "gtest_filter", self._get_test_filter(batch[0]))
+                self.runner.rerun(listener, batch[0])
+                expected_tests.remove(batch[0])
+                if self.runner.rerun_attempt == rerun_attempt:
+                    # the test has started, or it is marked blocked
+                    # without a launch, grow the batch again
+                    batch_size = 2
+                continue
+            self.runner.add_instrumentation_arg(
+                "gtest_filter", ":".join(
+                    [self._get_test_filter(test) for test in batch]))
+            LOG.debug("ready to rerun batch, expect run: %s" % len(batch))
+            test_run = self._run_tests(listener)
+            remain_count = len(expected_tests)
             expected_tests = TestDescription.remove_test(expected_tests,
                                                          test_run)
-            if not expected_tests:
-                LOG.debug("Rerun textFile success")
-            self._rerun_serially(expected_tests, listener)
+            LOG.debug("rerun batch, has run: %s" % (
+                remain_count - len(expected_tests)))
+            if len(expected_tests) == remain_count:
+                # crashed before any test started, isolate the crasher
+                batch_size = len(batch) // 2
+            else:
+                batch_size = min(batch_size * 2, len(expected_tests))
+        self.runner.remove_instrumentation_arg("gtest_filter")
+        LOG.info("rerun %s tests with %s launches" % (
+            rerun_count, self.runner.launches - launches))
+
+    @staticmethod
+    def _get_test_filter(test):
+        return "%s.%s" % (test.class_name, test.test_name)
+
+    def _get_rerun_batch(self, expected_tests, batch_size):
+        batch = []
+        filter_length = 0
+        for test in expected_tests[:max(batch_size, 1)]:
+            filter_length += len(self._get_test_filter(test)) + 1
+            if batch and filter_length > GTEST_FILTER_MAX_LENGTH:
+                break
+            batch.append(test)
+        return batch
 
     def _rerun_serially(self, expected_tests, listener):
         LOG.debug("rerun serially, expected run: %s" % len(expected_tests))
@@ -501,15 +561,11 @@ class RemoteCppTestRunner:
         self.suite_name = None
         self.config = config
         self.rerun_attempt = FAILED_RUN_TEST_ATTEMPTS
+        self.launches = 0
 
     def dry_run(self):
-        parsers = get_plugin(Plugin.PARSER, CommonParserType.cpptest_list)
-        if parsers:
-            parsers = parsers[:1]
-        parser_instances = []
-        for parser in parsers:
-            parser_instance = parser.__class__()
-            parser_instances.append(parser_instance)
+        parser_instances = create_plugin(
+            Plugin.PARSER, CommonParserType.cpptest_list, limit=1)
         handler = ShellHandler(parser_instances)
         # apply execute right
         chmod_cmd = "shell chmod 777 {}/{}".format(
@@ -523,15 +579,11 @@ class RemoteCppTestRunner:
         pre_cmd = "hdc_std -t %s shell " % self.config.device.device_sn
         command = "%s %s" % (pre_cmd, dry_command)
         LOG.info("The dry_command execute command is {}".format(command))
-        output = start_standing_subprocess(command.split(),
-                                           return_result=True)
-        LOG.debug("dryrun output ---")
-        output = output.replace("\r", "")
-        handler.__read__(output)
-        handler.__done__()
+        self._execute(command, handler)
         return parser_instances[0].tests
 
     def run(self, listener):
+        self.launches += 1
         handler = self._get_shell_handler(listener)
         pre_cmd = "hdc_std -t %s shell " % self.config.device.device_sn
         command = "{}/{} {}".format(self.config.target_test_path,
@@ -539,14 +591,11 @@ class RemoteCppTestRunner:
                                          self.get_args_command())
         command = "%s %s" % (pre_cmd, command)
         LOG.debug("run command is: %s" % command)
-        output = start_standing_subprocess(command.split(), return_result=True)
-        LOG.debug("run output ---")
-        output = output.replace("\r", "")
-        handler.__read__(output)
-        handler.__done__()
+        self._execute(command, handler)
 
     def rerun(self, listener, test):
         if self.rerun_attempt:
+            self.launches += 1
             test_tracker = CollectingTestListener()
             listener_copy = listener.copy()
             listener_copy.append(test_tracker)
@@ -558,12 +607,7 @@ class RemoteCppTestRunner:
                                              self.get_args_command())
                 command = "%s %s" % (pre_cmd, command)
                 LOG.debug("rerun command is: %s" % command)
-                output = start_standing_subprocess(command.split(),
-                                                   return_result=True)
-                LOG.debug("run output ---")
-                output = output.replace("\r", "")
-                handler.__read__(output)
-                handler.__done__()
+                self._execute(command, handler)
 
             except ShellCommandUnresponsiveException:
                 LOG.debug("Exception: ShellCommandUnresponsiveException")
@@ -597,16 +641,22 @@ class RemoteCppTestRunner:
                 args_commands = "%s --%s=%s" % (args_commands, key, value)
         return args_commands
 
+    @staticmethod
+    def _execute(command, handler):
+        # feed the output to the parsers while the test is running
+        process = start_standing_subprocess(command.split())
+        try:
+            read_standing_subprocess(process, handler)
+        finally:
+            handler.__done__()
+
     def _get_shell_handler(self, listener):
-        parsers = get_plugin(Plugin.PARSER, CommonParserType.cpptest)
-        if parsers:
-            parsers = parsers[:1]
-        parser_instances = []
-        for parser in parsers:
-            parser_instance = parser.__class__()
+        parser_instances = create_plugin(
+            Plugin.PARSER, CommonParserType.cpptest, limit=1)
+        for parser_instance in parser_instances:
             parser_instance.suite_name = self.suite_name
             parser_instance.listeners = listener
-            parser_instances.append(parser_instance)
+            parser_instance.launches = self.launches
         handler = ShellHandler(parser_instances)
         return handler
 
@@ -665,7 +715,8 @@ class JUnitTestDriver(IDriver):
                     hilog_open = os.open(hilog, os.O_WRONLY |
                                          os.O_CREAT | os.O_APPEND, 0o755)
                     hilog_pipe = os.fdopen(hilog_open, "a")
-                    device.start_catch_device_log(hilog_pipe)
+                    device.start_catch_device_log(hilog_pipe,
+                                                  ring_buffer=True)
                     device_log_pipes.extend([hilog_pipe])
 
                 self._run_junit(config_file, listeners=request.listeners,
@@ -674,8 +725,9 @@ class JUnitTestDriver(IDriver):
                 for device_log_pipe in device_log_pipes:
                     device_log_pipe.flush()
                     device_log_pipe.close()
+                passed = is_result_passed(self.result, self.error_message)
                 for device in self.config.devices:
-                    device.stop_catch_device_log()
+                    device.stop_catch_device_log(passed=passed)
 
         except Exception as exception:
             if not getattr(exception, "error_no", ""):
@@ -1101,15 +1153,11 @@ class RemoteTestRunner:
         return args_commands
 
     def _get_shell_handler(self, listener):
-        parsers = get_plugin(Plugin.PARSER, CommonParserType.junit)
-        if parsers:
-            parsers = parsers[:1]
-        parser_instances = []
-        for parser in parsers:
-            parser_instance = parser.__class__()
+        parser_instances = create_plugin(
+            Plugin.PARSER, CommonParserType.junit, limit=1)
+        for parser_instance in parser_instances:
             parser_instance.suite_name = self.suite_name
             parser_instance.listeners = listener
-            parser_instances.append(parser_instance)
         handler = ShellHandler(parser_instances)
         return handler
 
@@ -1218,15 +1266,11 @@ class RemoteDexRunner:
         return args_commands
 
     def _get_shell_handler(self, listener):
-        parsers = get_plugin(Plugin.PARSER, CommonParserType.junit)
-        if parsers:
-            parsers = parsers[:1]
-        parser_instances = []
-        for parser in parsers:
-            parser_instance = parser.__class__()
+        parser_instances = create_plugin(
+            Plugin.PARSER, CommonParserType.junit, limit=1)
+        for parser_instance in parser_instances:
             parser_instance.suite_name = self.suite_name
             parser_instance.listeners = listener
-            parser_instances.append(parser_instance)
         handler = ShellHandler(parser_instances)
         return handler
 
@@ -1283,12 +1327,14 @@ class HapTestDriver(IDriver):
             device_log_file_open = os.open(
                 device_log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o755)
             with os.fdopen(device_log_file_open, "a")as file_pipe:
-                self.config.device.start_catch_device_log(file_pipe)
+                self.config.device.start_catch_device_log(file_pipe,
+                                                          ring_buffer=True)
                 self._init_junit_test()
                 self._run_junit_test(suite_file)
                 file_pipe.flush()
         finally:
-            self.config.device.stop_catch_device_log()
+            self.config.device.stop_catch_device_log(
+                passed=is_result_passed(self.result))
 
     def _init_junit_test(self):
         cmd = "target mount" \
@@ -1634,90 +1680,70 @@ class JSUnitTestDriver(IDriver):
         message_list.clear()
 
         report_name = request.get_module_name()
-        parsers = get_plugin(
-            Plugin.PARSER, CommonParserType.jsunit)
-        if parsers:
-            parsers = parsers[:1]
         for listener in request.listeners:
             listener.device_sn = self.config.device.device_sn
-        parser_instances = []
-
-        for parser in parsers:
-            parser_instance = parser.__class__()
+        parser_instances = create_plugin(
+            Plugin.PARSER, CommonParserType.jsunit, limit=1)
+        for parser_instance in parser_instances:
             parser_instance.suites_name = report_name
             parser_instance.suite_name = report_name
             parser_instance.listeners = request.listeners
-            parser_instances.append(parser_instance)
         handler = ShellHandler(parser_instances)
         process_command_ret(result_message, handler)
 
     def read_device_log(self, device_log_file, timeout=60):
         LOG.info("The timeout is {} seconds".format(timeout))
 
-        while time.time() - self.start_time <= timeout:
-            result_message = ""
-            with open(device_log_file, "r", encoding='utf-8',
-                     errors='ignore') as file_read_pipe:
-                while True:
-                    try:
-                        line = file_read_pipe.readline()
-                    except (UnicodeDecodeError, UnicodeError) as error:
-                        LOG.warning("While read log file: %s" % error)
-                    if not line :
-                        break
-                    if line.lower().find("jsapp:") != -1:
-                        result_message += line
-                    if "[end] run suites end" in line:
+        result_message = []
+        with LogFileFollower(device_log_file) as follower:
+            while time.time() - self.start_time <= timeout:
+                for line in follower.read_lines():
+                    if not JSAPP_PATTERN.search(line):
+                        continue
+                    result_message.append(
+                        line.decode("utf-8", errors="ignore"))
+                    if SUITES_END_MARK in line:
                         LOG.info("Find the end mark then analysis result")
-                        return result_message
-                # if test not finished, wait 5 seconds
-                else:
-                    LOG.info("did not find the end mark then wait 5 seconds")
-                    time.sleep(5)
-        else:
-            LOG.error("Hjsunit run timeout {}s reached".format(timeout))
-            raise RuntimeError("Hjsunit run timeout!")
+                        return "".join(result_message)
+                # if test not finished, wait for new log
+                follower.wait(min(JSUNIT_LOG_WAIT_TIME, max(
+                    0, timeout - (time.time() - self.start_time))))
+        LOG.error("Hjsunit run timeout {}s reached".format(timeout))
+        raise RuntimeError("Hjsunit run timeout!")
 
     def read_device_log_timeout(self, device_log_file,
                                 message_list, timeout):
         LOG.info("The timeout is {} seconds".format(timeout))
         suite_end_count = 0
         suite_start_count = 0
-        pattern = "^\\d{2}-\\d{2}\\s+\\d{2}:\\d{2}:\\d{2}\\.\\d{3}\\s+(\\d+)"
-        while time.time() - self.start_time <= timeout: 
-
-            with open(device_log_file, "r", encoding='utf-8',
-                      errors='ignore') as file_read_pipe:
-                pid = ""
-                message_list.clear()
-                while True:
-                    try:
-                        line = file_read_pipe.readline()
-                    except (UnicodeDecodeError, UnicodeError) as error:
-                        LOG.warning("While read log file: %s" % error)
-                    if not line:
-                        time.sleep(2)  # wait for log write to file
-                        break
-                    if line.lower().find("jsapp:") != -1:
-                        if not pid and "[start] start run suites" in line:
-                            matcher = re.match(pattern, line.strip())
-                            if matcher and matcher.group(1):
-                                pid = matcher.group(1)
-                            else:
-                                LOG.warning("Can't find pid in suites start")
-                        if not pid or pid not in line:
-                            continue
-                        message_list.append(line)
-                        if "[suite end]" in line:
-                            suite_end_count += 1
-                        if "[suite start]" in line:
-                            suite_start_count += 1
-                        if "[end] run suites end" in line:
-                            LOG.info("Find the end mark then analysis result")
-                            return suite_start_count, suite_end_count, True
-        else:
-            LOG.error("Hjsunit run timeout {}s reached".format(timeout))
-            return suite_start_count, suite_end_count, False
+        pid = b""
+        message_list.clear()
+        with LogFileFollower(device_log_file) as follower:
+            while time.time() - self.start_time <= timeout:
+                for line in follower.read_lines():
+                    if not JSAPP_PATTERN.search(line):
+                        continue
+                    if not pid and SUITES_START_MARK in line:
+                        matcher = LOG_PID_PATTERN.match(line.strip())
+                        if matcher and matcher.group(1):
+                            pid = matcher.group(1)
+                        else:
+                            LOG.warning("Can't find pid in suites start")
+                    if not pid or pid not in line:
+                        continue
+                    message_list.append(line.decode("utf-8", errors="ignore"))
+                    if SUITE_END_MARK in line:
+                        suite_end_count += 1
+                    if SUITE_START_MARK in line:
+                        suite_start_count += 1
+                    if SUITES_END_MARK in line:
+                        LOG.info("Find the end mark then analysis result")
+                        return suite_start_count, suite_end_count, True
+                # wait for log write to file
+                follower.wait(min(JSUNIT_LOG_WAIT_TIME, max(
+                    0, timeout - (time.time() - self.start_time))))
+        LOG.error("Hjsunit run timeout {}s reached".format(timeout))
+        return suite_start_count, suite_end_count, False
 
     def _run_jsunit(self, config_file, request):
         try:
@@ -1885,16 +1911,13 @@ class LTPPosixTestDriver(IDriver):
                     listeners = request.listeners
                     for listener in listeners:
                         listener.device_sn = self.config.device.device_sn
-                    parsers = get_plugin(Plugin.PARSER,
-                                         "OpenSourceTest")
-                    parser_instances = []
-                    for parser in parsers:
-                        parser_instance = parser.__class__()
+                    parser_instances = create_plugin(
+                        Plugin.PARSER, "OpenSourceTest")
+                    for parser_instance in parser_instances:
                         parser_instance.suite_name = request.root.source.\
                             test_name
                         parser_instance.test_name = test_bin.replace("./", "")
                         parser_instance.listeners = listeners
-                        parser_instances.append(parser_instance)
                     self.handler = ShellHandler(parser_instances)
                     result_message = self.config.device.hdc_command(
                         "shell {}{}".format(dst, test_bin))
@@ -2040,15 +2063,11 @@ class OHKernelTestRunner:
             command, timeout=self.config.timeout, receiver=handler, retry=0)
 
     def _get_shell_handler(self, listeners):
-        parsers = get_plugin(Plugin.PARSER, CommonParserType.oh_kernel_test)
-        if parsers:
-            parsers = parsers[:1]
-        parser_instances = []
-        for parser in parsers:
-            parser_instance = parser.__class__()
+        parser_instances = create_plugin(
+            Plugin.PARSER, CommonParserType.oh_kernel_test, limit=1)
+        for parser_instance in parser_instances:
             parser_instance.suites_name = self.suite_name
             parser_instance.listeners = listeners
-            parser_instances.append(parser_instance)
         handler = ShellHandler(parser_instances)
         return handler
 
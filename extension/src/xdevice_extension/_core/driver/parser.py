@@ -76,6 +76,7 @@ class CppTestParser(IParser):
         self.listeners = []
         self.product_info = {}
         self.is_params = False
+        self.launches = 0
 
     def get_suite_name(self):
         return self.suite_name
@@ -99,7 +100,8 @@ class CppTestParser(IParser):
             suites = copy.copy(suite_result)
             listener.__ended__(LifeCycle.TestSuites, test_result=suites,
                                suites_name=suites.suites_name,
-                               product_info=suites.product_info)
+                               product_info=suites.product_info,
+                               launches=self.launches)
         self.state_machine.current_suites = None
 
     def parse(self, line):
@@ -29,7 +29,9 @@ from xdevice import ConfigConst
 
 from xdevice_extension._core import utils
 from xdevice_extension._core.environment.dmlib import HdcHelper
+from xdevice_extension._core.environment.dmlib import HdcLogCollector
 from xdevice_extension._core.exception import HdcError
+from xdevice_extension._core.exception import DeviceError
 from xdevice_extension._core.environment.dmlib import CollectingOutputReceiver
 from xdevice_extension._core.environment.device_state import \
     DeviceAllocationState
@@ -124,6 +126,7 @@ class Device(IDevice):
     device_state_monitor = None
     reboot_timeout = 2 * 60 * 1000
     hilog_file_pipe = None
+    hilog_collected = False
 
     model_dict = {
         'default': ProductForm.phone,
@@ -338,32 +341,56 @@ class Device(IDevice):
             return True
         return False
 
-    def start_catch_device_log(self, hilog_file_pipe=None):
+    def start_catch_device_log(self, hilog_file_pipe=None, **kwargs):
         """
-        Starts hdc log for each device in separate subprocesses and save
-        the logs in files.
+        Starts hdc log for each device and save the logs in files. The logs
+        of all devices are collected by HdcLogCollector in one thread.
+        ring_buffer=True keeps only the tail of log in memory until the log
+        is stopped, see stop_catch_device_log.
         """
         if hilog_file_pipe:
             self.hilog_file_pipe = hilog_file_pipe
-        self._start_catch_device_log()
+            self._start_catch_device_log(
+                hilog_file_pipe, kwargs.get("ring_buffer", False))
+        else:
+            # restart after reboot, resume the last log
+            self._start_catch_device_log()
 
-    def stop_catch_device_log(self):
+    def stop_catch_device_log(self, **kwargs):
         """
-        Stops all hdc log subprocesses.
+        Stops hdc log of the device. For a log started with ring_buffer,
+        passed=True writes the tail of log only, otherwise the full log.
         """
-        self._stop_catch_device_log()
+        self._stop_catch_device_log(kwargs.get("passed", False))
 
-    def _start_catch_device_log(self):
+    def _start_catch_device_log(self, hilog_file_pipe=None,
+                                ring_buffer=False):
         if self.hilog_file_pipe:
             command = "hilog"
             if self.usb_type == DeviceConnectorType.hdc:
+                if self.hilog_collected or hilog_file_pipe:
+                    try:
+                        HdcLogCollector.get_instance().add(
+                            self, hilog_file_pipe, ring_buffer)
+                        self.hilog_collected = True
+                        return
+                    except (OSError, HdcError, DeviceError) as error:
+                        LOG.debug("collect hilog with hdc socket error: %s, "
+                                  "use hdc_std instead" % error)
+                        if self.hilog_collected:
+                            HdcLogCollector.get_instance().remove(self)
+                        self.hilog_collected = False
                 cmd = ['hdc_std', "-t", self.device_sn, "shell", command]
                 LOG.info("execute command: %s" % " ".join(cmd).replace(
                     self.device_sn, convert_serial(self.device_sn)))
                 self.device_hilog_proc = utils.start_standing_subprocess(
                     cmd, self.hilog_file_pipe)
 
-    def _stop_catch_device_log(self):
+    def _stop_catch_device_log(self, passed=False):
+        if self.hilog_collected:
+            HdcLogCollector.get_instance().remove(self, passed)
+            self.hilog_collected = False
+            self.hilog_file_pipe = None
         if self.device_hilog_proc:
             utils.stop_standing_subprocess(self.device_hilog_proc)
             self.device_hilog_proc = None
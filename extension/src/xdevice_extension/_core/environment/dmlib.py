@@ -18,12 +18,16 @@
 
 import os
 import platform
+import selectors
 import socket
 import struct
+import tempfile
 import threading
 import time
 import shutil
 import stat
+import zlib
+from collections import deque
 from dataclasses import dataclass
 
 from xdevice import DeviceOsType
@@ -31,7 +35,7 @@ from xdevice import ReportException
 from xdevice import ExecuteTerminate
 from xdevice import platform_logger
 from xdevice import Plugin
-from xdevice import get_plugin
+from xdevice import create_plugin
 from xdevice import IShellReceiver
 from xdevice import exec_cmd
 from xdevice import get_file_absolute_path
@@ -76,6 +80,11 @@ DEFAULT_OFFSET_OF_INT = 4
 
 DEFAULT_PORT = 5037
 INVALID_MODE_CODE = -1
+
+DEVICE_LOG_BLOCK_SIZE = 1024 * 1024
+DEVICE_LOG_RING_SIZE = 4 * 1024 * 1024
+DEVICE_LOG_FLUSH_INTERVAL = 0.5
+DEVICE_LOG_RECV_SIZE = 64 * 1024
 LOG = platform_logger("Hdc")
 
 
@@ -294,8 +303,8 @@ class HdcMonitor:
         self.update_devices(local_array_list)
 
     def _get_device_instance(self, items, os_type):
-        device = get_plugin(plugin_type=Plugin.DEVICE, plugin_id=os_type)[0]
-        device_instance = device.__class__()
+        device_instance = create_plugin(
+            plugin_type=Plugin.DEVICE, plugin_id=os_type, limit=1)[0]
         device_instance.__set_serial__(items[0])
         device_instance.host = self.channel.get("host")
         device_instance.port = self.channel.get("port")
@@ -1124,6 +1133,229 @@ class DeviceConnector(object):
             listener.device_changed(device)
 
 
+class DeviceLogBuffer:
+    """
+    Buffer of a device log collected by HdcLogCollector.
+
+    By default the log is written to the log file in blocks, at least once
+    every DEVICE_LOG_FLUSH_INTERVAL seconds. A ring buffer keeps the latest
+    DEVICE_LOG_RING_SIZE bytes in memory and spills older data to a
+    compressed temporary file, the log is written when it is dumped.
+    """
+
+    def __init__(self, log_fd, ring_buffer=False):
+        self.log_fd = log_fd
+        self.ring_buffer = ring_buffer
+        self.frame = bytearray()
+        self.chunks = deque()
+        self.size = 0
+        self.last_flush = time.time()
+        self.spill_file = None
+        self.spill_chunks = []
+        self.spill_size = 0
+        self.dropped_size = 0
+
+    def feed(self, data):
+        # hdc shell output is framed as 4 bytes length and data
+        self.frame.extend(data)
+        offset = 0
+        while len(self.frame) - offset >= DATA_UNIT_LENGTH:
+            length = struct.unpack_from("!I", self.frame, offset)[0]
+            end = offset + DATA_UNIT_LENGTH + length
+            if end > len(self.frame):
+                break
+            self.append(bytes(self.frame[offset + DATA_UNIT_LENGTH:end]))
+            offset = end
+        del self.frame[:offset]
+
+    def append(self, data):
+        if not data:
+            return
+        self.chunks.append(data)
+        self.size += len(data)
+        if not self.ring_buffer:
+            if self.size >= DEVICE_LOG_BLOCK_SIZE:
+                self.flush()
+            return
+        while self.size > DEVICE_LOG_RING_SIZE:
+            data = self.chunks.popleft()
+            self.size -= len(data)
+            self._spill(data)
+
+    def flush(self, force=False):
+        if self.ring_buffer or not self.chunks:
+            return
+        if not force and self.size < DEVICE_LOG_BLOCK_SIZE and \
+                time.time() - self.last_flush < DEVICE_LOG_FLUSH_INTERVAL:
+            return
+        self._write(b"".join(self.chunks))
+        self.chunks.clear()
+        self.size = 0
+        self.last_flush = time.time()
+
+    def dump(self, passed=False):
+        """write the rest of log and close the log file, only the tail of
+        a ring buffer is written when passed is True"""
+        try:
+            if not self.ring_buffer:
+                self.flush(force=True)
+                return
+            if passed:
+                dropped_size = self.dropped_size + self.spill_size
+                if dropped_size:
+                    self._write(bytes(
+                        "[xdevice] %s bytes of device log before are "
+                        "dropped, test passed\n" % dropped_size, "utf-8"))
+            else:
+                self._write_spill_file()
+                self._write(b"".join(self.spill_chunks))
+            self._write(b"".join(self.chunks))
+            self.chunks.clear()
+            self.size = 0
+        finally:
+            if self.spill_file:
+                self.spill_file.close()
+                self.spill_file = None
+            os.close(self.log_fd)
+
+    def _spill(self, data):
+        self.spill_chunks.append(data)
+        self.spill_size += len(data)
+        if self.spill_size < DEVICE_LOG_BLOCK_SIZE:
+            return
+        block = zlib.compress(b"".join(self.spill_chunks))
+        if not self.spill_file:
+            self.spill_file = tempfile.TemporaryFile()
+        self.spill_file.write(struct.pack("!I", len(block)))
+        self.spill_file.write(block)
+        self.dropped_size += self.spill_size
+        self.spill_chunks = []
+        self.spill_size = 0
+
+    def _write_spill_file(self):
+        if not self.spill_file:
+            return
+        self.spill_file.seek(0)
+        while True:
+            len_buf = self.spill_file.read(DATA_UNIT_LENGTH)
+            if len(len_buf) < DATA_UNIT_LENGTH:
+                break
+            length = struct.unpack("!I", len_buf)[0]
+            self._write(zlib.decompress(self.spill_file.read(length)))
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view:
+            size = os.write(self.log_fd, view)
+            view = view[size:]
+
+
+class HdcLogCollector(threading.Thread):
+    """
+    Collects hilog of all devices in one thread, each device has a hdc
+    shell socket which is watched by a selector.
+    """
+    instance = None
+    instance_lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__(name="HdcLogCollector", daemon=True)
+        self.selector = selectors.DefaultSelector()
+        self.lock = threading.RLock()
+        self.sockets = dict()
+        self.buffers = dict()
+
+    @classmethod
+    def get_instance(cls):
+        with cls.instance_lock:
+            if cls.instance is None:
+                cls.instance = HdcLogCollector()
+                cls.instance.start()
+        return cls.instance
+
+    def add(self, device, log_file_pipe=None, ring_buffer=False):
+        """start to collect hilog of device, a new log_file_pipe starts a
+        new log, otherwise the collection of the last log is resumed"""
+        if device.host not in HdcMonitor.MONITOR_MAP:
+            raise HdcError("Cannot detect HDC monitor!")
+        sock = HdcHelper.socket(host=device.host, port=device.port,
+                                timeout=DEFAULT_TIMEOUT)
+        try:
+            HdcHelper.handle_shake(sock, device.device_sn)
+            HdcHelper.write(sock, HdcHelper.form_hdc_request("shell hilog"))
+            sock.setblocking(False)
+        except (OSError, DeviceError) as error:
+            sock.close()
+            raise error
+
+        with self.lock:
+            self._close_socket(device.device_sn)
+            log_buffer = self.buffers.get(device.device_sn)
+            if log_file_pipe:
+                if log_buffer:
+                    log_buffer.dump()
+                log_file_pipe.flush()
+                log_buffer = DeviceLogBuffer(
+                    os.dup(log_file_pipe.fileno()), ring_buffer)
+                self.buffers[device.device_sn] = log_buffer
+            if not log_buffer:
+                sock.close()
+                return
+            self.sockets[device.device_sn] = sock
+            self.selector.register(sock, selectors.EVENT_READ,
+                                   device.device_sn)
+
+    def remove(self, device, passed=False):
+        """stop to collect hilog of device and write the rest of log"""
+        with self.lock:
+            self._close_socket(device.device_sn)
+            log_buffer = self.buffers.pop(device.device_sn, None)
+            if log_buffer:
+                log_buffer.dump(passed)
+
+    def run(self):
+        while True:
+            if not self.selector.get_map():
+                time.sleep(DEVICE_LOG_FLUSH_INTERVAL)
+                continue
+            try:
+                events = self.selector.select(DEVICE_LOG_FLUSH_INTERVAL)
+            except (OSError, ValueError):
+                # a socket is closed by remove while selecting
+                continue
+            with self.lock:
+                for key, _ in events:
+                    self._read(key.fileobj, key.data)
+                for log_buffer in self.buffers.values():
+                    log_buffer.flush()
+
+    def _read(self, sock, device_sn):
+        if self.sockets.get(device_sn) is not sock:
+            return
+        try:
+            data = sock.recv(DEVICE_LOG_RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as error:
+            LOG.debug("read hilog of %s error: %s" % (
+                convert_serial(device_sn), error))
+            data = b""
+        if not data:
+            # device disconnected, keep the buffer until it is removed
+            self._close_socket(device_sn)
+            return
+        self.buffers[device_sn].feed(data)
+
+    def _close_socket(self, device_sn):
+        sock = self.sockets.pop(device_sn, None)
+        if sock:
+            try:
+                self.selector.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+            sock.close()
+
+
 class CollectingOutputReceiver(IShellReceiver):
     def __init__(self):
         self.output = ""
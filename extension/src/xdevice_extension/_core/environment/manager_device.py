@@ -21,7 +21,7 @@ import threading
 from xdevice import UserConfigManager
 from xdevice import ManagerType
 from xdevice import Plugin
-from xdevice import get_plugin
+from xdevice import create_plugin
 from xdevice import IDeviceManager
 from xdevice import platform_logger
 from xdevice import ParamError
@@ -211,10 +211,9 @@ class ManagerDevice(IDeviceManager):
             device = self.find_device(idevice.device_sn,
                                       idevice.device_os_type)
             if device is None:
-                device = get_plugin(
+                device_instance = create_plugin(
                     plugin_type=Plugin.DEVICE,
-                    plugin_id=idevice.device_os_type)[0]
-                device_instance = device.__class__()
+                    plugin_id=idevice.device_os_type, limit=1)[0]
                 device_instance.__set_serial__(idevice.device_sn)
                 device_instance.host = idevice.host
                 device_instance.port = idevice.port
@@ -36,7 +36,8 @@ class CollectingTestListener(IListener):
     """
 
     def __init__(self):
-        self.tests = []
+        # an insertion ordered set of the collected tests
+        self.tests = dict()
 
     def __started__(self, lifecycle, test_result):
         if lifecycle == LifeCycle.TestCase:
@@ -44,8 +45,7 @@ class CollectingTestListener(IListener):
                 return
             test = TestDescription(test_result.test_class,
                                    test_result.test_name)
-            if test not in self.tests:
-                self.tests.append(test)
+            self.tests.setdefault(test)
 
     def __ended__(self, lifecycle, test_result=None, **kwargs):
         pass
@@ -57,7 +57,7 @@ class CollectingTestListener(IListener):
         pass
 
     def get_current_run_results(self):
-        return self.tests
+        return list(self.tests)
 
 
 @Plugin(type=Plugin.LISTENER, id=ListenerType.collect_lite)
@@ -67,7 +67,8 @@ class CollectingLiteGTestListener(IListener):
     """
 
     def __init__(self):
-        self.tests = []
+        # an insertion ordered set of the collected tests
+        self.tests = dict()
 
     def __started__(self, lifecycle, test_result):
         pass
@@ -79,8 +80,7 @@ class CollectingLiteGTestListener(IListener):
                 return
             test = TestDescription(test_result.test_class,
                                    test_result.test_name)
-            if test not in self.tests:
-                self.tests.append(test)
+            self.tests.setdefault(test)
 
     def __skipped__(self, lifecycle, test_result):
         pass
@@ -91,8 +91,7 @@ class CollectingLiteGTestListener(IListener):
                 return
             test = TestDescription(test_result.test_class,
                                    test_result.test_name)
-            if test not in self.tests:
-                self.tests.append(test)
+            self.tests.setdefault(test)
 
     def get_current_run_results(self):
-        return self.tests
+        return list(self.tests)
@@ -16,19 +16,28 @@
 # limitations under the License.
 #
 
+import codecs
 import os
 import platform
+import select
 import subprocess
 import signal
 import stat
+import time
 from tempfile import NamedTemporaryFile
 
 from xdevice import ShellHandler
+from xdevice import ExecuteTerminate
 from xdevice import platform_logger
-from xdevice import get_plugin
+from xdevice import create_plugin
 from xdevice import Plugin
 
 LOG = platform_logger("Utils")
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+FOLLOW_POLL_INTERVAL = 0.1
+FOLLOW_READ_SIZE = 1024 * 1024
+STREAM_READ_SIZE = 64 * 1024
 
 
 def get_filename_extension(file_path):
@@ -64,6 +73,33 @@ def start_standing_subprocess(cmd, pipe=subprocess.PIPE, return_result=False):
         return rev.decode("utf-8").strip()
 
 
+def read_standing_subprocess(process, receiver):
+    """Reads the output of a subprocess started by start_standing_subprocess
+    and passes it to the receiver as it arrives, until the subprocess closes
+    its stdout.
+
+    Args:
+        process: Subprocess started with stdout piped.
+        receiver: Output receiver, such as ShellHandler.
+    """
+    from xdevice import Scheduler
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    try:
+        while True:
+            data = process.stdout.read1(STREAM_READ_SIZE)
+            output = decoder.decode(data, final=not data).replace("\r", "")
+            if output:
+                receiver.__read__(output)
+            if not data:
+                break
+            if not Scheduler.is_execute:
+                stop_standing_subprocess(process)
+                raise ExecuteTerminate()
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
 def stop_standing_subprocess(process):
     """Stops a subprocess started by start_standing_subprocess.
 
@@ -217,17 +253,12 @@ def convert_serial(serial):
 
 def get_shell_handler(request, parser_type):
     suite_name = request.root.source.test_name
-    parsers = get_plugin(Plugin.PARSER, parser_type)
-    if parsers:
-        parsers = parsers[:1]
-    parser_instances = []
+    parser_instances = create_plugin(Plugin.PARSER, parser_type, limit=1)
     for listener in request.listeners:
         listener.device_sn = request.config.environment.devices[0].device_sn
-    for parser in parsers:
-        parser_instance = parser.__class__()
+    for parser_instance in parser_instances:
         parser_instance.suite_name = suite_name
         parser_instance.listeners = request.listeners
-        parser_instances.append(parser_instance)
     handler = ShellHandler(parser_instances)
     return handler
 
@@ -236,3 +267,90 @@ def check_path_legal(path):
     if path and " " in path:
         return "\"%s\"" % path
     return path
+
+
+class LogFileFollower:
+    """
+    Follows a growing log file like 'tail -f'. read_lines returns only the
+    complete lines written since the last call, wait blocks until the file
+    is modified, by inotify on linux, otherwise by polling the file size.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.offset = 0
+        self.unfinished_line = b""
+        self.inotify_fd = None
+        self._init_inotify()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read_lines(self):
+        try:
+            with open(self.file_path, "rb") as file_handler:
+                file_handler.seek(0, os.SEEK_END)
+                if file_handler.tell() < self.offset:
+                    # file is truncated, read it from the beginning
+                    self.offset = 0
+                    self.unfinished_line = b""
+                file_handler.seek(self.offset)
+                data = file_handler.read(FOLLOW_READ_SIZE)
+                self.offset = file_handler.tell()
+        except OSError as error:
+            LOG.debug("read %s error: %s" % (self.file_path, error))
+            return []
+        if not data:
+            return []
+        data = self.unfinished_line + data
+        end = data.rfind(b"\n") + 1
+        self.unfinished_line = data[end:]
+        return data[:end].splitlines(keepends=True)
+
+    def wait(self, timeout):
+        """wait until the file is modified or timeout in seconds"""
+        if self.has_unread():
+            return
+        if self.inotify_fd is not None:
+            readable, _, _ = select.select([self.inotify_fd], [], [], timeout)
+            if readable:
+                try:
+                    os.read(self.inotify_fd, 4096)
+                except (BlockingIOError, InterruptedError):
+                    pass
+            return
+        end_time = time.time() + timeout
+        while time.time() < end_time and not self.has_unread():
+            time.sleep(FOLLOW_POLL_INTERVAL)
+
+    def has_unread(self):
+        try:
+            return os.path.getsize(self.file_path) != self.offset
+        except OSError:
+            return False
+
+    def close(self):
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+
+    def _init_inotify(self):
+        if platform.system() != "Linux" or not os.path.exists(self.file_path):
+            return
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            inotify_fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if inotify_fd < 0:
+                return
+            if libc.inotify_add_watch(
+                    inotify_fd, os.fsencode(self.file_path),
+                    IN_MODIFY | IN_CLOSE_WRITE) < 0:
+                os.close(inotify_fd)
+                return
+            self.inotify_fd = inotify_fd
+        except (OSError, AttributeError) as error:
+            LOG.debug("inotify is not available: %s" % error)
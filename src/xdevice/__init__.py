@@ -16,11 +16,10 @@
 # limitations under the License.
 #
 
-import pkg_resources
-
 from .variables import Variables
 from _core.plugin import Plugin
 from _core.plugin import get_plugin
+from _core.plugin import create_plugin
 from _core.logger import platform_logger
 from _core.interface import IDriver
 from _core.interface import IDevice
@@ -60,6 +59,7 @@ from _core.driver.parser_lite import ShellHandler
 from _core.report.encrypt import check_pub_key_exist
 from _core.utils import get_file_absolute_path
 from _core.utils import check_result_report
+from _core.utils import is_result_passed
 from _core.utils import get_device_log_file
 from _core.utils import get_kit_instances
 from _core.utils import get_config_value
@@ -70,15 +70,9 @@ from _core.utils import do_module_kit_teardown
 from _core.utils import get_test_component_version
 from _core.environment.manager_env import DeviceSelectionOption
 from _core.environment.manager_env import EnvironmentManager
-from _core.executor.scheduler import Scheduler
 from _core.report.suite_reporter import SuiteReporter
 from _core.report.suite_reporter import ResultCode
 from _core.report.reporter_helper import ExecInfo
-from _core.report.result_reporter import ResultReporter
-from _core.report.__main__ import main_report
-from _core.command.console import Console
-from _core.testkit.kit_lite import DeployKit
-from _core.testkit.kit_lite import DeployToolKit
 from _core.environment.manager_env import DeviceAllocationState
 
 __all__ = [
@@ -87,6 +81,7 @@ __all__ = [
     "platform_logger",
     "Plugin",
     "get_plugin",
+    "create_plugin",
     "IDriver",
     "IDevice",
     "IDeviceManager",
@@ -129,6 +124,7 @@ __all__ = [
     "ResultCode",
     "check_pub_key_exist",
     "check_result_report",
+    "is_result_passed",
     "get_file_absolute_path",
     "get_device_log_file",
     "get_kit_instances",
@@ -146,16 +142,23 @@ __all__ = [
     "DeviceAllocationState"
 ]
 
-
-def _load_external_plugins():
-    plugins = [Plugin.SCHEDULER, Plugin.DRIVER, Plugin.DEVICE, Plugin.LOG,
-               Plugin.PARSER, Plugin.LISTENER, Plugin.TEST_KIT, Plugin.MANAGER,
-               Plugin.REPORTER]
-    for plugin_group in plugins:
-        for entry_point in pkg_resources.iter_entry_points(group=plugin_group):
-            entry_point.load()
-    return
+# imported on first access, so that importing xdevice does not load the
+# scheduler, console, reporters and kits
+_LAZY_IMPORTS = {
+    "Scheduler": "_core.executor.scheduler",
+    "ResultReporter": "_core.report.result_reporter",
+    "main_report": "_core.report.__main__",
+    "Console": "_core.command.console",
+    "DeployKit": "_core.testkit.kit_lite",
+    "DeployToolKit": "_core.testkit.kit_lite"
+}
 
 
-_load_external_plugins()
-del _load_external_plugins
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError("module {} has no attribute {}".format(
+            __name__, name))
+    import importlib
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
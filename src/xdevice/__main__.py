@@ -18,19 +18,25 @@
 
 import sys
 
-from xdevice import Console
 from xdevice import platform_logger
 
 LOG = platform_logger("Main")
 
 
 def main_process(command=None):
-    LOG.info("*************** xDevice Test Framework Starting ***************")
     if command:
         args = str(command).split(" ")
         args.insert(0, "xDevice")
     else:
         args = sys.argv
+    from _core.command.daemon import is_client_command
+    if is_client_command(args):
+        # submit to the running daemon without starting the environment
+        from _core.command.daemon import client_process
+        client_process(args)
+        return
+    LOG.info("*************** xDevice Test Framework Starting ***************")
+    from xdevice import Console
     console = Console()
     console.console(args)
     return
@@ -34,6 +34,7 @@ from _core.exception import ExecuteTerminate
 from _core.executor.request import Task
 from _core.executor.scheduler import Scheduler
 from _core.logger import platform_logger
+from _core.logger import flush_log
 from _core.plugin import Plugin
 from _core.plugin import get_plugin
 from _core.utils import SplicingAction
@@ -94,6 +95,13 @@ class Console(object):
             EnvironmentManager()
             # Enter xDevice console
             self._console()
+        elif args[1] == ToolCommandType.toolcmd_key_daemon:
+            # serve the commands submitted to xDevice daemon
+            from _core.command.daemon import XDeviceDaemon
+            try:
+                XDeviceDaemon.from_args(args[2:]).serve()
+            except ParamError as error:
+                LOG.error(error, error_no=error.error_no)
         else:
             # init environment manager
             EnvironmentManager()
@@ -106,6 +114,7 @@ class Console(object):
 
         while True:
             try:
+                flush_log()
                 usr_input = input(">>> ")
                 if usr_input == "":
                     continue
@@ -805,6 +814,16 @@ usage:
     run:  Display a list of supported run command.
     list: Display a list of supported device and task record.
 
+daemon:
+    xdevice daemon [--max-tasks N]:  serve the commands submitted over the \
+unix socket ($XDEVICE_SOCKET or xdevice-<uid>.sock in the temp directory), \
+executing up to N tasks together on separate devices, 1 by default
+    xdevice submit <command>:        execute the command by the daemon
+    xdevice daemon list:             display the tasks of the daemon
+    xdevice daemon status <task id>: display the state of a task
+    xdevice daemon cancel <task id>: cancel a queued or running task
+    xdevice daemon stop:             stop the daemon after the running tasks
+
 Examples:
     help run 
     help list
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+
+from _core.constants import ToolCommandType
+from _core.context import TaskContext
+from _core.exception import ParamError
+from _core.logger import platform_logger
+
+__all__ = ["XDeviceDaemon", "DaemonClient", "DaemonTask",
+           "get_daemon_socket_path", "is_client_command", "client_process"]
+
+LOG = platform_logger("Daemon")
+
+DAEMON_SOCKET_ENV = "XDEVICE_SOCKET"
+DAEMON_BACKLOG = 16
+# interval to check whether the daemon is stopped while accepting
+DAEMON_ACCEPT_TIMEOUT = 1
+
+
+class DaemonAction(object):
+    submit = "submit"
+    status = "status"
+    wait = "wait"
+    list = "list"
+    cancel = "cancel"
+    stop = "stop"
+
+
+class DaemonTaskState(object):
+    queued = "queued"
+    running = "running"
+    finished = "finished"
+    error = "error"
+    cancelled = "cancelled"
+
+
+def get_daemon_socket_path(socket_path=""):
+    """
+    the socket path given, or set by XDEVICE_SOCKET, or the default one of
+    the current user in the temp directory
+    """
+    if socket_path:
+        return os.path.abspath(socket_path)
+    if os.environ.get(DAEMON_SOCKET_ENV):
+        return os.path.abspath(os.environ.get(DAEMON_SOCKET_ENV))
+    user_id = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), "xdevice-%s.sock" % user_id)
+
+
+def _check_unix_socket():
+    if not hasattr(socket, "AF_UNIX"):
+        raise ParamError("daemon mode is not supported on this platform",
+                         error_no="00100")
+
+
+def _send_message(sock, message):
+    sock.sendall(("%s\n" % json.dumps(message)).encode("utf-8"))
+
+
+def _recv_message(sock_file):
+    line = sock_file.readline()
+    if not line:
+        return None
+    return json.loads(line.decode("utf-8"))
+
+
+class DaemonTask(object):
+    """
+    A command submitted to the daemon and its execution state.
+    """
+
+    def __init__(self, task_id, command):
+        self.task_id = task_id
+        self.command = command
+        self.state = DaemonTaskState.queued
+        self.report_path = ""
+        self.error_message = ""
+        self.submit_time = time.time()
+        self.start_time = 0
+        self.end_time = 0
+
+    def is_done(self):
+        return self.state in [DaemonTaskState.finished, DaemonTaskState.error,
+                              DaemonTaskState.cancelled]
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+class XDeviceDaemon(object):
+    """
+    Long-lived xDevice process serving commands submitted over a Unix
+    socket. Up to max_tasks commands are executed together by the console of
+    this process, each in its own task context, so devices, connections and
+    caches stay warm between tasks.
+    """
+
+    def __init__(self, socket_path="", max_tasks=1):
+        self.socket_path = get_daemon_socket_path(socket_path)
+        self.max_tasks = max(1, int(max_tasks))
+        self.server = None
+        self.tasks = dict()
+        # contexts of the running tasks, {task id: task context}
+        self.task_contexts = dict()
+        self.task_queue = queue.Queue()
+        self.task_con = threading.Condition()
+        self.next_task_id = 1
+        self.is_running = False
+
+    @classmethod
+    def from_args(cls, args):
+        """
+        create the daemon with the options of "xdevice daemon"
+        """
+        max_tasks = 1
+        if "--max-tasks" in args:
+            index = args.index("--max-tasks")
+            value = args[index + 1] if index + 1 < len(args) else ""
+            if not value.isdigit() or int(value) < 1:
+                raise ParamError("--max-tasks must be a positive integer, "
+                                 "not '%s'" % value, error_no="00100")
+            max_tasks = int(value)
+        return cls(max_tasks=max_tasks)
+
+    def serve(self):
+        """
+        start the environment and serve until a stop request or keyboard
+        interrupt, then stop the environment
+        """
+        from _core.environment.manager_env import EnvironmentManager
+        _check_unix_socket()
+        self._bind()
+        EnvironmentManager()
+        self.is_running = True
+        workers = []
+        for index in range(self.max_tasks):
+            worker = threading.Thread(target=self._run_tasks,
+                                      name="DaemonWorker-%s" % index)
+            worker.setDaemon(True)
+            worker.start()
+            workers.append(worker)
+        LOG.info("xDevice daemon is listening on %s, max tasks: %s" % (
+            self.socket_path, self.max_tasks))
+        handlers = []
+        try:
+            while self.is_running:
+                try:
+                    connection, _ = self.server.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                connection.settimeout(None)
+                handler = threading.Thread(
+                    target=self._handle_connection, args=(connection,))
+                handler.setDaemon(True)
+                handler.start()
+                handlers = [handler for handler in handlers
+                            if handler.is_alive()]
+                handlers.append(handler)
+        except KeyboardInterrupt:
+            LOG.info("xDevice daemon is interrupted")
+        finally:
+            self.stop()
+            for worker in workers:
+                worker.join()
+            # reply to the waiting clients before exit
+            for handler in handlers:
+                handler.join(DAEMON_ACCEPT_TIMEOUT)
+            EnvironmentManager().env_stop()
+            LOG.info("xDevice daemon stopped")
+
+    def stop(self):
+        with self.task_con:
+            if not self.is_running:
+                return
+            self.is_running = False
+            self.task_con.notify_all()
+        for _ in range(self.max_tasks):
+            self.task_queue.put(None)
+        try:
+            self.server.close()
+        except OSError as error:
+            LOG.debug("close daemon socket error: %s" % error)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def submit(self, command):
+        with self.task_con:
+            if not self.is_running:
+                raise ParamError("xDevice daemon is stopping")
+            task = DaemonTask(str(self.next_task_id), command)
+            self.next_task_id += 1
+            self.tasks[task.task_id] = task
+        self.task_queue.put(task)
+        LOG.info("task %s queued: %s" % (task.task_id, command))
+        return task
+
+    def wait(self, task_id, timeout=None):
+        end_time = time.time() + timeout if timeout else None
+        with self.task_con:
+            task = self._get_task(task_id)
+            while not task.is_done() and self.is_running:
+                remaining = end_time - time.time() if end_time else None
+                if remaining is not None and remaining <= 0:
+                    break
+                self.task_con.wait(remaining)
+            return task
+
+    def cancel(self, task_id):
+        """
+        cancel a queued task, or terminate a running one
+        """
+        from _core.executor.scheduler import Scheduler
+        with self.task_con:
+            task = self._get_task(task_id)
+            if task.state == DaemonTaskState.queued:
+                task.state = DaemonTaskState.cancelled
+                task.end_time = time.time()
+                self.task_con.notify_all()
+                LOG.info("task %s cancelled" % task.task_id)
+                return task
+            context = self.task_contexts.get(task.task_id)
+        if context is not None:
+            Scheduler.terminate_task(context)
+        return task
+
+    def _bind(self):
+        if os.path.exists(self.socket_path):
+            if DaemonClient(self.socket_path).is_alive():
+                raise ParamError("xDevice daemon is already running on %s" %
+                                 self.socket_path, error_no="00100")
+            # left by a daemon which has not stopped normally
+            os.remove(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            self.server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        self.server.listen(DAEMON_BACKLOG)
+        self.server.settimeout(DAEMON_ACCEPT_TIMEOUT)
+
+    def _get_task(self, task_id):
+        task = self.tasks.get(str(task_id))
+        if task is None:
+            raise ParamError("task %s not exists" % task_id)
+        return task
+
+    def _run_tasks(self):
+        from _core.command.console import Console
+        console = Console()
+        while True:
+            task = self.task_queue.get()
+            if task is None or not self.is_running:
+                break
+            with self.task_con:
+                if task.state == DaemonTaskState.cancelled:
+                    continue
+                context = TaskContext("daemon-%s" % task.task_id)
+                task.state = DaemonTaskState.running
+                task.start_time = time.time()
+                self.task_contexts[task.task_id] = context
+            LOG.info("task %s start: %s" % (task.task_id, task.command))
+            with context:
+                state = self._run_task(console, task)
+            with self.task_con:
+                self.task_contexts.pop(task.task_id, None)
+                task.state = state
+                task.end_time = time.time()
+                self.task_con.notify_all()
+            LOG.info("task %s %s" % (task.task_id, state))
+
+    @classmethod
+    def _run_task(cls, console, task):
+        from _core.executor.scheduler import Scheduler
+        last_command = Scheduler.command_queue[-1] if \
+            Scheduler.command_queue else None
+        state = DaemonTaskState.finished
+        try:
+            console.command_parser(task.command)
+        except (Exception, SystemExit) as error:
+            LOG.exception("task %s error: %s" % (task.task_id, error),
+                          exc_info=False)
+            task.error_message = str(error)
+            state = DaemonTaskState.error
+        # the command queue of the task context starts with the commands
+        # executed before, the report path is of the command appended last
+        if Scheduler.command_queue and \
+                Scheduler.command_queue[-1] is not last_command and \
+                isinstance(Scheduler.command_queue[-1], tuple):
+            task.report_path = Scheduler.command_queue[-1][2]
+        if not Scheduler.is_execute:
+            state = DaemonTaskState.cancelled
+        return state
+
+    def _handle_connection(self, connection):
+        try:
+            with connection, connection.makefile("rb") as sock_file:
+                request = _recv_message(sock_file)
+                if request is None:
+                    return
+                try:
+                    response = self._process_request(request)
+                except (ParamError, ValueError, TypeError, KeyError) as error:
+                    response = {"error": str(error)}
+                _send_message(connection, response)
+        except (OSError, ValueError) as error:
+            LOG.debug("daemon connection error: %s" % error)
+
+    def _process_request(self, request):
+        action = request.get("action", "")
+        if action == DaemonAction.submit:
+            command = str(request.get("command", "")).strip()
+            if not command:
+                raise ParamError("command is empty")
+            if command == ToolCommandType.toolcmd_key_quit:
+                # quit stops the daemon instead of the environment of the
+                # running tasks
+                self.stop()
+                return {"state": "stopped"}
+            task = self.submit(command)
+            if request.get("wait", False):
+                task = self.wait(task.task_id, request.get("timeout"))
+            with self.task_con:
+                return task.to_dict()
+        if action == DaemonAction.status:
+            with self.task_con:
+                return self._get_task(request.get("task_id")).to_dict()
+        if action == DaemonAction.wait:
+            task = self.wait(request.get("task_id"), request.get("timeout"))
+            with self.task_con:
+                return task.to_dict()
+        if action == DaemonAction.list:
+            with self.task_con:
+                return {"tasks": [task.to_dict() for task in
+                                  self.tasks.values()]}
+        if action == DaemonAction.cancel:
+            task = self.cancel(request.get("task_id"))
+            with self.task_con:
+                return task.to_dict()
+        if action == DaemonAction.stop:
+            self.stop()
+            return {"state": "stopped"}
+        raise ParamError("unsupported daemon action: %s" % action)
+
+
+class DaemonClient(object):
+    """
+    Thin client of the xDevice daemon, it neither loads plugins nor starts
+    the environment.
+    """
+
+    def __init__(self, socket_path=""):
+        self.socket_path = get_daemon_socket_path(socket_path)
+
+    def is_alive(self):
+        try:
+            self.list_tasks()
+            return True
+        except (OSError, ParamError):
+            return False
+
+    def submit(self, command, wait=False, timeout=None):
+        return self._request(action=DaemonAction.submit, command=command,
+                             wait=wait, timeout=timeout)
+
+    def status(self, task_id):
+        return self._request(action=DaemonAction.status, task_id=task_id)
+
+    def wait(self, task_id, timeout=None):
+        return self._request(action=DaemonAction.wait, task_id=task_id,
+                             timeout=timeout)
+
+    def list_tasks(self):
+        return self._request(action=DaemonAction.list).get("tasks", [])
+
+    def cancel(self, task_id):
+        return self._request(action=DaemonAction.cancel, task_id=task_id)
+
+    def stop(self):
+        return self._request(action=DaemonAction.stop)
+
+    def _request(self, **request):
+        _check_unix_socket()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+            _send_message(sock, request)
+            with sock.makefile("rb") as sock_file:
+                response = _recv_message(sock_file)
+        if response is None:
+            raise ParamError("xDevice daemon closed the connection")
+        if "error" in response:
+            raise ParamError(response.get("error"))
+        return response
+
+
+def is_client_command(args):
+    """
+    whether the command line is served by the daemon client, "daemon" alone
+    or with options starts the daemon itself
+    """
+    if len(args) < 2:
+        return False
+    return args[1] == ToolCommandType.toolcmd_key_submit or (
+        args[1] == ToolCommandType.toolcmd_key_daemon and len(args) > 2 and
+        not args[2].startswith("-"))
+
+
+def client_process(args):
+    """
+    xDevice submit <command>
+    xDevice daemon stop|list|status <task id>|cancel <task id>
+    """
+    client = DaemonClient()
+    try:
+        if args[1] == ToolCommandType.toolcmd_key_submit:
+            _display_task(client.submit(" ".join(args[2:]), wait=True))
+        elif args[2] == DaemonAction.stop:
+            client.stop()
+            LOG.info("xDevice daemon is stopping")
+        elif args[2] == DaemonAction.list:
+            for task in client.list_tasks():
+                _display_task(task)
+        elif args[2] == DaemonAction.status and len(args) > 3:
+            _display_task(client.status(args[3]))
+        elif args[2] == DaemonAction.cancel and len(args) > 3:
+            _display_task(client.cancel(args[3]))
+        else:
+            LOG.error("unsupported daemon command: %s" % " ".join(args[2:]),
+                      error_no="00100")
+    except OSError as error:
+        LOG.error("xDevice daemon on %s is not available: %s" % (
+            client.socket_path, error))
+    except ParamError as error:
+        LOG.error("xDevice daemon error: %s" % error)
+
+
+def _display_task(task):
+    LOG.info("task %s %s: %s%s" % (
+        task.get("task_id"), task.get("state"), task.get("command"),
+        ", report path: %s" % task.get("report_path") if task.get(
+            "report_path") else ""))
+    if task.get("error_message"):
+        LOG.info("task %s error: %s" % (task.get("task_id"),
+                                        task.get("error_message")))
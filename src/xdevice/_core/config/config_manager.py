@@ -16,7 +16,10 @@
 # limitations under the License.
 #
 
+import copy
+import functools
 import os
+import threading
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
 
@@ -34,12 +37,32 @@ class ConfigFileConst(object):
     userconfig_filepath = "user_config.xml"
 
 
+def _cached_lookup(func):
+    """
+    Keeps the result of an accessor in the lookups shared by the instances
+    of the same parsed config, and returns a copy of it.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in self.lookups:
+            self.lookups[key] = func(self, *args, **kwargs)
+        return copy.deepcopy(self.lookups[key])
+    return wrapper
+
+
 class UserConfigManager(object):
+    # parsed user configs shared by all the instances,
+    # {key: ((mtime_ns, size), config_content, lookups)}
+    _configs = dict()
+    _lock = threading.Lock()
+
     def __init__(self, config_file="", env=""):
         from xdevice import Variables
         try:
             if env:
-                self.config_content = ET.fromstring(env)
+                self.config_content, self.lookups = self._load_config(
+                    ("env", env), None, lambda: ET.fromstring(env))
             else:
                 if config_file:
                     self.file_path = config_file
@@ -57,12 +80,15 @@ class UserConfigManager(object):
                             break
 
                 LOG.debug("user config path: %s" % self.file_path)
-                if os.path.exists(self.file_path):
-                    tree = ET.parse(self.file_path)
-                    self.config_content = tree.getroot()
-                else:
+                try:
+                    file_stat = os.stat(self.file_path)
+                except OSError:
                     raise ParamError("%s not found" % self.file_path,
                                      error_no="00115")
+                self.config_content, self.lookups = self._load_config(
+                    os.path.abspath(self.file_path),
+                    (file_stat.st_mtime_ns, file_stat.st_size),
+                    lambda: ET.parse(self.file_path).getroot())
 
         except SyntaxError as error:
             if env:
@@ -74,6 +100,18 @@ class UserConfigManager(object):
                     "Parse %s fail! Error: %s" % (self.file_path, error.args),
                     error_no="00115")
 
+    @classmethod
+    def _load_config(cls, key, file_stat, parse):
+        with cls._lock:
+            cached = cls._configs.get(key)
+        if cached and cached[0] == file_stat:
+            return cached[1], cached[2]
+        config_content = parse()
+        with cls._lock:
+            cls._configs[key] = (file_stat, config_content, dict())
+            return cls._configs[key][1:]
+
+    @_cached_lookup
     def get_user_config_list(self, tag_name):
         data_dic = {}
         for child in self.config_content:
@@ -107,6 +145,7 @@ class UserConfigManager(object):
             sn_select_list = self._handle_str(input_string)
         return sn_select_list
 
+    @_cached_lookup
     def get_remote_config(self):
         remote_dic = {}
         data_dic = self.get_user_config_list("remote")
@@ -127,6 +166,7 @@ class UserConfigManager(object):
         remote_dic["port"] = remote_port
         return remote_dic
 
+    @_cached_lookup
     def get_testcases_dir_config(self):
         data_dic = self.get_user_config_list("testcases")
         if "dir" in data_dic.keys():
@@ -137,6 +177,7 @@ class UserConfigManager(object):
             testcase_dir = ""
         return testcase_dir
 
+    @_cached_lookup
     def get_user_config(self, target_name, filter_name=None):
         data_dic = {}
         all_nodes = self.config_content.findall(target_name)
@@ -152,11 +193,13 @@ class UserConfigManager(object):
 
         return data_dic
 
+    @_cached_lookup
     def get_node_attr(self, target_name, attr_name):
         nodes = self.config_content.find(target_name)
         if attr_name in nodes.attrib:
             return nodes.attrib.get(attr_name)
 
+    @_cached_lookup
     def get_com_device(self, target_name):
         devices = []
 
@@ -190,6 +233,7 @@ class UserConfigManager(object):
             devices.append(device)
         return devices
 
+    @_cached_lookup
     def get_device(self, target_name):
         for node in self.config_content.findall(target_name):
             data_dic = {}
@@ -231,6 +275,14 @@ class UserConfigManager(object):
         return os.path.abspath(
             os.path.join(Variables.exec_dir, "resource"))
 
+    @_cached_lookup
+    def get_archive_format(self):
+        node = self.config_content.find("report/archive_format")
+        if node is None or not node.text:
+            return ""
+        return str(node.text).strip()
+
+    @_cached_lookup
     def get_log_level(self):
         data_dic = {}
         node = self.config_content.find("loglevel")
@@ -16,7 +16,9 @@
 # limitations under the License.
 #
 
+import copy
 import os
+import threading
 import xml.etree.ElementTree as ElementTree
 
 from _core.logger import platform_logger
@@ -26,69 +28,99 @@ DEFAULT_TIMEOUT = "300"
 
 
 class ResourceManager(object):
+    # target indexes of the parsed resource xml files shared by all the
+    # instances, {xml_filepath: ((mtime_ns, size), {target_name: data_dic})}
+    _indexes = dict()
+    _lock = threading.Lock()
+
     def __init__(self):
         pass
 
     def get_resource_data(self, xml_filepath, target_name):
-        data_dic = {}
-        if os.path.exists(xml_filepath):
-            data_dic = self._parse_test_xml_file(xml_filepath,
-                                                 target_name)
-        return data_dic
-
-    def _parse_test_xml_file(self, filepath, targetname):
-        data_dic = {}
-
-        node = self._find_node_by_target(filepath, targetname)
-        if node:
-            target_attrib_list = []
-            target_attrib_list.append(node.attrib)
-            environment_data_list = []
-            env_node = node.find("environment")
-            if env_node:
-                environment_data_list.append(env_node.attrib)
-                for element in env_node.findall("device"):
-                    environment_data_list.append(element.attrib)
-                    for option_element in element.findall("option"):
-                        environment_data_list.append(option_element.attrib)
-
-            preparer_data_list = []
-            pre_node = node.find("preparer")
-            if pre_node:
-                preparer_data_list.append(pre_node.attrib)
-                for element in pre_node.findall("option"):
-                    preparer_data_list.append(element.attrib)
-
-            cleaner_data_list = []
-            clr_node = node.find("cleaner")
-            if clr_node:
-                cleaner_data_list.append(clr_node.attrib)
-                for element in clr_node.findall("option"):
-                    cleaner_data_list.append(element.attrib)
-
-            data_dic["nodeattrib"] = target_attrib_list
-            data_dic["environment"] = environment_data_list
-            data_dic["preparer"] = preparer_data_list
-            data_dic["cleaner"] = cleaner_data_list
-
-        return data_dic
-
-    @staticmethod
-    def _find_node_by_target(filepath, targetname):
-        node = None
+        target_index = self._get_target_index(xml_filepath)
+        return copy.deepcopy(target_index.get(target_name, {}))
+
+    def get_resource_data_list(self, xml_filepath, target_names):
+        """
+        Gets the resource data of several targets in one xml file, as a dict
+        of target name and data dict.
+        """
+        target_index = self._get_target_index(xml_filepath)
+        return {target_name: copy.deepcopy(target_index.get(target_name, {}))
+                for target_name in target_names}
+
+    @classmethod
+    def prefetch_resource_data(cls, xml_filepaths):
+        """
+        Parses the resource xml files of a task ahead, so that the modules
+        get their resource data from the index.
+        """
+        for xml_filepath in xml_filepaths:
+            cls._get_target_index(xml_filepath)
+
+    @classmethod
+    def _get_target_index(cls, xml_filepath):
         try:
-            if os.path.exists(filepath):
-                tree = ElementTree.parse(filepath)
-                root = tree.getroot()
-                targets = root.getiterator("target")
-                for target in targets:
-                    curr_dic = target.attrib
-                    if curr_dic.get("name") == targetname:
-                        node = target
-                        break
+            file_stat = os.stat(xml_filepath)
+        except (OSError, TypeError, ValueError):
+            return {}
+        file_stat = (file_stat.st_mtime_ns, file_stat.st_size)
+        key = os.path.abspath(xml_filepath)
+        with cls._lock:
+            cached = cls._indexes.get(key)
+        if cached and cached[0] == file_stat:
+            return cached[1]
+
+        target_index = cls._parse_test_xml_file(xml_filepath)
+        with cls._lock:
+            cls._indexes[key] = (file_stat, target_index)
+        return target_index
+
+    @classmethod
+    def _parse_test_xml_file(cls, filepath):
+        target_index = {}
+        try:
+            root = ElementTree.parse(filepath).getroot()
+            for target in root.iter("target"):
+                target_name = target.attrib.get("name")
+                if target_name not in target_index:
+                    target_index[target_name] = cls._parse_target(target)
         except (SyntaxError, ValueError, AttributeError, TypeError) as error:
             LOG.error("resource_test.xml parsing failed. %s", error.args)
-        return node
+        return target_index
+
+    @staticmethod
+    def _parse_target(node):
+        data_dic = {}
+        target_attrib_list = [node.attrib]
+        environment_data_list = []
+        env_node = node.find("environment")
+        if env_node is not None:
+            environment_data_list.append(env_node.attrib)
+            for element in env_node.findall("device"):
+                environment_data_list.append(element.attrib)
+                for option_element in element.findall("option"):
+                    environment_data_list.append(option_element.attrib)
+
+        preparer_data_list = []
+        pre_node = node.find("preparer")
+        if pre_node is not None:
+            preparer_data_list.append(pre_node.attrib)
+            for element in pre_node.findall("option"):
+                preparer_data_list.append(element.attrib)
+
+        cleaner_data_list = []
+        clr_node = node.find("cleaner")
+        if clr_node is not None:
+            cleaner_data_list.append(clr_node.attrib)
+            for element in clr_node.findall("option"):
+                cleaner_data_list.append(element.attrib)
+
+        data_dic["nodeattrib"] = target_attrib_list
+        data_dic["environment"] = environment_data_list
+        data_dic["preparer"] = preparer_data_list
+        data_dic["cleaner"] = cleaner_data_list
+        return data_dic
 
     @staticmethod
     def _get_filename_extension(filepath):
@@ -211,6 +211,8 @@ class ToolCommandType(object):
     toolcmd_key_run = "run"
     toolcmd_key_quit = "quit"
     toolcmd_key_list = "list"
+    toolcmd_key_daemon = "daemon"
+    toolcmd_key_submit = "submit"
 
 
 @dataclass
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import copy
+import functools
+import threading
+
+__all__ = ["TaskContext", "TaskScoped", "TaskScopedMeta", "TaskThread"]
+
+
+class TaskContext(object):
+    """
+    The state of one task. A thread runs in the context it entered last,
+    or in the process context, which holds the state when no task context
+    is used, as for the tasks executed one by one by the console.
+    """
+    _local = threading.local()
+    _process_context = None
+    _lock = threading.Lock()
+    _task_contexts = []
+
+    def __init__(self, name=""):
+        self.name = name
+        self.values = dict()
+
+    def __enter__(self):
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(self)
+        return self
+
+    def __exit__(self, *args):
+        self._local.stack.pop()
+
+    def __repr__(self):
+        return "TaskContext(%s)" % self.name
+
+    @classmethod
+    def current(cls):
+        stack = getattr(cls._local, "stack", None)
+        return stack[-1] if stack else cls._process_context
+
+    @classmethod
+    def process_context(cls):
+        return cls._process_context
+
+    @classmethod
+    def get_task_contexts(cls):
+        """
+        the registered task contexts, besides the process context
+        """
+        with cls._lock:
+            return list(cls._task_contexts)
+
+    def is_process_context(self):
+        return self is self._process_context
+
+    def register(self):
+        """
+        register the context as a running task
+        """
+        with self._lock:
+            if self not in self._task_contexts:
+                self._task_contexts.append(self)
+
+    def unregister(self):
+        with self._lock:
+            if self in self._task_contexts:
+                self._task_contexts.remove(self)
+
+    def wrap(self, func):
+        """
+        wrap func to run in this context, used for the threads of the task
+        """
+        @functools.wraps(func)
+        def _run_in_context(*args, **kwargs):
+            with self:
+                return func(*args, **kwargs)
+        return _run_in_context
+
+
+TaskContext._process_context = TaskContext("process")
+
+
+class TaskScoped(object):
+    """
+    Class attribute whose value is held by the current task context. A task
+    context without its own value starts with a new default value, or with
+    the value of the process context if inherit is True, which is copied
+    for the task if copy_inherited is True.
+    """
+
+    def __init__(self, default_factory, inherit=False, copy_inherited=False):
+        self.default_factory = default_factory
+        self.inherit = inherit
+        self.copy_inherited = copy_inherited
+
+    def __get__(self, instance, owner):
+        return self.get_value(TaskContext.current())
+
+    def __set__(self, instance, value):
+        TaskContext.current().values[self] = value
+
+    def get_value(self, context):
+        values = context.values
+        if self in values:
+            return values[self]
+        if self.inherit and not context.is_process_context():
+            value = self.get_value(TaskContext.process_context())
+            if not self.copy_inherited:
+                return value
+            return values.setdefault(self, copy.copy(value))
+        return values.setdefault(self, self.default_factory())
+
+
+class TaskThread(threading.Thread):
+    """
+    Thread running in the task context where it is created.
+    """
+
+    def __init__(self, *args, **kwargs):
+        threading.Thread.__init__(self, *args, **kwargs)
+        self.context = TaskContext.current()
+        self.run = self.context.wrap(self.run)
+
+
+class TaskScopedMeta(type):
+    """
+    Metaclass of the classes with TaskScoped attributes, so that the class
+    attributes are also assigned to the current task context.
+    """
+
+    def __setattr__(cls, name, value):
+        for klass in cls.__mro__:
+            attr = klass.__dict__.get(name)
+            if attr is None:
+                continue
+            if isinstance(attr, TaskScoped):
+                attr.__set__(None, value)
+                return
+            break
+        super(TaskScopedMeta, cls).__setattr__(name, value)
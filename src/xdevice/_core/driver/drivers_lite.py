@@ -34,6 +34,9 @@ from _core.constants import DeviceLiteKernel
 from _core.constants import FilePermission
 from _core.driver.parser_lite import ShellHandler
 from _core.environment.dmlib_lite import generate_report
+from _core.environment.nfs_lite import NfsResultWatcher
+from _core.environment.nfs_lite import SftpSessionPool
+from _core.environment.nfs_lite import is_remote_nfs
 from _core.exception import ExecuteTerminate
 from _core.exception import LiteDeviceError
 from _core.exception import LiteDeviceExecuteCommandError
@@ -42,7 +45,7 @@ from _core.executor.listener import CollectingLiteGTestListener
 from _core.executor.listener import TestDescription
 from _core.interface import IDriver
 from _core.plugin import Plugin
-from _core.plugin import get_plugin
+from _core.plugin import create_plugin
 from _core.logger import platform_logger
 from _core.report.reporter_helper import DataHelper
 from _core.testkit.json_parser import JsonParser
@@ -280,14 +283,12 @@ class CppTestDriver(IDriver):
             return tests
 
         else:
-            parsers = get_plugin(Plugin.PARSER, ParserType.cpp_test_list_lite)
-            parser_instances = []
-            for parser in parsers:
-                parser_instance = parser.__class__()
+            parser_instances = create_plugin(
+                Plugin.PARSER, ParserType.cpp_test_list_lite)
+            for parser_instance in parser_instances:
                 parser_instance.suites_name = os.path.basename(self.result)
                 if listener:
                     parser_instance.listeners = listener
-                parser_instances.append(parser_instance)
             handler = ShellHandler(parser_instances)
 
             collect_test_command = "%s --gtest_list_tests" % command
@@ -357,13 +358,11 @@ class CppTestDriver(IDriver):
         if not timeout:
             timeout = self.config.timeout
         if listener:
-            parsers = get_plugin(Plugin.PARSER, ParserType.cpp_test_lite)
-            parser_instances = []
-            for parser in parsers:
-                parser_instance = parser.__class__()
+            parser_instances = create_plugin(
+                Plugin.PARSER, ParserType.cpp_test_lite)
+            for parser_instance in parser_instances:
                 parser_instance.suite_name = self.file_name
                 parser_instance.listeners = listener
-                parser_instances.append(parser_instance)
             handler = ShellHandler(parser_instances)
         else:
             handler = None
@@ -386,9 +385,8 @@ class CppTestDriver(IDriver):
         if self.config.xml_output:
             self.run("{} --gtest_output=xml:{}".format(
                 command, self.config.device_report_path))
-            time.sleep(5)
             test_rerun = True
-            if self.check_xml_exist(self.execute_bin + ".xml"):
+            if self.check_xml_exist(request, self.execute_bin + ".xml"):
                 test_rerun = False
             test_run = self.read_nfs_xml(request, self.config.device_xml_path,
                                          test_rerun)
@@ -457,25 +455,19 @@ class CppTestDriver(IDriver):
         result_dir = os.path.join(request.config.report_path, "result")
         os.makedirs(result_dir, exist_ok=True)
         try:
-            if remote_nfs["remote"] == "true":
-                import paramiko
-                client = paramiko.Transport((remote_nfs.get("ip"),
-                                             int(remote_nfs.get("port"))))
-                client.connect(username=remote_nfs.get("username"),
-                               password=remote_nfs.get("password"))
-                sftp = paramiko.SFTPClient.from_transport(client)
-                files = sftp.listdir(report_path)
-
-                for report_xml in files:
-                    if report_xml.endswith(".xml"):
-                        filepath = report_path + report_xml
-                        try:
-                            sftp.get(remotepath=filepath,
-                                     localpath=os.path.join(os.path.split(
-                                         self.result)[0], report_xml))
-                        except IOError as error:
-                            LOG.error(error, error_no="00404")
-                client.close()
+            if is_remote_nfs(remote_nfs):
+                with SftpSessionPool.acquire(remote_nfs) as session:
+                    files = session.sftp.listdir(report_path)
+                    for report_xml in files:
+                        if report_xml.endswith(".xml"):
+                            filepath = report_path + report_xml
+                            try:
+                                session.sftp.get(
+                                    remotepath=filepath,
+                                    localpath=os.path.join(os.path.split(
+                                        self.result)[0], report_xml))
+                            except IOError as error:
+                                LOG.error(error, error_no="00404")
             else:
                 if os.path.isdir(report_path):
                     for report_xml in os.listdir(report_path):
@@ -487,19 +479,14 @@ class CppTestDriver(IDriver):
         except (FileNotFoundError, IOError) as error:
             LOG.error("download xml failed %s" % error, error_no="00403")
 
-    def check_xml_exist(self, xml_file, timeout=60):
-        ls_command = "ls %s" % self.config.device_report_path
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            result, _, _ = self.config.device.execute_command_with_timeout(
-                command=ls_command, case_type=DeviceTestType.cpp_test_lite,
-                timeout=5, receiver=None)
-            if xml_file in result:
-                return True
-            time.sleep(5)
-            if (self.execute_bin + "_1.xml") in result:
-                return False
-        return False
+    def check_xml_exist(self, request, xml_file, timeout=60):
+        remote_nfs = get_nfs_server(request)
+        rerun_xml_file = self.execute_bin + "_1.xml"
+        with NfsResultWatcher(remote_nfs,
+                              self.config.device_xml_path) as watcher:
+            ready_file = watcher.wait_for([xml_file, rerun_xml_file],
+                                          timeout)
+        return ready_file == xml_file
 
     def read_nfs_xml(self, request, report_path, is_true=False):
         remote_nfs = get_nfs_server(request)
@@ -513,50 +500,32 @@ class CppTestDriver(IDriver):
                 self.execute_bin + ".xml")
         LOG.debug("run into :{}".format(is_true))
         file_path = os.path.join(report_path, execute_bin_xml)
-        if not self.check_xml_exist(execute_bin_xml):
+        if not self.check_xml_exist(request, execute_bin_xml):
             return tests
 
         from xml.etree import ElementTree
         try:
-            if remote_nfs["remote"] == "true":
-                import paramiko
-                client = paramiko.SSHClient()
-                client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                client.connect(hostname=remote_nfs.get("ip"),
-                               port=int(remote_nfs.get("port")),
-                               username=remote_nfs.get("username"),
-                               password=remote_nfs.get("password"))
-                sftp_client = client.open_sftp()
-                remote_file = sftp_client.open(file_path)
-                try:
+            if is_remote_nfs(remote_nfs):
+                with SftpSessionPool.acquire(remote_nfs) as session, \
+                        session.sftp.open(file_path) as remote_file:
                     result = remote_file.read().decode()
-                    suites_element = ElementTree.fromstring(result)
-                    for suite_element in suites_element:
-                        suite_name = suite_element.get("name", "")
-                        for case in suite_element:
-                            case_name = case.get("name")
-                            test = TestDescription(suite_name, case_name)
-                            if test not in tests:
-                                tests.append(test)
-                finally:
-                    remote_file.close()
-                client.close()
+            elif os.path.isdir(report_path):
+                flags = os.O_RDONLY
+                modes = stat.S_IWUSR | stat.S_IRUSR
+                with os.fdopen(os.open(file_path, flags, modes),
+                               "r") as test_file:
+                    result = test_file.read()
             else:
-                if os.path.isdir(report_path):
-                    flags = os.O_RDONLY
-                    modes = stat.S_IWUSR | stat.S_IRUSR
-                    with os.fdopen(os.open(file_path, flags, modes),
-                                   "r") as test_file:
-                        result = test_file.read()
-                        suites_element = ElementTree.fromstring(result)
-                        for suite_element in suites_element:
-                            suite_name = suite_element.get("name", "")
-                            for case in suite_element:
-                                case_name = case.get("name")
-                                test = TestDescription(suite_name, case_name)
-                                if test not in tests:
-                                    tests.append(test)
-        except (FileNotFoundError, IOError) as error:
+                return tests
+            suites_element = ElementTree.fromstring(result)
+            for suite_element in suites_element:
+                suite_name = suite_element.get("name", "")
+                for case in suite_element:
+                    case_name = case.get("name")
+                    test = TestDescription(suite_name, case_name)
+                    if test not in tests:
+                        tests.append(test)
+        except (FileNotFoundError, IOError, EOFError) as error:
             LOG.error("download xml failed %s" % error, error_no="00403")
         except SyntaxError as error:
             LOG.error("parse xml failed %s" % error, error_no="00404")
@@ -572,27 +541,20 @@ class CppTestDriver(IDriver):
         LOG.info("delete xml directory {} from remote server: {}"
                  "".format
                  (report_path, remote_nfs.get("ip")))
-        if remote_nfs["remote"] == "true":
-            import paramiko
-            client = paramiko.Transport((remote_nfs.get("ip"),
-                                         int(remote_nfs.get("port"))))
-            client.connect(username=remote_nfs.get("username"),
-                           password=remote_nfs.get("password"))
-            sftp = paramiko.SFTPClient.from_transport(client)
-            try:
-                sftp.stat(report_path)
-                files = sftp.listdir(report_path)
-                for report_xml in files:
-                    if report_xml.endswith(".xml"):
-                        filepath = "{}{}".format(report_path, report_xml)
-                        try:
-                            sftp.remove(filepath)
-                            time.sleep(0.5)
-                        except IOError as _:
-                            pass
-            except FileNotFoundError as _:
-                pass
-            client.close()
+        if is_remote_nfs(remote_nfs):
+            with SftpSessionPool.acquire(remote_nfs) as session:
+                try:
+                    session.sftp.stat(report_path)
+                    files = session.sftp.listdir(report_path)
+                    for report_xml in files:
+                        if report_xml.endswith(".xml"):
+                            filepath = "{}{}".format(report_path, report_xml)
+                            try:
+                                session.sftp.remove(filepath)
+                            except IOError as _:
+                                pass
+                except FileNotFoundError as _:
+                    pass
         else:
             for report_xml in glob.glob(os.path.join(report_path, '*.xml')):
                 try:
@@ -675,7 +637,6 @@ class CTestDriver(IDriver):
 
     def _run_ctest(self, source=None, request=None):
         parser_instances = []
-        parsers = get_plugin(Plugin.PARSER, ParserType.ctest_lite)
         try:
             if not source:
                 LOG.error("Error: source don't exist %s." % source,
@@ -684,12 +645,12 @@ class CTestDriver(IDriver):
 
             version = get_test_component_version(self.config)
 
-            for parser in parsers:
-                parser_instance = parser.__class__()
+            parser_instances = create_plugin(
+                Plugin.PARSER, ParserType.ctest_lite)
+            for parser_instance in parser_instances:
                 parser_instance.suites_name = self.file_name
                 parser_instance.product_info.setdefault("Version", version)
                 parser_instance.listeners = request.listeners
-                parser_instances.append(parser_instance)
             handler = ShellHandler(parser_instances)
 
             reset_cmd = self._reset_device(request, source)
@@ -717,7 +678,6 @@ class CTestDriver(IDriver):
 
     def _run_ctest_third_party(self, source=None, request=None, time_out=5):
         parser_instances = []
-        parsers = get_plugin(Plugin.PARSER, ParserType.ctest_lite)
         try:
             if not source:
                 LOG.error("Error: source don't exist %s." % source,
@@ -726,12 +686,12 @@ class CTestDriver(IDriver):
 
             version = get_test_component_version(self.config)
 
-            for parser in parsers:
-                parser_instance = parser.__class__()
+            parser_instances = create_plugin(
+                Plugin.PARSER, ParserType.ctest_lite)
+            for parser_instance in parser_instances:
                 parser_instance.suites_name = self.file_name
                 parser_instance.product_info.setdefault("Version", version)
                 parser_instance.listeners = request.listeners
-                parser_instances.append(parser_instance)
             handler = ShellHandler(parser_instances)
 
             while True:
@@ -898,15 +858,12 @@ class OpenSourceTestDriver(IDriver):
             request.config.report_path, "result", bin_file)
 
     def run(self, command=None, listener=None, timeout=20):
-        parsers = get_plugin(Plugin.PARSER,
-                             ParserType.open_source_test)
-        parser_instances = []
-        for parser in parsers:
-            parser_instance = parser.__class__()
+        parser_instances = create_plugin(
+            Plugin.PARSER, ParserType.open_source_test)
+        for parser_instance in parser_instances:
             parser_instance.suite_name = self.file_name
             parser_instance.test_name = command.replace("./", "")
             parser_instance.listeners = listener
-            parser_instances.append(parser_instance)
         self.handler = ShellHandler(parser_instances)
         for _ in range(3):
             result, _, error = self.config.device.execute_command_with_timeout(
@@ -969,13 +926,11 @@ class BuildOnlyTestDriver(IDriver):
                 if not result.endswith('\n'):
                     result = '%s\n' % result
             total_result = '{}{}'.format(total_result, result)
-        parsers = get_plugin(Plugin.PARSER, ParserType.build_only_test)
-        parser_instances = []
-        for parser in parsers:
-            parser_instance = parser.__class__()
+        parser_instances = create_plugin(
+            Plugin.PARSER, ParserType.build_only_test)
+        for parser_instance in parser_instances:
             parser_instance.suite_name = self.file_name
             parser_instance.listeners = request.listeners
-            parser_instances.append(parser_instance)
         handler = ShellHandler(parser_instances)
         generate_report(handler, total_result)
 
@@ -1099,13 +1054,11 @@ class JSUnitTestLiteDriver(IDriver):
             self.config.device.close()
 
     def _run_jsunit(self, request):
-        parser_instances = []
-        parsers = get_plugin(Plugin.PARSER, ParserType.jsuit_test_lite)
-        for parser in parsers:
-            parser_instance = parser.__class__()
+        parser_instances = create_plugin(
+            Plugin.PARSER, ParserType.jsuit_test_lite)
+        for parser_instance in parser_instances:
             parser_instance.suites_name = self.file_name
             parser_instance.listeners = request.listeners
-            parser_instances.append(parser_instance)
         handler = ShellHandler(parser_instances)
 
         command = "./bin/aa start -p %s -n %s" % \
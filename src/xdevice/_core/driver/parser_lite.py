@@ -1094,7 +1094,7 @@ class ShellHandler:
             self.unfinished_line = lines[-1]
             # not return the tail element of this list contains unfinished str,
             # so we set position -1
-            return lines
+            return lines[:-1]
 
     def __read__(self, output):
         lines = self._process_output(output)
@@ -1112,6 +1112,9 @@ class ShellHandler:
                 parser.__process__([message])
 
     def __done__(self, result_code="", message=""):
+        if self.unfinished_line:
+            # the output ends without a line break
+            self.__read__("\n")
         msg_fmt = ""
         if message:
             msg_fmt = ", message is {}".format(message)
@@ -408,6 +408,8 @@ class RemoteController:
         self.host = device[1].get("ip")
         self.port = int(device[1].get("port"))
         self.telnet = None
+        # command name -> [count, total seconds, max seconds]
+        self.latency_stats = {}
 
     def connect(self):
         """
@@ -438,13 +440,36 @@ class RemoteController:
             timeout: timeout for read result
             receiver: parser handler
         """
-        return LiteHelper.execute_remote_cmd_with_timeout(
-            self.telnet, command, timeout, receiver)
+        start_time = time.time()
+        try:
+            return LiteHelper.execute_remote_cmd_with_timeout(
+                self.telnet, command, timeout, receiver)
+        finally:
+            self._record_latency(command, time.time() - start_time)
+
+    def _record_latency(self, command, latency):
+        name = command.split(" ", 1)[0] if command else ""
+        stats = self.latency_stats.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += latency
+        stats[2] = max(stats[2], latency)
+        LOG.debug("remote %s command %s finished in %.3fs" % (
+            convert_ip(self.host), command, latency))
+
+    def _log_latency_stats(self):
+        for name, (count, total, max_latency) in sorted(
+                self.latency_stats.items()):
+            LOG.debug("remote %s command %s latency: count %s, average "
+                      "%.3fs, max %.3fs" % (convert_ip(self.host), name,
+                                            count, total / count,
+                                            max_latency))
+        self.latency_stats.clear()
 
     def close(self):
         """
         Close the telnet connection with device server
         """
+        self._log_latency_stats()
         try:
             if not self.telnet:
                 return
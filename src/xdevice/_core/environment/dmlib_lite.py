@@ -43,9 +43,16 @@ CPP_TEST_MOUNT_SIGN = "not mount properly"
 _START_JSUNIT_RUN_MARKER = "[start] start run suites"
 _END_JSUNIT_RUN_MARKER = "[end] run suites end"
 INSTALL_END_MARKER = "resultMessage is install success !"
+MOUNT_END_SIGN = "Mount nfs finished."
+OPEN_SOURCE_TEST_SIGNS = ("test pass", "test fail", "tests pass", "tests fail")
+CTEST_RESULT_PATTERN = re.compile(
+    r"\d+\s+Tests\s+\d+\s+Failures\s+\d+\s+Ignored")
 
 PATTERN = re.compile(r'\x1B(\[([0-9]{1,2}(;[0-9]{1,2})*)?m)*')
+PROMPT_PATTERN = re.compile(rb"# $")
 TIMEOUT = 90
+SERIAL_READ_SIZE = 64 * 1024
+SERIAL_LINE_LIMIT = 64 * 1024
 LOG = platform_logger("DmlibLite")
 
 
@@ -60,44 +67,166 @@ def check_open_source_test(result_output):
 
 
 def check_read_test_end(result=None, input_command=None):
-    temp_result = result.replace("\n", "")
-    # if input_command not in temp_result:
-    #     return False
-    index = result.find(input_command) + len(input_command)
-    result_output = result[index:]
-    if input_command.startswith("./"):
-        if result_output.find(CPP_TEST_STANDARD_SIGN) != -1:
-            if result_output.count(CPP_TEST_STANDARD_SIGN) == 2 or \
-                    result_output.find(CPP_TEST_END_SIGN) != -1:
+    return ReadEndChecker(input_command).check(result)
+
+
+class ReadEndChecker:
+    """
+    Detects the end of a command output incrementally, only the new text and
+    a tail window shorter than the longest mark are scanned on every feed.
+    """
+    def __init__(self, input_command):
+        self.command = input_command
+        if input_command.startswith("./"):
+            self.err_message = "%s%s" % (CPP_ERR_MESSAGE, input_command[2:])
+            self.marks = (CPP_TEST_STANDARD_SIGN, CPP_TEST_END_SIGN,
+                          _START_JSUNIT_RUN_MARKER, _END_JSUNIT_RUN_MARKER,
+                          INSTALL_END_MARKER, CPP_TEST_MOUNT_SIGN,
+                          CPP_TEST_STOP_SIGN, self.err_message)
+            self.lower_marks = OPEN_SOURCE_TEST_SIGNS
+            self.line_end = True
+        else:
+            self.err_message = ""
+            self.marks = (CPP_SYS_STANDARD_SIGN, "# ", MOUNT_END_SIGN)
+            self.lower_marks = ()
+            # the shell prompt is not followed by a line break
+            self.line_end = False
+        self.tail_size = max(len(mark) for mark in
+                             self.marks + self.lower_marks + (
+                                 input_command,)) - 1
+        self.tail = ""
+        self.position = 0
+        # the output is checked from the command echo, or from where the
+        # echo would have ended if it is not found yet
+        self.output_start = len(input_command) - 1
+        self.command_found = False
+        self.counts = dict.fromkeys(self.marks + self.lower_marks, 0)
+
+    def _scan(self, text):
+        window = "".join((self.tail, text))
+        window_start = self.position - len(self.tail)
+        output_start = self.output_start
+        command_found = self.command_found
+        counts = dict(self.counts)
+        if not command_found:
+            index = window.find(self.command)
+            if index != -1:
+                command_found = True
+                output_start = window_start + index + len(self.command)
+                counts = dict.fromkeys(counts, 0)
+        for marks, content in ((self.marks, window),
+                               (self.lower_marks, window.lower())):
+            for mark in marks:
+                # occurrences starting inside the old tail are already counted
+                start = max(len(self.tail) - len(mark) + 1,
+                            output_start - window_start, 0)
+                counts[mark] += content.count(mark, start)
+        return command_found, output_start, counts, window[
+            max(len(window) - self.tail_size, 0):]
+
+    def feed(self, text):
+        """
+        Consumes new output text, returns whether the output is finished.
+        """
+        if text:
+            self.command_found, self.output_start, self.counts, self.tail = \
+                self._scan(text)
+            self.position += len(text)
+        return self._is_end(self.counts, self.tail)
+
+    def check(self, text=""):
+        """
+        Checks whether the output finished with the pending text, without
+        consuming it.
+        """
+        if not text:
+            return self._is_end(self.counts, self.tail)
+        _, _, counts, tail = self._scan(text)
+        return self._is_end(counts, tail)
+
+    def _is_end(self, counts, tail):
+        if self.command.startswith("./"):
+            standard_count = counts[CPP_TEST_STANDARD_SIGN]
+            if standard_count and (standard_count == 2 or
+                                   counts[CPP_TEST_END_SIGN]):
                 return True
-        if check_open_source_test(result_output):
-            return True
-        if result_output.find(_START_JSUNIT_RUN_MARKER) >= 1 and \
-                result_output.find(_END_JSUNIT_RUN_MARKER) >= 1:
-            return True
-
-        if result_output.find(INSTALL_END_MARKER) != -1:
-            return True
-        if (result_output.find(CPP_TEST_MOUNT_SIGN) != -1
-                and result_output.find(CPP_TEST_STOP_SIGN) != -1):
-            LOG.info("find test stop")
-            return True
-        if "%s%s" % (CPP_ERR_MESSAGE, input_command[2:]) in result_output:
-            LOG.error("execute file not exist, result is %s" % result_output,
-                      error_no="00402")
-            raise LiteDeviceExecuteCommandError("execute file not exist",
-                                                error_no="00402")
-    elif input_command.startswith("zcat"):
-        return False
-    else:
-        if "OHOS #" in result_output or "# " in result_output:
-            if input_command == "reboot" or input_command == "reset":
-                return False
-            if input_command.startswith("mount"):
-                if "Mount nfs finished." not in result_output:
+            if not standard_count and any(
+                    counts[mark] for mark in self.lower_marks):
+                return True
+            if counts[_START_JSUNIT_RUN_MARKER] and \
+                    counts[_END_JSUNIT_RUN_MARKER]:
+                return True
+            if counts[INSTALL_END_MARKER]:
+                return True
+            if counts[CPP_TEST_MOUNT_SIGN] and counts[CPP_TEST_STOP_SIGN]:
+                LOG.info("find test stop")
+                return True
+            if counts[self.err_message]:
+                LOG.error("execute file not exist, result is %s" % tail,
+                          error_no="00402")
+                raise LiteDeviceExecuteCommandError("execute file not exist",
+                                                    error_no="00402")
+        elif self.command.startswith("zcat"):
+            return False
+        else:
+            if counts[CPP_SYS_STANDARD_SIGN] or counts["# "]:
+                if self.command == "reboot" or self.command == "reset":
                     return False
-            return True
-    return False
+                if self.command.startswith("mount"):
+                    if not counts[MOUNT_END_SIGN]:
+                        return False
+                return True
+        return False
+
+
+def decode_output(data):
+    return PATTERN.sub('', bytes(data).decode(
+        'gbk', errors='ignore')).replace("\r", "")
+
+
+class SerialReader:
+    """
+    Reads the serial output in chunks of the waiting bytes, and splits it
+    into complete lines with the color codes removed.
+    """
+    def __init__(self, com):
+        self.com = com
+        self.pending = bytearray()
+
+    def read_lines(self):
+        """
+        Returns the complete lines read, an unfinished line is kept until its
+        end arrives or the serial read times out.
+        """
+        size = getattr(self.com, "in_waiting", 0) or 1
+        data = self.com.read(min(size, SERIAL_READ_SIZE))
+        if not data:
+            return self.flush()
+        self.pending.extend(data)
+        index = self.pending.rfind(b"\n")
+        if index == -1:
+            if len(self.pending) < SERIAL_LINE_LIMIT:
+                return []
+            return self.flush()
+        content = decode_output(self.pending[:index + 1])
+        del self.pending[:index + 1]
+        return ["%s\n" % line for line in content.split("\n")[:-1]]
+
+    def peek(self):
+        """
+        Returns the unfinished line read, without consuming it.
+        """
+        return decode_output(self.pending) if self.pending else ""
+
+    def flush(self):
+        """
+        Consumes the unfinished line read.
+        """
+        if not self.pending:
+            return []
+        content = decode_output(self.pending)
+        self.pending.clear()
+        return [content] if content else []
 
 
 def generate_report(receiver, result):
@@ -129,39 +258,41 @@ class LiteHelper:
             receiver: parser handler
         """
         from xdevice import Scheduler
-        time.sleep(2)
         start_time = time.time()
         status = True
         error_message = ""
-        result = ""
         if not telnet:
             raise LiteDeviceConnectError("remote device is not connected.",
                                          error_no="00402")
 
+        # drop the output left behind by the previous command, its prompt
+        # included, so that the echo of this command is matched
+        telnet.read_very_eager()
+        checker = ReadEndChecker(command)
+        results = []
         telnet.write(command.encode('ascii') + b"\n")
         while time.time() - start_time < timeout:
-            data = telnet.read_until(bytes(command, encoding="utf8"),
-                                     timeout=1)
-            data = PATTERN.sub('', data.decode('gbk', 'ignore')).replace(
-                "\r", "")
-            result = "{}{}".format(result, data)
-            if command in result:
+            data = decode_output(telnet.read_until(
+                bytes(command, encoding="utf8"), timeout=1))
+            results.append(data)
+            checker.feed(data)
+            if checker.command_found:
                 break
 
         expect_result = [bytes(CPP_TEST_STANDARD_SIGN, encoding="utf8"),
                          bytes(CPP_SYS_STANDARD_SIGN, encoding="utf8"),
                          bytes(CPP_TEST_END_SIGN, encoding="utf8"),
-                         bytes(CPP_TEST_STOP_SIGN, encoding="utf8")]
+                         bytes(CPP_TEST_STOP_SIGN, encoding="utf8"),
+                         PROMPT_PATTERN]
         while time.time() - start_time < timeout:
             if not Scheduler.is_execute:
                 raise ExecuteTerminate("Execute terminate", error_no="00300")
             _, _, data = telnet.expect(expect_result, timeout=1)
-            data = PATTERN.sub('', data.decode('gbk', 'ignore')).replace(
-                "\r", "")
-            result = "{}{}".format(result, data)
+            data = decode_output(data)
+            results.append(data)
             if receiver and data:
                 receiver.__read__(data)
-            if check_read_test_end(result, command):
+            if checker.feed(data):
                 break
         else:
             error_message = "execute %s timed out %s " % (command, timeout)
@@ -173,7 +304,7 @@ class LiteHelper:
         if not status and command.startswith("uname"):
             raise LiteDeviceTimeout("Execute command time out:%s" % command)
 
-        return result, status, error_message
+        return "".join(results), status, error_message
 
     @staticmethod
     def read_local_output_test(com=None, command=None, timeout=TIMEOUT,
@@ -185,31 +316,33 @@ class LiteHelper:
                 "reports")[0].rstrip("/") + " #"
         error_message = ""
         start_time = time.time()
-        result = ""
         status = True
         from xdevice import Scheduler
 
-        # while time.time() - start_time < timeout:
-        #     data = com.readline().decode('gbk', errors='ignore')
-        #     data = PATTERN.sub('', data).replace("\r", "")
-        #     result = "{}{}".format(result, data)
-        #     if command in result or linux_end_command in result:
-        #         break
-
+        reader = SerialReader(com)
+        checker = ReadEndChecker(input_command)
+        results = []
         while time.time() - start_time < timeout:
             if not Scheduler.is_execute:
                 raise ExecuteTerminate("Execute terminate", error_no="00300")
-            data = com.readline().decode('gbk', errors='ignore')
-            data = PATTERN.sub('', data).replace("\r", "")
-            result = "{}{}".format(result, data)
-            if receiver and data:
-                receiver.__read__(data)
-            if check_read_test_end(result, input_command):
+            data = "".join(reader.read_lines())
+            if data:
+                results.append(data)
+                if receiver:
+                    receiver.__read__(data)
+            if checker.feed(data) or (not checker.line_end and
+                                      checker.check(reader.peek())):
                 break
         else:
             error_message = "execute %s timed out %s " % (command, timeout)
             status = False
 
+        data = "".join(reader.flush())
+        if data:
+            results.append(data)
+            if receiver:
+                receiver.__read__(data)
+        result = "".join(results)
         if receiver:
             receiver.__done__()
 
@@ -221,41 +354,41 @@ class LiteHelper:
     @staticmethod
     def read_local_output_ctest(com=None, command=None, timeout=TIMEOUT,
                                 receiver=None):
-        result = ""
+        results = []
         input_command = command
 
         start = time.time()
+        reader = SerialReader(com)
         from xdevice import Scheduler
-        while True:
+        finished = False
+        while not finished:
             if not Scheduler.is_execute:
                 raise ExecuteTerminate("Execute terminate", error_no="00300")
-            data = com.readline().decode('gbk', errors='ignore')
-            data = PATTERN.sub('', data)
-            if isinstance(input_command, list):
-                if len(data.strip()) > 0:
-                    data = "{} {}".format(get_current_time(), data)
-                    if data and receiver:
-                        receiver.__read__(data.replace("\r", ""))
-                    result = "{}{}".format(result, data.replace("\r", ""))
-                    if re.search(r"\d+\s+Tests\s+\d+\s+Failures\s+\d+\s+"
-                                 r"Ignored", data):
-                        start = time.time()
-                    if CTEST_END_SIGN in data:
-                        break
-                if (int(time.time()) - int(start)) > timeout:
-                    break
-            else:
-                result = "{}{}".format(
-                    result, data.replace("\r", "").replace("\n", "").strip())
-                if AT_CMD_ENDS in data:
-                    return result, True, ""
-                if (int(time.time()) - int(start)) > timeout:
-                    return result, False, ""
+            for data in reader.read_lines():
+                if isinstance(input_command, list):
+                    if len(data.strip()) > 0:
+                        data = "{} {}".format(get_current_time(), data)
+                        if receiver:
+                            receiver.__read__(data)
+                        results.append(data)
+                        if CTEST_RESULT_PATTERN.search(data):
+                            start = time.time()
+                        if CTEST_END_SIGN in data:
+                            finished = True
+                            break
+                else:
+                    results.append(data.replace("\n", "").strip())
+                    if AT_CMD_ENDS in data:
+                        return "".join(results), True, ""
+            if not finished and (int(time.time()) - int(start)) > timeout:
+                if not isinstance(input_command, list):
+                    return "".join(results), False, ""
+                break
 
         if receiver:
             receiver.__done__()
         LOG.info('Info: execute command success')
-        return result, True, ""
+        return "".join(results), True, ""
 
     @staticmethod
     def read_local_output(com=None, command=None, case_type="",
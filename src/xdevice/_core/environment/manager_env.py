@@ -88,13 +88,16 @@ class EnvironmentManager(object):
         EnvironmentManager.__init_flag = True
 
     def env_start(self, environment="", user_config_file=""):
-
-        log_level_dict = UserConfigManager(
-            config_file=user_config_file, env=environment).get_log_level()
+        from xdevice import Variables
+        user_config_manager = UserConfigManager(
+            config_file=user_config_file, env=environment)
+        log_level_dict = user_config_manager.get_log_level()
 
         if log_level_dict:
             # change log level when load or reset EnvironmentManager object
             change_logger_level(log_level_dict)
+        Variables.report_vars.archive_format = \
+            user_config_manager.get_archive_format() or "zip"
 
         manager_plugins = get_plugin(Plugin.MANAGER)
         for manager_plugin in manager_plugins:
@@ -188,6 +191,12 @@ class EnvironmentManager(object):
         for manager in self.managers.values():
             manager.list_devices()
 
+    def get_device_count(self):
+        device_count = 0
+        for manager in self.managers.values():
+            device_count += len(getattr(manager, "devices_list", []))
+        return device_count
+
 
 class DeviceSelectionOption(object):
     """
@@ -25,7 +25,7 @@ from _core.constants import ManagerType
 from _core.environment.manager_env import DeviceAllocationState
 from _core.exception import LiteDeviceError
 from _core.plugin import Plugin
-from _core.plugin import get_plugin
+from _core.plugin import create_plugin
 from _core.interface import IDeviceManager
 from _core.logger import platform_logger
 from _core.utils import convert_ip
@@ -49,16 +49,15 @@ class ManagerLite(IDeviceManager):
         self.support_labels = ["ipcamera", "wifiiot", "watchGT"]
 
     def init_environment(self, environment="", user_config_file=""):
-        device_lite = get_plugin(plugin_type=Plugin.DEVICE,
-                                 plugin_id=DeviceOsType.lite)[0]
-
         devices = UserConfigManager(
             config_file=user_config_file, env=environment).get_com_device(
             "environment/device")
 
         for device in devices:
             try:
-                device_lite_instance = device_lite.__class__()
+                device_lite_instance = create_plugin(
+                    plugin_type=Plugin.DEVICE, plugin_id=DeviceOsType.lite,
+                    limit=1)[0]
                 device_lite_instance.__init_device__(device)
                 device_lite_instance.device_allocation_state = \
                     DeviceAllocationState.available
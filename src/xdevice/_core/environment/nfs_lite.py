@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import atexit
+import os
+import platform
+import queue
+import select
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _core.logger import platform_logger
+
+__all__ = ["SftpSession", "SftpSessionPool", "NfsResultWatcher",
+           "is_remote_nfs"]
+
+LOG = platform_logger("NfsLite")
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+WATCH_POLL_INTERVAL = 0.5
+# inotify may miss changes made through an nfs client mount, so check again
+WATCH_MAX_WAIT = 1
+# a result file is ready when its size and mtime stay unchanged this long
+WATCH_SETTLE_TIME = 0.2
+SFTP_KEEPALIVE_INTERVAL = 30
+SFTP_IDLE_TIMEOUT = 300
+SFTP_UPLOAD_WORKERS = 4
+
+
+def is_remote_nfs(remote_nfs):
+    return str(remote_nfs.get("remote", "")).lower() == "true"
+
+
+class SftpSession:
+    """
+    A pooled ssh transport to a nfs server and its sftp client, used as a
+    context manager to return it to the pool.
+    """
+
+    def __init__(self, key, transport, sftp):
+        self.key = key
+        self.transport = transport
+        self.sftp = sftp
+        self.users = 0
+        self.last_used = time.time()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        SftpSessionPool.release(self)
+
+    def is_broken(self):
+        return not self.transport.is_active() or \
+            self.sftp.get_channel().closed
+
+    def open_sftp(self):
+        """
+        Opens another sftp channel on the transport for a parallel worker.
+        """
+        import paramiko
+        return paramiko.SFTPClient.from_transport(self.transport)
+
+    def close(self):
+        try:
+            self.sftp.close()
+            self.transport.close()
+        except Exception as error:
+            LOG.debug("close sftp session error: %s" % error)
+
+
+class SftpSessionPool:
+    """
+    Keeps one sftp session per nfs server and user for the whole process,
+    sessions idle for longer than SFTP_IDLE_TIMEOUT are closed.
+    """
+    _sessions = dict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_key(cls, remote_nfs):
+        return (remote_nfs.get("ip"), int(remote_nfs.get("port")),
+                remote_nfs.get("username"))
+
+    @classmethod
+    def acquire(cls, remote_nfs):
+        key = cls._get_key(remote_nfs)
+        with cls._lock:
+            cls._evict_idle()
+            session = cls._sessions.get(key)
+            if session and session.is_broken():
+                del cls._sessions[key]
+                session.close()
+                session = None
+            if not session:
+                session = cls._open_session(key, remote_nfs)
+                cls._sessions[key] = session
+            session.users += 1
+            return session
+
+    @classmethod
+    def release(cls, session):
+        with cls._lock:
+            session.users -= 1
+            session.last_used = time.time()
+            if not session.is_broken():
+                return
+            if cls._sessions.get(session.key) is session:
+                del cls._sessions[session.key]
+        LOG.debug("sftp session to %s:%s is broken" % session.key[:2])
+        session.close()
+
+    @classmethod
+    def close_all(cls):
+        with cls._lock:
+            sessions = list(cls._sessions.values())
+            cls._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    @classmethod
+    def upload_files(cls, remote_nfs, file_paths, remote_dir, workers=1):
+        """
+        Uploads files to remote_dir of the nfs server, skipping the files
+        whose remote size and mtime already match, with workers sftp
+        channels in parallel. Returns a dict of the failed files and errors.
+        """
+        failures = dict()
+        uploaded = []
+        with cls.acquire(remote_nfs) as session:
+            if workers <= 1 or len(file_paths) <= 1:
+                for file_path in file_paths:
+                    cls._upload_file(session.sftp, file_path, remote_dir,
+                                     uploaded, failures)
+            else:
+                file_queue = queue.Queue()
+                for file_path in file_paths:
+                    file_queue.put(file_path)
+
+                def _upload_worker():
+                    sftp = session.open_sftp()
+                    try:
+                        while True:
+                            try:
+                                file_path = file_queue.get_nowait()
+                            except queue.Empty:
+                                break
+                            cls._upload_file(sftp, file_path, remote_dir,
+                                             uploaded, failures)
+                    finally:
+                        sftp.close()
+
+                with ThreadPoolExecutor(
+                        min(workers, len(file_paths))) as executor:
+                    for future in [executor.submit(_upload_worker) for _ in
+                                   range(min(workers, len(file_paths)))]:
+                        future.result()
+        LOG.debug("upload %s files to %s:%s, %s skipped, %s failed" % (
+            len(uploaded), session.key[0], remote_dir,
+            len(file_paths) - len(uploaded) - len(failures), len(failures)))
+        return failures
+
+    @classmethod
+    def _upload_file(cls, sftp, file_path, remote_dir, uploaded, failures):
+        import paramiko
+        remote_path = "%s/%s" % (remote_dir.rstrip("/"),
+                                 os.path.basename(file_path))
+        try:
+            local_stat = os.stat(file_path)
+            try:
+                remote_stat = sftp.stat(remote_path)
+                if remote_stat.st_size == local_stat.st_size and \
+                        int(remote_stat.st_mtime) == int(local_stat.st_mtime):
+                    return
+            except FileNotFoundError:
+                pass
+            sftp.put(localpath=file_path, remotepath=remote_path)
+            # keep the local mtime to skip the file next time
+            sftp.utime(remote_path, (local_stat.st_atime,
+                                     local_stat.st_mtime))
+            uploaded.append(file_path)
+        except (OSError, EOFError, paramiko.SSHException) as error:
+            failures[file_path] = error
+
+    @classmethod
+    def _open_session(cls, key, remote_nfs):
+        import paramiko
+        transport = paramiko.Transport((key[0], key[1]))
+        try:
+            transport.connect(username=remote_nfs.get("username"),
+                              password=remote_nfs.get("password"))
+            transport.set_keepalive(SFTP_KEEPALIVE_INTERVAL)
+            sftp = paramiko.SFTPClient.from_transport(transport)
+        except Exception:
+            transport.close()
+            raise
+        LOG.debug("open sftp session to %s:%s" % (key[0], key[1]))
+        return SftpSession(key, transport, sftp)
+
+    @classmethod
+    def _evict_idle(cls):
+        now = time.time()
+        for key, session in list(cls._sessions.items()):
+            if session.users or now - session.last_used < SFTP_IDLE_TIMEOUT:
+                continue
+            del cls._sessions[key]
+            LOG.debug("close idle sftp session to %s:%s" % key[:2])
+            session.close()
+
+
+class NfsResultWatcher:
+    """
+    Waits on the host side for result files written by the device to the
+    nfs directory, by inotify for a local nfs export and by the pooled sftp
+    session for a remote one.
+    """
+
+    def __init__(self, remote_nfs, directory):
+        self.remote_nfs = remote_nfs
+        self.directory = directory
+        self.remote = is_remote_nfs(remote_nfs)
+        self.inotify_fd = None
+        self.file_states = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def wait_for(self, file_names, timeout):
+        """
+        Returns the first of file_names which is written completely, or
+        None if none of them is ready within timeout in seconds.
+        """
+        end_time = time.time() + timeout
+        while True:
+            for file_name in file_names:
+                if self._is_ready(file_name):
+                    return file_name
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                return None
+            self._wait(remaining)
+
+    def close(self):
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+
+    def _is_ready(self, file_name):
+        state = self._stat(file_name)
+        if not state or not state[0]:
+            self.file_states.pop(file_name, None)
+            return False
+        last_state = self.file_states.get(file_name)
+        if not last_state or last_state[0] != state:
+            self.file_states[file_name] = (state, time.time())
+            return False
+        return time.time() - last_state[1] >= WATCH_SETTLE_TIME
+
+    def _stat(self, file_name):
+        file_path = "%s/%s" % (self.directory.rstrip("/"), file_name)
+        try:
+            if self.remote:
+                file_stat = self._stat_remote(file_path)
+            else:
+                file_stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError) as error:
+            LOG.debug("stat %s error: %s" % (file_path, error))
+            return None
+        if file_stat is None:
+            return None
+        return file_stat.st_size, file_stat.st_mtime
+
+    def _stat_remote(self, file_path):
+        import paramiko
+        try:
+            with SftpSessionPool.acquire(self.remote_nfs) as session:
+                return session.sftp.stat(file_path)
+        except paramiko.SSHException as error:
+            LOG.debug("stat %s error: %s" % (file_path, error))
+            return None
+
+    def _wait(self, timeout):
+        if self.file_states:
+            # a file is being written, wait for it to settle
+            time.sleep(min(timeout, WATCH_SETTLE_TIME))
+            return
+        if not self.remote and self._init_inotify():
+            readable, _, _ = select.select([self.inotify_fd], [], [],
+                                           min(timeout, WATCH_MAX_WAIT))
+            if readable:
+                try:
+                    os.read(self.inotify_fd, 4096)
+                except (BlockingIOError, InterruptedError):
+                    pass
+            return
+        time.sleep(min(timeout, WATCH_POLL_INTERVAL))
+
+    def _init_inotify(self):
+        if self.inotify_fd is not None:
+            return True
+        if platform.system() != "Linux" or not os.path.isdir(self.directory):
+            return False
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            inotify_fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if inotify_fd < 0:
+                return False
+            if libc.inotify_add_watch(
+                    inotify_fd, os.fsencode(self.directory),
+                    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+                os.close(inotify_fd)
+                return False
+            self.inotify_fd = inotify_fd
+            return True
+        except (OSError, AttributeError) as error:
+            LOG.debug("inotify is not available: %s" % error)
+            return False
+
+
+atexit.register(SftpSessionPool.close_all)
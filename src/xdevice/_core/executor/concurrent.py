@@ -19,11 +19,12 @@
 import copy
 import os
 import shutil
-import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import wait
 
+from _core.context import TaskContext
+from _core.context import TaskThread
 from _core.constants import ModeType
 from _core.constants import ConfigConst
 from _core.executor.request import Request
@@ -61,6 +62,7 @@ class Concurrent:
         :param max_size:  the max size of thread  you wanted  in thread pool
         :return:
         """
+        func = TaskContext.current().wrap(func)
         with ThreadPoolExecutor(max_size) as executor:
             future_params = dict()
             for params in params_list:
@@ -74,9 +76,9 @@ class Concurrent:
             return result_list
 
 
-class DriversThread(threading.Thread):
+class DriversThread(TaskThread):
     def __init__(self, test_driver, task, environment, message_queue):
-        threading.Thread.__init__(self)
+        TaskThread.__init__(self)
         self.test_driver = test_driver
         self.listeners = None
         self.task = task
@@ -463,10 +465,10 @@ class DriversThread(threading.Thread):
             return history_execute_result
 
 
-class QueueMonitorThread(threading.Thread):
+class QueueMonitorThread(TaskThread):
 
     def __init__(self, message_queue, current_driver_threads, test_drivers):
-        threading.Thread.__init__(self)
+        TaskThread.__init__(self)
         self.message_queue = message_queue
         self.current_driver_threads = current_driver_threads
         self.test_drivers = test_drivers
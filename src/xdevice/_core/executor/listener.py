@@ -17,13 +17,18 @@
 #
 
 import os
+import queue
+import threading
+import time
 import uuid
 from dataclasses import dataclass
 
+from _core.context import TaskContext
 from _core.plugin import Plugin
 from _core.plugin import get_plugin
 from _core.constants import ListenerType
 from _core.constants import TestType
+from _core.constants import ModeType
 from _core.interface import LifeCycle
 from _core.interface import IListener
 from _core.logger import platform_logger
@@ -32,7 +37,7 @@ from _core.report.suite_reporter import ResultCode
 from _core.report.encrypt import check_pub_key_exist
 
 __all__ = ["LogListener", "ReportListener", "UploadListener",
-           "CollectingTestListener", "CollectingLiteGTestListener",
+           "UploadBatcher", "CollectingTestListener", "CollectingLiteGTestListener",
            "CaseResult", "SuiteResult", "SuitesResult", "StateRecorder",
            "TestDescription"]
 
@@ -131,19 +136,46 @@ class StateRecorder:
 
 
 class TestDescription(object):
+    """
+    Immutable and hashable identity of a test case, to be kept in sets and
+    as dict keys.
+    """
+    __slots__ = ("class_name", "test_name")
+
     def __init__(self, class_name, test_name):
-        self.class_name = class_name
-        self.test_name = test_name
+        object.__setattr__(self, "class_name", class_name)
+        object.__setattr__(self, "test_name", test_name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TestDescription is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("TestDescription is immutable")
 
     def __eq__(self, other):
+        if not isinstance(other, TestDescription):
+            return NotImplemented
         return self.class_name == other.class_name and \
-               self.test_name == other.test_name
+            self.test_name == other.test_name
+
+    def __hash__(self):
+        return hash((self.class_name, self.test_name))
+
+    def __reduce__(self):
+        return self.__class__, (self.class_name, self.test_name)
+
+    def __repr__(self):
+        return "%s#%s" % (self.class_name, self.test_name)
 
     @classmethod
     def remove_test(cls, tests, execute_tests):
-        for execute_test in execute_tests:
-            if execute_test in tests:
-                tests.remove(execute_test)
+        """
+        Removes execute_tests from tests in place, keeping the order of the
+        tests left.
+        """
+        execute_tests = set(execute_tests)
+        if execute_tests:
+            tests[:] = [test for test in tests if test not in execute_tests]
         return tests
 
 
@@ -308,7 +340,9 @@ class ReportListener(IListener):
                 product_info = kwargs.get("product_info", "")
                 suite_report = SuiteReporter(self.result, suites_name,
                                              result_dir,
-                                             product_info=product_info)
+                                             product_info=product_info,
+                                             launches=kwargs.get(
+                                                 "launches", 0))
                 suite_report.generate_data_report()
         elif lifecycle == LifeCycle.TestCase:
             test = self._get_test_result(test_result=test_result, create=False)
@@ -344,16 +378,176 @@ class ReportListener(IListener):
             test.code = ResultCode.FAILED.value
 
 
+class UploadBatcher(threading.Thread):
+    """
+    send case results to the upload agent in batches, a batch is sent when
+    it reaches batch_size cases or has waited for batch_interval seconds
+    """
+
+    def __init__(self, max_size=10000, batch_size=50, batch_interval=2):
+        threading.Thread.__init__(self)
+        self.case_queue = queue.Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        # results sent successfully, {case id: result}
+        self.uploaded_results = dict()
+        self.is_running = True
+        # count of the cases put but not sent yet, guarded by pending_con
+        self.pending = 0
+        self.flushing = 0
+        self.pending_con = threading.Condition()
+        self.metrics_lock = threading.Lock()
+        self.metrics = {"sent": 0, "dropped": 0, "batches": 0,
+                        "max_depth": 0, "max_latency": 0, "total_latency": 0}
+
+    def put(self, case):
+        """
+        put case into queue without blocking the listener thread
+        :return: False if the queue is full, then the case is left to the
+                 end-of-module upload
+        """
+        with self.pending_con:
+            self.pending += 1
+        try:
+            self.case_queue.put_nowait((time.time(), case))
+        except queue.Full:
+            self._finish_pending(1)
+            with self.metrics_lock:
+                self.metrics["dropped"] += 1
+            return False
+        with self.metrics_lock:
+            self.metrics["max_depth"] = max(self.metrics["max_depth"],
+                                            self.case_queue.qsize())
+        return True
+
+    def is_uploaded(self, case_id, result):
+        """
+        whether the result of case_id has been sent, a different result of
+        the end-of-module upload overrides the streamed one
+        """
+        with self.pending_con:
+            return self.uploaded_results.get(case_id) == result
+
+    def flush(self, timeout=30):
+        """
+        wait until the cases put before have been sent or failed
+        """
+        end_time = time.time() + timeout
+        with self.pending_con:
+            self.flushing += 1
+            try:
+                while self.pending and self.is_alive():
+                    remaining = end_time - time.time()
+                    if remaining <= 0:
+                        break
+                    self.pending_con.wait(remaining)
+            finally:
+                self.flushing -= 1
+
+    def run(self):
+        batch = []
+        batch_start = time.time()
+        while self.is_running or not self.case_queue.empty():
+            timeout = max(self.batch_interval - (time.time() - batch_start),
+                          0.01)
+            if self.flushing:
+                timeout = 0.01
+            try:
+                batch.append(self.case_queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+            if len(batch) >= self.batch_size or (batch and time.time() -
+                                                 batch_start >=
+                                                 self.batch_interval) or (
+                    batch and self.flushing and self.case_queue.empty()):
+                self._send(batch)
+                batch = []
+            if not batch:
+                batch_start = time.time()
+        if batch:
+            self._send(batch)
+
+    def stop(self, timeout=30):
+        self.is_running = False
+        if self.is_alive():
+            self.join(timeout)
+        LOG.debug("upload metrics: %s" % self.get_metrics())
+
+    def get_metrics(self):
+        with self.metrics_lock:
+            metrics = dict(self.metrics)
+        metrics["depth"] = self.case_queue.qsize()
+        metrics["avg_latency"] = round(
+            metrics["total_latency"] / metrics["sent"], 3) if \
+            metrics["sent"] else 0
+        return metrics
+
+    def _send(self, batch):
+        from xdevice import Scheduler
+        upload_suite = [case for _, case in batch]
+        try:
+            if Scheduler.proxy:
+                for case in upload_suite:
+                    Scheduler.proxy.upload_result(
+                        case.get("caseid"), case.get("result"),
+                        case.get("error"), case.get("start"),
+                        case.get("end"), case.get("report"))
+            else:
+                from agent.factory import upload_batch
+                upload_batch(upload_suite)
+        except (ModuleNotFoundError, AttributeError, ValueError,
+                TypeError, OSError) as error:
+            # failed cases are left to the end-of-module upload
+            LOG.error("upload batch error: %s" % error, error_no="00201")
+            self._finish_pending(len(batch))
+            return
+        send_time = time.time()
+        with self.metrics_lock:
+            for put_time, _ in batch:
+                latency = send_time - put_time
+                self.metrics["total_latency"] += latency
+                self.metrics["max_latency"] = round(
+                    max(self.metrics["max_latency"], latency), 3)
+            self.metrics["sent"] += len(batch)
+            self.metrics["batches"] += 1
+        self._finish_pending(len(batch), upload_suite)
+
+    def _finish_pending(self, count, uploaded_cases=None):
+        with self.pending_con:
+            for case in uploaded_cases or []:
+                self.uploaded_results[case.get("caseid")] = case.get("result")
+            self.pending -= count
+            self.pending_con.notify_all()
+
+
 @Plugin(type=Plugin.LISTENER, id=ListenerType.upload)
 class UploadListener(IListener):
+    """
+    listener upload case result to the upload agent as soon as case ended
+    """
+    # batchers of the tasks, {task context: batcher}
+    batchers = dict()
+    batcher_lock = threading.Lock()
+
+    def __init__(self):
+        self.suite_name = ""
+        self.report_path = ""
+
     def __started__(self, lifecycle, test_result):
-        pass
+        if lifecycle == LifeCycle.TestSuite:
+            self.suite_name = test_result.suite_name
 
-    @staticmethod
-    def __ended__(lifecycle, test_result, **kwargs):
-        del test_result, kwargs
-        if lifecycle == LifeCycle.TestCase:
-            pass
+    def __ended__(self, lifecycle, test_result, **kwargs):
+        del kwargs
+        if lifecycle != LifeCycle.TestCase:
+            return
+        from xdevice import Scheduler
+        if not Scheduler.upload_address or \
+                Scheduler.mode == ModeType.developer:
+            return
+        case = self._get_upload_case(test_result)
+        if case:
+            self.get_batcher().put(case)
 
     @staticmethod
     def __skipped__(lifecycle, test_result, **kwargs):
@@ -363,6 +557,59 @@ class UploadListener(IListener):
     def __failed__(lifecycle, test_result, **kwargs):
         pass
 
+    def _get_upload_case(self, test_result):
+        from xdevice import Scheduler
+        if test_result.code == ResultCode.PASSED.value:
+            result = "Passed"
+        elif test_result.code == ResultCode.FAILED.value:
+            result = "Failed"
+        elif test_result.code == ResultCode.SKIPPED.value:
+            return None
+        else:
+            result = "Blocked"
+        error = str(test_result.stacktrace or "")
+        if len(error) > 150:
+            error = "%s..." % error[:150]
+        end_time = int(time.time() * 1000)
+        start_time = end_time - int(test_result.run_time or 0)
+        case_id = "{}#{}#{}#{}".format(Scheduler.task_name, self.suite_name,
+                                       test_result.test_class,
+                                       test_result.test_name)
+        task_log_path = os.path.join(self.report_path, "log", "task_log.log")
+        return {"caseid": case_id, "result": result, "error": error,
+                "start": start_time, "end": end_time,
+                "report": task_log_path}
+
+    @classmethod
+    def get_batcher(cls):
+        context = TaskContext.current()
+        with cls.batcher_lock:
+            batcher = cls.batchers.get(context)
+            if batcher is None:
+                batcher = UploadBatcher()
+                batcher.setDaemon(True)
+                batcher.start()
+                cls.batchers[context] = batcher
+            return batcher
+
+    @classmethod
+    def is_uploaded(cls, case_id, result):
+        batcher = cls.batchers.get(TaskContext.current())
+        return batcher is not None and batcher.is_uploaded(case_id, result)
+
+    @classmethod
+    def flush_upload(cls):
+        batcher = cls.batchers.get(TaskContext.current())
+        if batcher is not None:
+            batcher.flush()
+
+    @classmethod
+    def stop_upload(cls):
+        with cls.batcher_lock:
+            batcher = cls.batchers.pop(TaskContext.current(), None)
+        if batcher is not None:
+            batcher.stop()
+
 
 @Plugin(type=Plugin.LISTENER, id=ListenerType.collect)
 class CollectingTestListener(IListener):
@@ -371,7 +618,8 @@ class CollectingTestListener(IListener):
     """
 
     def __init__(self):
-        self.tests = []
+        # an insertion ordered set of the collected tests
+        self.tests = dict()
 
     def __started__(self, lifecycle, test_result):
         if lifecycle == LifeCycle.TestCase:
@@ -379,8 +627,7 @@ class CollectingTestListener(IListener):
                 return
             test = TestDescription(test_result.test_class,
                                    test_result.test_name)
-            if test not in self.tests:
-                self.tests.append(test)
+            self.tests.setdefault(test)
 
     def __ended__(self, lifecycle, test_result=None, **kwargs):
         pass
@@ -392,7 +639,7 @@ class CollectingTestListener(IListener):
         pass
 
     def get_current_run_results(self):
-        return self.tests
+        return list(self.tests)
 
 
 @Plugin(type=Plugin.LISTENER, id=ListenerType.collect_lite)
@@ -402,7 +649,8 @@ class CollectingLiteGTestListener(IListener):
     """
 
     def __init__(self):
-        self.tests = []
+        # an insertion ordered set of the collected tests
+        self.tests = dict()
 
     def __started__(self, lifecycle, test_result):
         if lifecycle == LifeCycle.TestCase:
@@ -410,8 +658,7 @@ class CollectingLiteGTestListener(IListener):
                 return
             test = TestDescription(test_result.test_class,
                                    test_result.test_name)
-            if test not in self.tests:
-                self.tests.append(test)
+            self.tests.setdefault(test)
 
     def __ended__(self, lifecycle, test_result=None, **kwargs):
         pass
@@ -425,8 +672,7 @@ class CollectingLiteGTestListener(IListener):
                 return
             test = TestDescription(test_result.test_class,
                                    test_result.test_name)
-            if test not in self.tests:
-                self.tests.append(test)
+            self.tests.setdefault(test)
 
     def get_current_run_results(self):
-        return self.tests
+        return list(self.tests)
@@ -76,7 +76,7 @@ class Task:
 
         self.config.update(config.__dict__)
         if getattr(config, ConfigConst.report_path, "") == "":
-            Variables.task_name = start_time.strftime('%Y-%m-%d-%H-%M-%S')
+            Variables.task_name = self._get_unique_task_name(start_time)
         else:
             Variables.task_name = config.report_path
 
@@ -191,6 +191,26 @@ class Task:
         for desc in test_descriptor.children:
             self._init_driver(desc)
 
+    @classmethod
+    def _get_unique_task_name(cls, start_time):
+        """
+        create the report folder named by start time, with a suffix if
+        another task started in the same second
+        """
+        from xdevice import Variables
+        task_name = start_time.strftime('%Y-%m-%d-%H-%M-%S')
+        report_dir = os.path.join(Variables.exec_dir,
+                                  Variables.report_vars.report_dir)
+        os.makedirs(report_dir, exist_ok=True)
+        index = 0
+        while True:
+            unique_name = "%s-%s" % (task_name, index) if index else task_name
+            try:
+                os.mkdir(os.path.join(report_dir, unique_name))
+                return unique_name
+            except FileExistsError:
+                index += 1
+
     @classmethod
     def _check_report_path(cls, report_path):
         for _, _, files in os.walk(report_path):
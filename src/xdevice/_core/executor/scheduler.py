@@ -24,6 +24,9 @@ import time
 import uuid
 from xml.etree import ElementTree
 
+from _core.context import TaskContext
+from _core.context import TaskScoped
+from _core.context import TaskScopedMeta
 from _core.utils import unique_id
 from _core.utils import check_mode
 from _core.utils import get_sub_path
@@ -32,6 +35,7 @@ from _core.utils import convert_serial
 from _core.utils import get_instance_name
 from _core.utils import is_config_str
 from _core.utils import check_result_report
+from _core.config.resource_manager import ResourceManager
 from _core.environment.manager_env import EnvironmentManager
 from _core.environment.manager_env import DeviceSelectionOption
 from _core.exception import ParamError
@@ -42,7 +46,7 @@ from _core.interface import LifeCycle
 from _core.executor.request import Request
 from _core.executor.request import Task
 from _core.executor.request import Descriptor
-from _core.plugin import get_plugin
+from _core.plugin import create_plugin
 from _core.plugin import Plugin
 from _core.plugin import Config
 from _core.report.reporter_helper import ExecInfo
@@ -62,6 +66,7 @@ from _core.executor.source import TestSetSource
 from _core.executor.source import find_test_descriptors
 from _core.executor.source import find_testdict_descriptors
 from _core.executor.source import TestDictSource
+from _core.executor.listener import UploadListener
 from _core.logger import platform_logger
 from _core.logger import add_task_file_handler
 from _core.logger import remove_task_file_handler
@@ -73,25 +78,27 @@ LOG = platform_logger("Scheduler")
 
 
 @Plugin(type=Plugin.SCHEDULER, id=SchedulerType.scheduler)
-class Scheduler(object):
+class Scheduler(object, metaclass=TaskScopedMeta):
     """
     The Scheduler is the main entry point for client code that wishes to
-    discover and execute tests.
+    discover and execute tests. The factory params are held by the context
+    of each task, so that tasks in their own contexts run concurrently.
     """
     # factory params
-    is_execute = True
-    terminate_result = queue.Queue()
-    upload_address = ""
-    task_type = ""
-    task_name = ""
-    mode = ""
-    proxy = None
-
-    # command_queue to store test commands
-    command_queue = []
+    is_execute = TaskScoped(lambda: True)
+    terminate_result = TaskScoped(queue.Queue)
+    upload_address = TaskScoped(str, inherit=True)
+    task_type = TaskScoped(str, inherit=True)
+    task_name = TaskScoped(str, inherit=True)
+    mode = TaskScoped(str, inherit=True)
+    proxy = TaskScoped(lambda: None, inherit=True)
+
+    # command_queue to store test commands, a task context starts with the
+    # commands of the process and adds its command back when executed
+    command_queue = TaskScoped(list, inherit=True, copy_inherited=True)
     max_command_num = 50
     # the number of tests in current task
-    test_number = 0
+    test_number = TaskScoped(int)
 
     def __discover__(self, args):
         """discover task to execute"""
@@ -103,20 +110,43 @@ class Scheduler(object):
         TestDictSource.reset()
         root_descriptor = self._find_test_root_descriptor(task.config)
         task.set_root_descriptor(root_descriptor)
+        ResourceManager.prefetch_resource_data(
+            self._get_resource_xml_filepaths(root_descriptor))
         return task
 
+    @staticmethod
+    def _get_resource_xml_filepaths(root_descriptor):
+        xml_filepaths = set()
+        for descriptor in root_descriptor.children:
+            source_file = getattr(descriptor.source, "source_file", "")
+            if not source_file:
+                continue
+            xml_filepath = os.path.join(os.path.dirname(source_file),
+                                        "resource", "resource_test.xml")
+            if os.path.isfile(xml_filepath):
+                xml_filepaths.add(os.path.abspath(xml_filepath))
+        return xml_filepaths
+
     def __execute__(self, task):
         error_message = ""
+        context = TaskContext.current()
         try:
-            Scheduler.is_execute = True
+            if context.is_process_context():
+                Scheduler.is_execute = True
+            else:
+                # a task context starts executable, keep it if the task has
+                # been terminated before
+                context.register()
             if Scheduler.command_queue:
                 LOG.debug("Run command: %s" % Scheduler.command_queue[-1])
                 run_command = Scheduler.command_queue.pop()
                 task_id = str(uuid.uuid1()).split("-")[0]
-                Scheduler.command_queue.append((task_id, run_command,
-                                                task.config.report_path))
-                if len(Scheduler.command_queue) > self.max_command_num:
-                    Scheduler.command_queue.pop(0)
+                self._append_command((task_id, run_command,
+                                      task.config.report_path))
+                if not context.is_process_context():
+                    with TaskContext.process_context():
+                        self._append_command((task_id, run_command,
+                                              task.config.report_path))
 
             if getattr(task.config, ConfigConst.test_environment, ""):
                 self._reset_environment(task.config.get(
@@ -156,11 +186,19 @@ class Scheduler(object):
             if getattr(task.config, ConfigConst.test_environment, "") or\
                     getattr(task.config, ConfigConst.configfile, ""):
                 self._restore_environment()
+            context.unregister()
 
             if Scheduler.upload_address:
+                UploadListener.stop_upload()
                 Scheduler.upload_task_result(task, error_message)
                 Scheduler.upload_report_end()
 
+    @classmethod
+    def _append_command(cls, command_info):
+        Scheduler.command_queue.append(command_info)
+        if len(Scheduler.command_queue) > cls.max_command_num:
+            Scheduler.command_queue.pop(0)
+
     def _device_test_execute(self, task):
         used_devices = {}
         try:
@@ -246,21 +284,18 @@ class Scheduler(object):
     def _create_listeners(cls, task):
         listeners = []
         # append log listeners
-        log_listeners = get_plugin(Plugin.LISTENER, ListenerType.log)
-        for log_listener in log_listeners:
-            log_listener_instance = log_listener.__class__()
-            listeners.append(log_listener_instance)
+        listeners.extend(create_plugin(Plugin.LISTENER, ListenerType.log))
         # append report listeners
-        report_listeners = get_plugin(Plugin.LISTENER, ListenerType.report)
-        for report_listener in report_listeners:
-            report_listener_instance = report_listener.__class__()
+        report_listeners = create_plugin(Plugin.LISTENER, ListenerType.report)
+        for report_listener_instance in report_listeners:
             setattr(report_listener_instance, "report_path",
                     task.config.report_path)
             listeners.append(report_listener_instance)
         # append upload listeners
-        upload_listeners = get_plugin(Plugin.LISTENER, ListenerType.upload)
-        for upload_listener in upload_listeners:
-            upload_listener_instance = upload_listener.__class__()
+        upload_listeners = create_plugin(Plugin.LISTENER, ListenerType.upload)
+        for upload_listener_instance in upload_listeners:
+            setattr(upload_listener_instance, "report_path",
+                    task.config.report_path)
             listeners.append(upload_listener_instance)
         return listeners
 
@@ -454,6 +489,11 @@ class Scheduler(object):
                     LOG.info("")
                     test_drivers.pop(0)
                     continue
+            # leave a fair share of the devices to the other running tasks
+            if self._is_device_share_used(current_driver_threads):
+                time.sleep(1)
+                continue
+
             # get environment
             try:
                 environment = self.__allocate_environment__(
@@ -505,6 +545,15 @@ class Scheduler(object):
 
         self._do_taskkit_teardown(used_devices, task_unused_env)
 
+    @classmethod
+    def _is_device_share_used(cls, current_driver_threads):
+        if not cls._has_other_tasks():
+            return False
+        task_count = len(TaskContext.get_task_contexts())
+        device_count = EnvironmentManager().get_device_count()
+        return len(current_driver_threads) >= max(1,
+                                                  device_count // task_count)
+
     @classmethod
     def _append_history_result(cls, task, module_name):
         history_report_path = getattr(
@@ -715,14 +764,28 @@ class Scheduler(object):
             self.stop_task_log()
             self.stop_encrypt_log()
 
+    @classmethod
+    def _has_other_tasks(cls):
+        for context in TaskContext.get_task_contexts():
+            if context is not TaskContext.current():
+                return True
+        return False
+
     @classmethod
     def _reset_environment(cls, environment="", config_file=""):
+        if cls._has_other_tasks():
+            raise ParamError("test environment can not be reset while "
+                             "other tasks are running", error_no="00100")
         env_manager = EnvironmentManager()
         env_manager.env_stop()
         EnvironmentManager(environment, config_file)
 
     @classmethod
     def _restore_environment(cls):
+        if cls._has_other_tasks():
+            LOG.warning("test environment is not restored while other "
+                        "tasks are running")
+            return
         env_manager = EnvironmentManager()
         env_manager.env_stop()
         EnvironmentManager()
@@ -736,6 +799,9 @@ class Scheduler(object):
     @classmethod
     def start_encrypt_log(cls, log_path):
         from _core.report.encrypt import check_pub_key_exist
+        from _core.report.encrypt import reset_encrypt_context
+        # key files are resolved once for each task
+        reset_encrypt_context()
         if check_pub_key_exist():
             encrypt_file_name = "task_log.ept"
             encrypt_log_file = os.path.join(log_path, encrypt_file_name)
@@ -782,6 +848,15 @@ class Scheduler(object):
         LOG.info("start to terminate execution")
         return Scheduler.terminate_result.get()
 
+    @classmethod
+    def terminate_task(cls, context):
+        """
+        terminate the task running in context without waiting for it
+        """
+        with context:
+            Scheduler.is_execute = False
+        LOG.info("start to terminate task %s" % context.name)
+
     @classmethod
     def upload_case_result(cls, upload_param):
         if not Scheduler.upload_address:
@@ -821,6 +896,14 @@ class Scheduler(object):
             LOG.error("%s no test case result to upload" % result_file,
                       error_no="00201")
             return
+        # the streamed results are sent before they are compared
+        UploadListener.flush_upload()
+        upload_params = [upload_param for upload_param in upload_params
+                         if not UploadListener.is_uploaded(upload_param[0],
+                                                           upload_param[1])]
+        if not upload_params:
+            LOG.info("%s case results have been uploaded" % result_file)
+            return
         LOG.info("need upload %s case" % len(upload_params))
         upload_suite = []
         for upload_param in upload_params:
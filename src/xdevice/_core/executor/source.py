@@ -19,8 +19,12 @@
 import os
 import json
 import copy
+import hashlib
+import tempfile
 from collections import namedtuple
 
+from _core.context import TaskScoped
+from _core.context import TaskScopedMeta
 from _core.constants import DeviceTestType
 from _core.constants import ModeType
 from _core.constants import HostDrivenTestType
@@ -52,6 +56,7 @@ PY_SUFFIX = ".py"
 PYD_SUFFIX = ".pyd"
 MODULE_CONFIG_SUFFIX = ".json"
 MAX_DIR_DEPTH = 6
+TESTCASES_INDEX_VERSION = 1
 LOG = platform_logger("TestSource")
 
 
@@ -78,33 +83,222 @@ def find_test_descriptors(config):
 def _get_testcases_dirs(config):
     from xdevice import Variables
     # add config.testcases_path and its subfolders
-    testcases_dirs = []
+    testcases_dirs = TestcasesDirs()
     if getattr(config, "testcases_path", ""):
-        testcases_dirs = [config.testcases_path]
-        _append_subfolders(config.testcases_path, testcases_dirs)
+        testcases_dirs.add_tree(
+            TestcasesIndex.get_index(config.testcases_path))
 
     # add inner testcases dir and its subfolders
     inner_testcases_dir = os.path.abspath(os.path.join(
         Variables.top_dir, "testcases"))
     if getattr(config, "testcases_path", "") and os.path.normcase(
             config.testcases_path) != os.path.normcase(inner_testcases_dir):
-        testcases_dirs.append(inner_testcases_dir)
-        _append_subfolders(inner_testcases_dir, testcases_dirs)
+        testcases_dirs.add_tree(TestcasesIndex.get_index(inner_testcases_dir))
 
     # add execution dir and top dir
-    testcases_dirs.append(Variables.exec_dir)
+    testcases_dirs.add_dir(Variables.exec_dir)
     if os.path.normcase(Variables.exec_dir) != os.path.normcase(
             Variables.top_dir):
-        testcases_dirs.append(Variables.top_dir)
+        testcases_dirs.add_dir(Variables.top_dir)
 
-    LOG.debug("testcases directories: %s", testcases_dirs)
+    LOG.debug("testcases directories: %s", len(testcases_dirs.dirs))
     return testcases_dirs
 
 
-def _append_subfolders(testcases_path, testcases_dirs):
-    for root, dirs, _ in os.walk(testcases_path):
-        for sub_dir in dirs:
-            testcases_dirs.append(os.path.abspath(os.path.join(root, sub_dir)))
+class TestcasesIndex:
+    """
+    Index of the subfolders and files under a testcases directory, built in
+    one scandir pass and persisted in the temp directory. A cached folder is
+    listed again only when its mtime changes.
+    """
+    _indexes = dict()
+
+    def __init__(self, root):
+        self.root = root
+        # folder path -> [mtime_ns, file names, folder names, link names]
+        self.entries = dict()
+        # subfolders in the order of os.walk
+        self.sub_dirs = []
+
+    @classmethod
+    def get_index(cls, root):
+        root = os.path.abspath(root)
+        index = cls._indexes.get(root)
+        if index is None:
+            index = cls(root)
+            index._load()
+            cls._indexes[root] = index
+        if index._refresh():
+            index._save()
+        return index
+
+    def _refresh(self):
+        entries = dict()
+        sub_dirs = []
+        changed = False
+        dir_stack = [self.root]
+        while dir_stack:
+            dir_path = dir_stack.pop()
+            entry, listed = self._list_dir(dir_path)
+            changed = changed or listed
+            if entry is None:
+                continue
+            entries[dir_path] = entry
+            dir_paths = [os.path.join(dir_path, name) for name in entry[2]]
+            sub_dirs.extend(dir_paths)
+            # symbolic links to folders are not followed, as os.walk
+            links = set(entry[3])
+            dir_stack.extend(reversed(
+                [sub_dir for name, sub_dir in zip(entry[2], dir_paths)
+                 if name not in links]))
+        changed = changed or len(entries) != len(self.entries)
+        self.entries = entries
+        self.sub_dirs = sub_dirs
+        return changed
+
+    def _list_dir(self, dir_path):
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return None, False
+        entry = self.entries.get(dir_path)
+        if entry and entry[0] == mtime:
+            return entry, False
+        files, dirs, links = [], [], []
+        try:
+            with os.scandir(dir_path) as items:
+                for item in items:
+                    try:
+                        is_dir = item.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        files.append(item.name)
+                        continue
+                    dirs.append(item.name)
+                    if item.is_symlink():
+                        links.append(item.name)
+        except OSError as error:
+            LOG.debug("list %s error: %s" % (dir_path, error))
+            return None, True
+        return [mtime, files, dirs, links], True
+
+    def _get_cache_file(self):
+        return os.path.join(tempfile.gettempdir(), "xdevice_testcases_%s.json"
+                            % hashlib.sha256(os.fsencode(
+                                self.root)).hexdigest()[:16])
+
+    def _load(self):
+        try:
+            with open(self._get_cache_file(), "r") as cache_file:
+                content = json.load(cache_file)
+            if content.get("version") == TESTCASES_INDEX_VERSION and \
+                    content.get("root") == self.root:
+                self.entries = content.get("entries", dict())
+        except (OSError, ValueError, AttributeError) as error:
+            LOG.debug("load testcases index of %s failed: %s" % (
+                self.root, error))
+
+    def _save(self):
+        cache_file = self._get_cache_file()
+        temp_file = "%s.%s" % (cache_file, os.getpid())
+        try:
+            with open(temp_file, "w") as file_handler:
+                json.dump({"version": TESTCASES_INDEX_VERSION,
+                           "root": self.root, "entries": self.entries},
+                          file_handler)
+            os.replace(temp_file, cache_file)
+        except (OSError, ValueError) as error:
+            LOG.debug("save testcases index of %s failed: %s" % (
+                self.root, error))
+
+
+class TestcasesDirs:
+    """
+    The ordered testcases directories, a test source is found in the first
+    directory which contains it by a lookup in the file name index.
+    """
+
+    def __init__(self):
+        self.dirs = []
+        self.positions = dict()
+        # file name -> indexed folders containing it
+        self.files = dict()
+        self.dir_files = dict()
+        # folders which are not indexed, probed on the file system
+        self.probe_dirs = []
+
+    def add_tree(self, index):
+        for dir_path in [index.root] + index.sub_dirs:
+            entry = index.entries.get(dir_path)
+            self._add(dir_path, entry is None)
+            if entry is None or dir_path in self.dir_files:
+                continue
+            self.dir_files[dir_path] = entry[1]
+            for file_name in entry[1]:
+                self.files.setdefault(file_name, []).append(dir_path)
+
+    def add_dir(self, dir_path):
+        self._add(dir_path, True)
+
+    def _add(self, dir_path, probe):
+        position = len(self.dirs)
+        self.dirs.append(dir_path)
+        self.positions.setdefault(dir_path, position)
+        if probe:
+            self.probe_dirs.append((position, dir_path))
+
+    def find(self, test_source, suffixes):
+        """
+        Returns the path of test_source with the first suffix found, in the
+        first directory containing it, or None if it is not found.
+        """
+        if os.path.isabs(test_source):
+            for suffix in suffixes:
+                if os.path.isfile("%s%s" % (test_source, suffix)):
+                    return "%s%s" % (test_source, suffix)
+            return None
+
+        norm_source = os.path.normpath(test_source)
+        if norm_source.split(os.sep)[0] == os.pardir:
+            return self._probe(test_source, suffixes, list(enumerate(
+                self.dirs)))
+        parent, name = os.path.split(norm_source)
+        found = None
+        for rank, suffix in enumerate(suffixes):
+            for dir_path in self.files.get("%s%s" % (name, suffix), []):
+                base_dir = dir_path
+                if parent:
+                    if not dir_path.endswith("%s%s" % (os.sep, parent)):
+                        continue
+                    base_dir = dir_path[:-len(parent) - 1]
+                position = self.positions.get(base_dir)
+                if position is None or (
+                        found and (position, rank) >= found[:2]):
+                    continue
+                file_path = os.path.join(dir_path, "%s%s" % (name, suffix))
+                if os.path.isfile(file_path):
+                    found = (position, rank, file_path)
+        if parent and not found:
+            # the parent folders may be symbolic links which are not indexed
+            return self._probe(test_source, suffixes, list(enumerate(
+                self.dirs)))
+        probe_dirs = [(position, dir_path) for position, dir_path in
+                      self.probe_dirs if not found or position < found[0]]
+        return self._probe(test_source, suffixes, probe_dirs, found)
+
+    @classmethod
+    def _probe(cls, test_source, suffixes, dirs, found=None):
+        for position, dir_path in dirs:
+            norm_test_source = os.path.abspath(
+                os.path.join(dir_path, test_source))
+            for rank, suffix in enumerate(suffixes):
+                if found and (position, rank) >= found[:2]:
+                    return found[2]
+                file_path = "%s%s" % (norm_test_source, suffix)
+                if os.path.isfile(file_path):
+                    return file_path
+        return found[2] if found else None
 
 
 def find_testdict_descriptors(config):
@@ -134,8 +328,10 @@ def _get_test_sources(config, testcases_dirs):
     # get test sources from testcases_dirs
     if not config.testfile and not config.testlist and not config.testcase \
             and config.task:
-        for testcases_dir in testcases_dirs:
-            _append_module_test_source(testcases_dir, test_sources)
+        for testcases_dir in testcases_dirs.dirs:
+            _append_module_test_source(
+                testcases_dir, test_sources,
+                testcases_dirs.dir_files.get(testcases_dir))
         return test_sources
 
     # get test sources from config.testlist
@@ -165,13 +361,16 @@ def _get_test_sources(config, testcases_dirs):
     return test_sources
 
 
-def _append_module_test_source(testcases_path, test_sources):
-    if not os.path.isdir(testcases_path):
-        return
-    for item in os.listdir(testcases_path):
+def _append_module_test_source(testcases_path, test_sources,
+                               file_names=None):
+    if file_names is None:
+        if not os.path.isdir(testcases_path):
+            return
+        file_names = os.listdir(testcases_path)
+    for item in file_names:
         item_path = os.path.join(testcases_path, item)
-        if os.path.isfile(item_path) and item_path.endswith(
-                MODULE_CONFIG_SUFFIX):
+        if item_path.endswith(MODULE_CONFIG_SUFFIX) and \
+                os.path.isfile(item_path):
             test_sources.append(item_path)
 
 
@@ -183,64 +382,30 @@ def _get_test_file(config, testcases_dirs):
             raise ParamError("test file '%s' not exists" % config.testfile,
                              error_no="00110")
 
-    for testcases_dir in testcases_dirs:
-        test_file = os.path.join(testcases_dir, config.testfile)
-        if os.path.exists(test_file):
-            return test_file
+    test_file = testcases_dirs.find(config.testfile, ("",))
+    if test_file:
+        return test_file
 
     raise ParamError("test file '%s' not exists" % config.testfile)
 
 
 def _normalize_test_sources(testcases_dirs, test_sources, config):
+    # find py or pyd for test case input
+    if config.testcase and not config.testlist:
+        suffixes = (PY_SUFFIX, PYD_SUFFIX)
+    else:
+        suffixes = ("", MODULE_CONFIG_SUFFIX)
     norm_test_sources = []
     for test_source in test_sources:
-        append_result = False
-        for testcases_dir in testcases_dirs:
-            # append test source absolute path
-            append_result = _append_norm_test_source(
-                norm_test_sources, test_source, testcases_dir, config)
-            if append_result:
-                break
-
-        # append test source if no corresponding file founded
-        if not append_result:
-            norm_test_sources.append(test_source)
+        # append test source absolute path, or test source if no
+        # corresponding file founded
+        norm_test_source = testcases_dirs.find(test_source, suffixes)
+        norm_test_sources.append(norm_test_source or test_source)
     if not norm_test_sources:
         raise ParamError("test source not found")
     return norm_test_sources
 
 
-def _append_norm_test_source(norm_test_sources, test_source, testcases_dir,
-                             config):
-    # get norm_test_source
-    norm_test_source = test_source
-    if not os.path.isabs(test_source):
-        norm_test_source = os.path.abspath(
-            os.path.join(testcases_dir, test_source))
-
-    # find py or pyd for test case input
-    if config.testcase and not config.testlist:
-        if os.path.isfile("%s%s" % (norm_test_source, PY_SUFFIX)):
-            norm_test_sources.append(
-                "%s%s" % (norm_test_source, PY_SUFFIX))
-            return True
-        elif os.path.isfile("%s%s" % (norm_test_source, PYD_SUFFIX)):
-            norm_test_sources.append(
-                "%s%s" % (norm_test_source, PYD_SUFFIX))
-            return True
-        return False
-
-    # append to norm_test_sources
-    if os.path.isfile(norm_test_source):
-        norm_test_sources.append(norm_test_source)
-        return True
-    elif os.path.isfile("%s%s" % (norm_test_source, MODULE_CONFIG_SUFFIX)):
-        norm_test_sources.append("%s%s" % (norm_test_source,
-                                           MODULE_CONFIG_SUFFIX))
-        return True
-    return False
-
-
 def _make_test_descriptor(file_path, test_type_key):
     from _core.executor.request import Descriptor
     if test_type_key is None:
@@ -399,9 +564,9 @@ def _parse_module_name(config_file, file_name):
         return file_name
 
 
-class TestDictSource:
-    exe_type = dict()
-    test_type = dict()
+class TestDictSource(metaclass=TaskScopedMeta):
+    exe_type = TaskScoped(dict)
+    test_type = TaskScoped(dict)
 
     @classmethod
     def reset(cls):
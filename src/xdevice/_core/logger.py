@@ -16,11 +16,15 @@
 # limitations under the License.
 #
 
+import atexit
 import logging
 import sys
+import threading
 import time
+from collections import deque
 from logging.handlers import RotatingFileHandler
 
+from _core.context import TaskContext
 from _core.constants import LogType
 from _core.plugin import Plugin
 from _core.plugin import get_plugin
@@ -30,23 +34,23 @@ from _core.exception import ParamError
 __all__ = ["Log", "platform_logger", "device_logger", "shutdown",
            "add_task_file_handler", "remove_task_file_handler",
            "change_logger_level", "add_encrypt_file_handler",
-           "remove_encrypt_file_handler"]
+           "remove_encrypt_file_handler", "flush_log"]
 
 _HANDLERS = []
 _LOGGERS = []
 MAX_LOG_LENGTH = 10 * 1024 * 1024
 MAX_ENCRYPT_LOG_LENGTH = 5 * 1024 * 1024
+MAX_LOG_QUEUE_SIZE = 10000
 
 
 class Log:
-    task_file_handler = None
-
     def __init__(self):
         self.level = logging.INFO
         self.handlers = []
         self.loggers = {}
-        self.task_file_handler = None
-        self.encrypt_file_handler = None
+        # handlers of the tasks, {task context: handler}
+        self.task_file_handlers = dict()
+        self.encrypt_file_handlers = dict()
 
     def __initial__(self, log_handler_flag, log_file=None, level=None,
                     log_format=None):
@@ -59,16 +63,16 @@ class Log:
                 log_file, mode="a", maxBytes=MAX_LOG_LENGTH, backupCount=5,
                 encoding="UTF-8")
             file_handler.setFormatter(logging.Formatter(log_format))
-            self.handlers.append(file_handler)
+            self.handlers.append(AsyncHandler(file_handler))
         if "console" in log_handler_flag:
             stream_handler = logging.StreamHandler(sys.stdout)
             stream_handler.setFormatter(logging.Formatter(log_format))
-            self.handlers.append(stream_handler)
+            self.handlers.append(AsyncHandler(stream_handler))
 
         if level:
             self.level = level
         self.loggers = {}
-        self.task_file_handler = None
+        self.task_file_handlers = dict()
         _HANDLERS.extend(self.handlers)
 
     def set_level(self, level):
@@ -85,8 +89,10 @@ class Log:
             log.platform_log.setLevel(self.level)
             for handler in self.handlers:
                 log.platform_log.addHandler(handler)
-            if self.task_file_handler:
-                log.add_task_log(self.task_file_handler)
+            for handler in list(self.task_file_handlers.values()):
+                log.add_task_log(handler)
+            for handler in list(self.encrypt_file_handlers.values()):
+                log.add_encrypt_log(handler)
             return log
 
     def add_task_file_handler(self, log_file):
@@ -96,17 +102,21 @@ class Log:
                 encoding="UTF-8")
         file_handler.setFormatter(logging.Formatter(
             Variables.report_vars.log_format))
-        self.task_file_handler = file_handler
-        for _, log in self.loggers.items():
-            log.add_task_log(self.task_file_handler)
+        task_file_handler = AsyncHandler(file_handler)
+        task_file_handler.addFilter(TaskContextFilter())
+        self.remove_task_file_handler()
+        self.task_file_handlers[TaskContext.current()] = task_file_handler
+        for _, log in list(self.loggers.items()):
+            log.add_task_log(task_file_handler)
 
     def remove_task_file_handler(self):
-        if self.task_file_handler is None:
+        task_file_handler = self.task_file_handlers.pop(
+            TaskContext.current(), None)
+        if task_file_handler is None:
             return
-        for _, log in self.loggers.items():
-            log.remove_task_log(self.task_file_handler)
-        self.task_file_handler.close()
-        self.task_file_handler = None
+        for _, log in list(self.loggers.items()):
+            log.remove_task_log(task_file_handler)
+        task_file_handler.close()
 
     def add_encrypt_file_handler(self, log_file):
         from xdevice import Variables
@@ -117,17 +127,38 @@ class Log:
                                backup_count=5, encoding="utf-8")
         file_handler.setFormatter(logging.Formatter(
             Variables.report_vars.log_format))
-        self.encrypt_file_handler = file_handler
-        for _, log in self.loggers.items():
-            log.add_encrypt_log(self.encrypt_file_handler)
+        encrypt_file_handler = AsyncHandler(file_handler)
+        encrypt_file_handler.addFilter(TaskContextFilter())
+        self.remove_encrypt_file_handler()
+        self.encrypt_file_handlers[TaskContext.current()] = \
+            encrypt_file_handler
+        for _, log in list(self.loggers.items()):
+            log.add_encrypt_log(encrypt_file_handler)
 
     def remove_encrypt_file_handler(self):
-        if self.encrypt_file_handler is None:
+        encrypt_file_handler = self.encrypt_file_handlers.pop(
+            TaskContext.current(), None)
+        if encrypt_file_handler is None:
             return
-        for _, log in self.loggers.items():
-            log.remove_encrypt_log(self.encrypt_file_handler)
-        self.encrypt_file_handler.close()
-        self.encrypt_file_handler = None
+        for _, log in list(self.loggers.items()):
+            log.remove_encrypt_log(encrypt_file_handler)
+        encrypt_file_handler.close()
+
+
+class TaskContextFilter(logging.Filter):
+    """
+    Passes the records logged in the task context where the filter is
+    created, or all records for the process context, so that the tasks
+    executed together write separate task logs.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.context = TaskContext.current()
+
+    def filter(self, record):
+        return self.context.is_process_context() or \
+            TaskContext.current() is self.context
 
 
 class FrameworkLog:
@@ -147,78 +178,106 @@ class FrameworkLog:
         self.platform_log.setLevel(level)
 
     def add_task_log(self, handler):
-        if self.task_log:
-            return
-        self.task_log = logging.Logger(self.name)
-        log_level = getattr(sys, "log_level", logging.INFO) if hasattr(
-            sys, "log_level") else logging.DEBUG
-        self.task_log.setLevel(log_level)
-        self.task_log.addHandler(handler)
+        task_log = self.task_log
+        if not task_log:
+            task_log = logging.Logger(self.name)
+            log_level = getattr(sys, "log_level", logging.INFO) if hasattr(
+                sys, "log_level") else logging.DEBUG
+            task_log.setLevel(log_level)
+        task_log.addHandler(handler)
+        self.task_log = task_log
 
     def remove_task_log(self, handler):
-        if not self.task_log:
+        task_log = self.task_log
+        if not task_log:
             return
-        self.task_log.removeHandler(handler)
-        self.task_log = None
+        task_log.removeHandler(handler)
+        if not task_log.handlers:
+            self.task_log = None
 
     def add_encrypt_log(self, handler):
-        if self.encrypt_log:
-            return
-        self.encrypt_log = logging.Logger(self.name)
-        log_level = getattr(sys, "log_level", logging.INFO) if hasattr(
-            sys, "log_level") else logging.DEBUG
-        self.encrypt_log.setLevel(log_level)
-        self.encrypt_log.addHandler(handler)
+        encrypt_log = self.encrypt_log
+        if not encrypt_log:
+            encrypt_log = logging.Logger(self.name)
+            log_level = getattr(sys, "log_level", logging.INFO) if hasattr(
+                sys, "log_level") else logging.DEBUG
+            encrypt_log.setLevel(log_level)
+        encrypt_log.addHandler(handler)
+        self.encrypt_log = encrypt_log
 
     def remove_encrypt_log(self, handler):
-        if not self.encrypt_log:
+        encrypt_log = self.encrypt_log
+        if not encrypt_log:
             return
-        self.encrypt_log.removeHandler(handler)
-        self.encrypt_log = None
+        encrypt_log.removeHandler(handler)
+        if not encrypt_log.handlers:
+            self.encrypt_log = None
 
     def info(self, msg, *args, **kwargs):
+        if not self._is_enabled_for(logging.INFO):
+            return
         additional_output = self._get_additional_output(**kwargs)
         updated_msg = self._update_msg(additional_output, msg)
         self.platform_log.info(updated_msg, *args)
-        if self.task_log:
-            self.task_log.info(updated_msg, *args)
-        if self.encrypt_log:
-            self.encrypt_log.info(updated_msg, *args)
+        task_log = self.task_log
+        if task_log:
+            task_log.info(updated_msg, *args)
+        encrypt_log = self.encrypt_log
+        if encrypt_log:
+            encrypt_log.info(updated_msg, *args)
 
     def debug(self, msg, *args, **kwargs):
-        additional_output = self._get_additional_output(**kwargs)
-        updated_msg = self._update_msg(additional_output, msg)
         from _core.report.encrypt import check_pub_key_exist
         if not check_pub_key_exist():
+            if not self._is_enabled_for(logging.DEBUG, self.platform_log,
+                                        self.task_log):
+                return
+            additional_output = self._get_additional_output(**kwargs)
+            updated_msg = self._update_msg(additional_output, msg)
             self.platform_log.debug(updated_msg, *args)
-            if self.task_log:
-                self.task_log.debug(updated_msg, *args)
+            task_log = self.task_log
+            if task_log:
+                task_log.debug(updated_msg, *args)
         else:
-            if self.encrypt_log:
-                self.encrypt_log.debug(updated_msg, *args)
+            encrypt_log = self.encrypt_log
+            if not self._is_enabled_for(logging.DEBUG, encrypt_log):
+                return
+            additional_output = self._get_additional_output(**kwargs)
+            updated_msg = self._update_msg(additional_output, msg)
+            encrypt_log.debug(updated_msg, *args)
 
     def error(self, msg, *args, **kwargs):
+        if not self._is_enabled_for(logging.ERROR):
+            return
         error_no = kwargs.get("error_no", "00000")
         additional_output = self._get_additional_output(error_no, **kwargs)
         updated_msg = self._update_msg(additional_output, msg)
 
         self.platform_log.error(updated_msg, *args)
-        if self.task_log:
-            self.task_log.error(updated_msg, *args)
-        if self.encrypt_log:
-            self.encrypt_log.error(updated_msg, *args)
+        task_log = self.task_log
+        if task_log:
+            task_log.error(updated_msg, *args)
+        encrypt_log = self.encrypt_log
+        if encrypt_log:
+            encrypt_log.error(updated_msg, *args)
 
     def warning(self, msg, *args, **kwargs):
+        if not self._is_enabled_for(logging.WARNING):
+            return
         additional_output = self._get_additional_output(**kwargs)
         updated_msg = self._update_msg(additional_output, msg)
 
         self.platform_log.warning(updated_msg, *args)
-        if self.task_log:
-            self.task_log.warning(updated_msg, *args)
-        if self.encrypt_log:
-            self.encrypt_log.warning(updated_msg, *args)
+        task_log = self.task_log
+        if task_log:
+            task_log.warning(updated_msg, *args)
+        encrypt_log = self.encrypt_log
+        if encrypt_log:
+            encrypt_log.warning(updated_msg, *args)
 
     def exception(self, msg, *args, **kwargs):
+        if not self._is_enabled_for(logging.ERROR):
+            return
         error_no = kwargs.get("error_no", "00000")
         exc_info = kwargs.get("exc_info", True)
         if exc_info is not True and exc_info is not False:
@@ -227,10 +286,21 @@ class FrameworkLog:
         updated_msg = self._update_msg(additional_output, msg)
 
         self.platform_log.exception(updated_msg, exc_info=exc_info, *args)
-        if self.task_log:
-            self.task_log.exception(updated_msg, exc_info=exc_info, *args)
-        if self.encrypt_log:
-            self.encrypt_log.exception(updated_msg, exc_info=exc_info, *args)
+        task_log = self.task_log
+        if task_log:
+            task_log.exception(updated_msg, exc_info=exc_info, *args)
+        encrypt_log = self.encrypt_log
+        if encrypt_log:
+            encrypt_log.exception(updated_msg, exc_info=exc_info, *args)
+
+    def _is_enabled_for(self, level, *loggers):
+        # check level before the message is formatted
+        if not loggers:
+            loggers = (self.platform_log, self.task_log, self.encrypt_log)
+        for log in loggers:
+            if log and log.isEnabledFor(level):
+                return True
+        return False
 
     @classmethod
     def _update_msg(cls, additional_output, msg):
@@ -281,6 +351,7 @@ def device_logger(name=None):
 def shutdown():
     # logging will be shutdown automatically, when the program exits.
     # This function is used by testing.
+    flush_log()
     for log in _LOGGERS:
         for handler in log.handlers:
             log.removeHandler(handler)
@@ -290,6 +361,11 @@ def shutdown():
     _LOGGERS.clear()
 
 
+def flush_log(timeout=None):
+    """wait until the records logged before are written by handlers"""
+    _LOG_DISPATCHER.flush(timeout)
+
+
 def add_task_file_handler(log_file=None):
     if log_file is None:
         return
@@ -363,23 +439,137 @@ def change_logger_level(leve_dict):
             setattr(sys, "log_level", logger_level)
 
 
+class LogDispatcher(threading.Thread):
+    """
+    write records for AsyncHandler in one thread with a bounded queue.
+    when the queue is full, debug records are dropped and the others
+    wait for free space.
+    """
+
+    def __init__(self, max_size=MAX_LOG_QUEUE_SIZE):
+        super().__init__(name="LogDispatcher", daemon=True)
+        # deque append and popleft are thread safe, no lock is needed
+        self.log_queue = deque()
+        self.max_size = max_size
+        self.has_records = threading.Event()
+        self.start_lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, target, record):
+        if threading.current_thread() is self:
+            # logged by handlers in this thread, avoid waiting for itself
+            target.handle(record)
+            return
+        if not self.is_alive():
+            with self.start_lock:
+                if not self.is_alive():
+                    self.start()
+        while len(self.log_queue) >= self.max_size:
+            if record.levelno <= logging.DEBUG:
+                self.dropped += 1
+                return
+            time.sleep(0.01)
+        self.log_queue.append((target, record))
+        if not self.has_records.is_set():
+            self.has_records.set()
+
+    def flush(self, timeout=None):
+        if not self.is_alive() or threading.current_thread() is self:
+            return
+        flushed = threading.Event()
+        self.log_queue.append((None, flushed))
+        self.has_records.set()
+        flushed.wait(timeout)
+
+    def run(self):
+        while True:
+            self.has_records.wait()
+            self.has_records.clear()
+            while self.log_queue:
+                target, record = self.log_queue.popleft()
+                if target is None:
+                    record.set()
+                    continue
+                if self.dropped:
+                    dropped, self.dropped = self.dropped, 0
+                    self._handle(target, logging.makeLogRecord({
+                        "name": record.name, "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": "[%s log records are dropped, log queue is "
+                               "full]" % dropped}))
+                self._handle(target, record)
+
+    @classmethod
+    def _handle(cls, target, record):
+        try:
+            target.handle(record)
+        except Exception:  # pylint:disable=broad-except
+            target.handleError(record)
+
+
+_LOG_DISPATCHER = LogDispatcher()
+atexit.register(flush_log)
+
+
+class AsyncHandler(logging.Handler):
+    """pass records to the target handler through LogDispatcher"""
+
+    def __init__(self, target):
+        super().__init__()
+        self.target = target
+
+    def emit(self, record):
+        try:
+            # merge args now, they may be changed before the record is written
+            if record.args:
+                record.msg = record.getMessage()
+                record.args = None
+            _LOG_DISPATCHER.put(self.target, record)
+        except Exception:  # pylint:disable=broad-except
+            self.handleError(record)
+
+    def close(self):
+        _LOG_DISPATCHER.flush()
+        self.target.close()
+        super().close()
+
+
 class EncryptFileHandler(RotatingFileHandler):
 
     def __init__(self, filename, mode='ab', max_bytes=0, backup_count=0,
                  encoding=None, delay=False):
+        self.encryptor = None
+        self.format_record = None
+        self.format_result = None
         RotatingFileHandler.__init__(self, filename, mode, max_bytes,
                                      backup_count, encoding, delay)
         self.mode = mode
         self.encrypt_error = None
 
     def _open(self):
+        from _core.report.encrypt import get_stream_encryptor
         if not self.mode == "ab":
             self.mode = "ab"
 
         # baseFilename is the attribute in FileHandler
         base_file_name = getattr(self, "baseFilename", None)
-        with open(base_file_name, self.mode) as encrypt_file:
-            return encrypt_file
+        encrypt_file = open(base_file_name, self.mode)
+
+        # every opened file starts with the key block
+        self.encryptor = None
+        if self._encrypt_valid():
+            try:
+                self.encryptor = get_stream_encryptor()
+            except ParamError:
+                self.encryptor = None
+        if self.encryptor:
+            encrypt_file.write(self.encryptor.header)
+        return encrypt_file
+
+    def doRollover(self):
+        RotatingFileHandler.doRollover(self)
+        # the new file has a new key, so format the record again
+        self.format_record = None
 
     def emit(self, record):
         try:
@@ -395,7 +585,7 @@ class EncryptFileHandler(RotatingFileHandler):
             if not getattr(self, "stream", None):
                 setattr(self, "stream", self._open())
             msg = self.format(record)
-            stream = getattr(self, "stream", self._open())
+            stream = getattr(self, "stream")
             stream.write(msg)
             self.flush()
         except RecursionError:
@@ -403,7 +593,7 @@ class EncryptFileHandler(RotatingFileHandler):
 
     def _encrypt_valid(self):
         from _core.report.encrypt import check_pub_key_exist
-        if check_pub_key_exist() and not self.encrypt_error:
+        if check_pub_key_exist() and not getattr(self, "encrypt_error", None):
             return True
 
     def format(self, record):
@@ -414,6 +604,14 @@ class EncryptFileHandler(RotatingFileHandler):
         :param record: logging.LogRecord
         :return: bytes
         """
+        # shouldRollover and emit both format the same record
+        if record is self.format_record:
+            return self.format_result
+        self.format_record = record
+        self.format_result = self._format(record)
+        return self.format_result
+
+    def _format(self, record):
         from _core.report.encrypt import do_rsa_encrypt
         create_time = "{},{}".format(
             time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created)),
@@ -421,12 +619,14 @@ class EncryptFileHandler(RotatingFileHandler):
         name = record.name
         level_name = record.levelname
         msg = record.msg
-        if msg and "%s" in msg:
+        if msg and "%s" in msg and record.args:
             msg = msg % record.args
         info = "[%s] [%s] [%s] %s%s" \
                % (create_time, name, level_name, msg, "\n")
 
         try:
+            if self.encryptor:
+                return self.encryptor.encrypt(info)
             return do_rsa_encrypt(info)
         except ParamError as error:
             error_no_str = \
@@ -16,6 +16,8 @@
 # limitations under the License.
 #
 
+import importlib
+import threading
 from inspect import signature
 
 from _core.interface import IDriver
@@ -28,12 +30,24 @@ from _core.interface import IDeviceManager
 from _core.interface import IReporter
 
 __all__ = ["Config", "Plugin", "get_plugin", "set_plugin_params",
-           "get_all_plugins", "clear_plugin_cache"]
+           "get_all_plugins", "clear_plugin_cache", "add_plugin_modules",
+           "create_plugin"]
 
 # plugins dict
 _PLUGINS = dict()
+# plugin ids of each plugin type in registration order, {plugin_type: [id]}
+_PLUGIN_IDS = dict()
+# immutable lookup results, {(plugin_type, plugin_id): (instances, classes)},
+# rebuilt on the first lookup after a plugin is registered
+_PLUGIN_CACHE = dict()
+_PLUGINS_LOCK = threading.RLock()
 # plugin config name
 _DEFAULT_CONFIG_NAME = "_plugin_config_"
+# modules which register plugins when imported, imported on the first
+# lookup of their plugin type, {plugin_type: [module name or entry point]}
+_PLUGIN_MODULES = dict()
+_PLUGIN_MODULES_LOCK = threading.RLock()
+_ENTRY_POINTS_ADDED = []
 
 
 class Config:
@@ -140,12 +154,16 @@ class Plugin(object):
                     "{} plugin must implement {} interface.".format(
                         cls.__name__, interface))
 
-        if "xdevice" in str(instance.__class__).lower():
-            _PLUGINS.setdefault((self.plugin_type, self.plugin_id), []).append(
-                instance)
-        else:
-            _PLUGINS.setdefault((self.plugin_type, self.plugin_id), []).insert(
-                0, instance)
+        with _PLUGINS_LOCK:
+            key = (self.plugin_type, self.plugin_id)
+            if key not in _PLUGINS:
+                _PLUGIN_IDS.setdefault(self.plugin_type, []).append(
+                    self.plugin_id)
+            if "xdevice" in str(instance.__class__).lower():
+                _PLUGINS.setdefault(key, []).append(instance)
+            else:
+                _PLUGINS.setdefault(key, []).insert(0, instance)
+            _PLUGIN_CACHE.clear()
 
         return cls
 
@@ -156,28 +174,116 @@ class Plugin(object):
         return self._builtin_plugin
 
 
+def add_plugin_modules(plugin_type, module_names):
+    """
+    add the modules which register the plugins of plugin_type, they are
+    imported on the first get_plugin of plugin_type
+    :param plugin_type: plugin type
+    :param module_names: the module names or entry points to load
+    """
+    with _PLUGIN_MODULES_LOCK:
+        _PLUGIN_MODULES.setdefault(plugin_type, []).extend(module_names)
+
+
+def _iter_entry_points():
+    plugin_types = [Plugin.SCHEDULER, Plugin.DRIVER, Plugin.DEVICE, Plugin.LOG,
+                    Plugin.PARSER, Plugin.LISTENER, Plugin.TEST_KIT,
+                    Plugin.MANAGER, Plugin.REPORTER]
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        import pkg_resources
+        for plugin_type in plugin_types:
+            yield plugin_type, list(pkg_resources.iter_entry_points(
+                group=plugin_type))
+        return
+
+    all_entry_points = entry_points()
+    for plugin_type in plugin_types:
+        if hasattr(all_entry_points, "select"):
+            yield plugin_type, list(all_entry_points.select(
+                group=plugin_type))
+        else:
+            yield plugin_type, list(all_entry_points.get(plugin_type, []))
+
+
+def _add_entry_point_modules():
+    with _PLUGIN_MODULES_LOCK:
+        if _ENTRY_POINTS_ADDED:
+            return
+        for plugin_type, entry_points in _iter_entry_points():
+            if entry_points:
+                add_plugin_modules(plugin_type, entry_points)
+        # mark the entry points added only when all of them are recorded,
+        # other threads check the flag without the lock
+        _ENTRY_POINTS_ADDED.append(True)
+
+
+def _load_plugin_modules(plugin_type):
+    # the external log plugins are added with the first lookup of another
+    # plugin type, as the tool logger looks up its plugin on every record
+    if not _ENTRY_POINTS_ADDED and plugin_type != Plugin.LOG:
+        _add_entry_point_modules()
+    if plugin_type not in _PLUGIN_MODULES:
+        return
+    with _PLUGIN_MODULES_LOCK:
+        modules = _PLUGIN_MODULES.get(plugin_type, [])
+        while modules:
+            module = modules.pop(0)
+            if isinstance(module, str):
+                importlib.import_module(module)
+            else:
+                module.load()
+        _PLUGIN_MODULES.pop(plugin_type, None)
+
+
+def _lookup_plugins(plugin_type, plugin_id):
+    _load_plugin_modules(plugin_type)
+    key = (plugin_type, plugin_id)
+    plugins = _PLUGIN_CACHE.get(key)
+    if plugins is not None:
+        return plugins
+    with _PLUGINS_LOCK:
+        if plugin_id is None:
+            instances = []
+            for _plugin_id in _PLUGIN_IDS.get(plugin_type, []):
+                _plugins = _PLUGINS.get((plugin_type, _plugin_id))
+                if not _plugins:
+                    continue
+                if _plugin_id == plugin_type:
+                    instances.insert(0, _plugins[0])
+                else:
+                    instances.append(_plugins[0])
+        else:
+            instances = _PLUGINS.get(key, [])
+        plugins = (tuple(instances),
+                   tuple(instance.__class__ for instance in instances))
+        _PLUGIN_CACHE[key] = plugins
+        return plugins
+
+
 def get_plugin(plugin_type, plugin_id=None):
     """
     get plugin instance
     :param plugin_type: plugin type
     :param plugin_id: plugin id
-    :return:  the instance list of plugin
+    :return:  the instance tuple of plugin
     """
-    if plugin_id is None:
-        plugins = []
-        for key in _PLUGINS:
-            if key[0] != plugin_type:
-                continue
-            if not _PLUGINS.get(key):
-                continue
-            if key[1] == plugin_type:
-                plugins.insert(0, _PLUGINS.get(key)[0])
-            else:
-                plugins.append(_PLUGINS.get(key)[0])
-        return plugins
+    return _lookup_plugins(plugin_type, plugin_id)[0]
 
-    else:
-        return _PLUGINS.get((plugin_type, plugin_id), [])
+
+def create_plugin(plugin_type, plugin_id=None, limit=None):
+    """
+    create new instances of the plugin classes
+    :param plugin_type: plugin type
+    :param plugin_id: plugin id
+    :param limit: create at most limit instances, all of them if None
+    :return:  the new instance list of plugin
+    """
+    classes = _lookup_plugins(plugin_type, plugin_id)[1]
+    if limit is not None:
+        classes = classes[:limit]
+    return [plugin_class() for plugin_class in classes]
 
 
 def set_plugin_params(plugin_type, plugin_id=None, **kwargs):
@@ -202,6 +308,9 @@ def get_all_plugins():
     """
     get all plugins
     """
+    _add_entry_point_modules()
+    for plugin_type in list(_PLUGIN_MODULES):
+        _load_plugin_modules(plugin_type)
     return dict(_PLUGINS)
 
 
@@ -209,4 +318,7 @@ def clear_plugin_cache():
     """
     clear all cached plugins
     """
-    _PLUGINS.clear()
+    with _PLUGINS_LOCK:
+        _PLUGINS.clear()
+        _PLUGIN_IDS.clear()
+        _PLUGIN_CACHE.clear()
@@ -26,6 +26,8 @@ from _core.report.reporter_helper import ReportConstant
 from _core.report.result_reporter import ResultReporter
 
 LOG = platform_logger("ReportMain")
+DECRYPT_COMMAND = "decrypt"
+DECRYPT_SUFFIX = ".decrypted"
 
 
 def main_report():
@@ -35,6 +37,9 @@ def main_report():
         return
 
     args = sys.argv
+    if args and len(args) > 1 and args[1] == DECRYPT_COMMAND:
+        main_decrypt(args[2:])
+        return
     if args is None or len(args) < 2:
         report_path = input("report path >>> ")
     else:
@@ -59,5 +64,22 @@ def main_report():
     result_report.__generate_reports__(report_path, task_info=task_info)
 
 
+def main_decrypt(args):
+    """
+    decrypt <encrypted file> [<output file>], the private key is read from
+    config/pri.key, the output file is <encrypted file>.decrypted by default
+    """
+    from _core.report.encrypt import decrypt_file
+    if not args:
+        LOG.error("usage: decrypt <encrypted file> [<output file>]")
+        return
+    src_file = os.path.abspath(args[0])
+    dst_file = os.path.abspath(args[1]) if len(args) > 1 else \
+        "%s%s" % (src_file, DECRYPT_SUFFIX)
+    if not decrypt_file(src_file, dst_file):
+        return
+    LOG.info("decrypted file: %s", dst_file)
+
+
 if __name__ == "__main__":
     main_report()
@@ -18,67 +18,189 @@
 
 import os
 import hashlib
+import itertools
+import struct
+import threading
 
+from _core.context import TaskScoped
+from _core.context import TaskScopedMeta
 from _core.logger import platform_logger
 from _core.exception import ParamError
 
 __all__ = ["check_pub_key_exist", "do_rsa_encrypt", "do_rsa_decrypt",
-           "generate_key_file", "get_file_summary"]
+           "do_encrypt", "do_decrypt", "decrypt_file", "StreamEncryptor",
+           "get_stream_encryptor", "EncryptContext", "get_encrypt_context",
+           "reset_encrypt_context", "generate_key_file", "get_file_summary"]
 
 PUBLIC_KEY_FILE = "config/pub.key"
 PRIVATE_KEY_FILE = "config/pri.key"
 LOG = platform_logger("Encrypt")
 
+# hybrid encrypted content is a key block followed by data blocks:
+#   key block:  MAGIC + 2 bytes length + rsa encrypted aes key
+#   data block: DATA_FLAG + 4 bytes length + 12 bytes nonce + cipher text
+ENCRYPT_MAGIC = b"\x89XDENC1\n"
+ENCRYPT_DATA_FLAG = b"D"
+ENCRYPT_BLOCK_SIZE = 1024 * 1024
+ENCRYPT_NONCE_SIZE = 12
+# guards the key variables in Variables.report_vars, which the tasks share
+_KEY_VARS_LOCK = threading.RLock()
+
+
+class EncryptContext:
+    """
+    resolved public key state, the keys and the aes-gcm class are loaded
+    once and cached. call reset_encrypt_context after key files are changed
+    """
+
+    def __init__(self, pub_key_exist, key_source, auto_detected=False):
+        self.pub_key_exist = pub_key_exist
+        self.enabled = bool(pub_key_exist)
+        self.key_source = key_source
+        self.auto_detected = auto_detected
+        self._lock = threading.Lock()
+        self._public_key = None
+        self._private_key = None
+        self._aes_gcm = None
+
+    def get_public_key(self):
+        if self._public_key:
+            return self._public_key
+        import rsa
+        with self._lock:
+            if not self._public_key:
+                pub_key_string, pub_key_file = self.key_source[:2]
+                if not pub_key_string:
+                    with open(pub_key_file, 'rb') as key_content:
+                        pub_key_string = key_content.read()
+                if isinstance(pub_key_string, str):
+                    pub_key_string = bytes(pub_key_string, "utf-8")
+                self._public_key = rsa.PublicKey.load_pkcs1_openssl_pem(
+                    pub_key_string)
+        return self._public_key
+
+    def get_private_key(self):
+        if self._private_key is not None:
+            return self._private_key or None
+        import rsa
+        with self._lock:
+            if self._private_key is None:
+                exec_dir, top_dir = self.key_source[2:]
+                pri_key_file = os.path.join(exec_dir, PRIVATE_KEY_FILE)
+                if not os.path.exists(pri_key_file):
+                    pri_key_file = os.path.join(top_dir, PRIVATE_KEY_FILE)
+                if not os.path.exists(pri_key_file):
+                    self._private_key = False
+                    return None
+                with open(pri_key_file, "rb") as key_content:
+                    self._private_key = rsa.PrivateKey.load_pkcs1(
+                        key_content.read())
+        return self._private_key
+
+    def get_stream_encryptor(self):
+        """
+        create a StreamEncryptor with a new random key for one file
+        """
+        if self._aes_gcm is None:
+            try:
+                from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+                self._aes_gcm = AESGCM
+            except ModuleNotFoundError:
+                self._aes_gcm = False
+        if not self._aes_gcm:
+            return None
+        return StreamEncryptor(self.get_public_key(), self._aes_gcm)
 
-def check_pub_key_exist():
+
+class _EncryptContextHolder(metaclass=TaskScopedMeta):
+    # the EncryptContext of each task, the tasks without their own context
+    # use the one of the process
+    context = TaskScoped(lambda: None, inherit=True)
+
+
+def get_encrypt_context():
+    """get the cached EncryptContext of the current task, resolve it when
+    variables change"""
     from xdevice import Variables
-    if Variables.report_vars.pub_key_string:
-        return Variables.report_vars.pub_key_string
+    context = _EncryptContextHolder.context
+    if context is None or context.key_source != _get_key_source(Variables):
+        context = _resolve_encrypt_context(Variables)
+    return context
 
-    if Variables.report_vars.pub_key_file is not None:
-        if Variables.report_vars.pub_key_file == "":
-            return False
-        if not os.path.exists(Variables.report_vars.pub_key_file):
+
+def reset_encrypt_context():
+    """resolve the key files again when the context of the current task is
+    used next time"""
+    from xdevice import Variables
+    context = _EncryptContextHolder.context
+    with _KEY_VARS_LOCK:
+        if context and context.auto_detected and \
+                context.key_source == _get_key_source(Variables):
             Variables.report_vars.pub_key_file = None
-            return False
-        return True
+    _EncryptContextHolder.context = None
 
-    pub_key_path = os.path.join(Variables.exec_dir, PUBLIC_KEY_FILE)
-    if os.path.exists(pub_key_path):
-        Variables.report_vars.pub_key_file = pub_key_path
-        return True
 
-    pub_key_path = os.path.join(Variables.top_dir, PUBLIC_KEY_FILE)
-    if os.path.exists(pub_key_path):
-        Variables.report_vars.pub_key_file = pub_key_path
-    else:
-        Variables.report_vars.pub_key_file = ""
-    return Variables.report_vars.pub_key_file
+def check_pub_key_exist():
+    return get_encrypt_context().pub_key_exist
+
+
+def _get_key_source(variables):
+    with _KEY_VARS_LOCK:
+        return (variables.report_vars.pub_key_string,
+                variables.report_vars.pub_key_file, variables.exec_dir,
+                variables.top_dir)
+
+
+def _resolve_encrypt_context(variables):
+    report_vars = variables.report_vars
+    auto_detected = False
+    with _KEY_VARS_LOCK:
+        pub_key_file = report_vars.pub_key_file
+        if report_vars.pub_key_string:
+            pub_key_exist = report_vars.pub_key_string
+        elif pub_key_file is not None:
+            if pub_key_file == "":
+                pub_key_exist = False
+            elif not os.path.exists(pub_key_file):
+                report_vars.pub_key_file = None
+                pub_key_exist = False
+            else:
+                pub_key_exist = True
+        else:
+            auto_detected = True
+            pub_key_path = os.path.join(variables.exec_dir, PUBLIC_KEY_FILE)
+            if not os.path.exists(pub_key_path):
+                pub_key_path = os.path.join(variables.top_dir,
+                                            PUBLIC_KEY_FILE)
+            if os.path.exists(pub_key_path):
+                report_vars.pub_key_file = pub_key_path
+                pub_key_exist = True
+            else:
+                report_vars.pub_key_file = ""
+                pub_key_exist = False
+        key_source = _get_key_source(variables)
+
+    context = EncryptContext(pub_key_exist, key_source, auto_detected)
+    _EncryptContextHolder.context = context
+    return context
 
 
 def do_rsa_encrypt(content):
+    if not check_pub_key_exist() or not content:
+        return content
+
     try:
-        if not check_pub_key_exist() or not content:
-            return content
+        import rsa
+    except ModuleNotFoundError as error:
+        error_msg = "rsa encryption error occurs, %s" % error
+        raise ParamError(error_msg, error_no="00113")
 
+    try:
         plain_text = content
         if not isinstance(plain_text, bytes):
             plain_text = str(content).encode(encoding='utf-8')
 
-        import rsa
-        from xdevice import Variables
-        if not Variables.report_vars.pub_key_string:
-            with open(Variables.report_vars.pub_key_file,
-                      'rb') as key_content:
-                Variables.report_vars.pub_key_string = key_content.read()
-
-        if isinstance(Variables.report_vars.pub_key_string, str):
-            Variables.report_vars.pub_key_string =\
-                bytes(Variables.report_vars.pub_key_string, "utf-8")
-
-        public_key = rsa.PublicKey.load_pkcs1_openssl_pem(
-            Variables.report_vars.pub_key_string)
-
+        public_key = get_encrypt_context().get_public_key()
         max_encrypt_len = int(public_key.n.bit_length() / 8) - 11
 
         # encrypt
@@ -88,9 +210,9 @@ def do_rsa_encrypt(content):
             cipher_text += cipher_text_frag
         return cipher_text
 
-    except (ModuleNotFoundError, ValueError, TypeError, UnicodeError,
-            Exception) as error:
-        error_msg = "rsa encryption error occurs, %s" % error.args[0]
+    except (ValueError, TypeError, OSError, OverflowError,
+            rsa.pkcs1.CryptoError) as error:
+        error_msg = "rsa encryption error occurs, %s" % error
         raise ParamError(error_msg, error_no="00113")
 
 
@@ -104,37 +226,154 @@ def do_rsa_decrypt(content):
             cipher_text = str(content).encode()
 
         import rsa
-        from xdevice import Variables
-        pri_key_path = os.path.join(Variables.exec_dir, PRIVATE_KEY_FILE)
-        if os.path.exists(pri_key_path):
-            pri_key_file = pri_key_path
-        else:
-            pri_key_file = os.path.join(Variables.top_dir, PRIVATE_KEY_FILE)
-        if not os.path.exists(pri_key_file):
+        pri_key = get_encrypt_context().get_private_key()
+        if not pri_key:
             return content
-        with open(pri_key_file, "rb") as key_content:
-            # get params
-            pri_key = rsa.PrivateKey.load_pkcs1(key_content.read())
-            max_decrypt_len = int(pri_key.n.bit_length() / 8)
+        max_decrypt_len = int(pri_key.n.bit_length() / 8)
 
-            try:
-                # decrypt
-                plain_text = b""
-                for frag in _get_frags(cipher_text, max_decrypt_len):
-                    plain_text_frag = rsa.decrypt(frag, pri_key)
-                    plain_text += plain_text_frag
-                return plain_text.decode(encoding='utf-8')
-            except rsa.pkcs1.CryptoError as error:
-                error_msg = "rsa decryption error occurs, %s" % error.args[0]
-                LOG.error(error_msg, error_no="00114")
-                return error_msg
+        try:
+            # decrypt
+            plain_text = b""
+            for frag in _get_frags(cipher_text, max_decrypt_len):
+                plain_text_frag = rsa.decrypt(frag, pri_key)
+                plain_text += plain_text_frag
+            return plain_text.decode(encoding='utf-8')
+        except rsa.pkcs1.CryptoError as error:
+            error_msg = "rsa decryption error occurs, %s" % error
+            LOG.error(error_msg, error_no="00114")
+            return error_msg
 
     except (ModuleNotFoundError, ValueError, TypeError, UnicodeError) as error:
-        error_msg = "rsa decryption error occurs, %s" % error.args[0]
+        error_msg = "rsa decryption error occurs, %s" % error
         LOG.error(error_msg, error_no="00114")
         return error_msg
 
 
+class StreamEncryptor:
+    """
+    encrypt content with a random aes-gcm key, the key is encrypted with
+    the rsa public key once and saved in the header
+    """
+
+    def __init__(self, public_key, aes_gcm):
+        import rsa
+        key = aes_gcm.generate_key(bit_length=256)
+        wrapped_key = rsa.encrypt(key, public_key)
+        self.header = ENCRYPT_MAGIC + struct.pack(">H", len(wrapped_key)) + \
+            wrapped_key
+        self.cipher = aes_gcm(key)
+        self.nonce_prefix = os.urandom(ENCRYPT_NONCE_SIZE - 8)
+        self.counter = itertools.count()
+
+    def encrypt(self, plain_text):
+        if not isinstance(plain_text, bytes):
+            plain_text = str(plain_text).encode(encoding="utf-8")
+        nonce = self.nonce_prefix + struct.pack(">Q", next(self.counter))
+        cipher_text = self.cipher.encrypt(nonce, plain_text, None)
+        return ENCRYPT_DATA_FLAG + struct.pack(
+            ">I", len(nonce) + len(cipher_text)) + nonce + cipher_text
+
+
+def get_stream_encryptor():
+    """
+    get a StreamEncryptor with a new key for one file, None means
+    cryptography is not installed and content should be encrypted with
+    do_rsa_encrypt
+    """
+    try:
+        return get_encrypt_context().get_stream_encryptor()
+    except (ModuleNotFoundError, ValueError, TypeError, OSError,
+            OverflowError) as error:
+        error_msg = "rsa encryption error occurs, %s" % error
+        raise ParamError(error_msg, error_no="00113")
+
+
+def do_encrypt(content):
+    if not check_pub_key_exist() or not content:
+        return content
+
+    encryptor = get_stream_encryptor()
+    if not encryptor:
+        return do_rsa_encrypt(content)
+
+    plain_text = content
+    if not isinstance(plain_text, bytes):
+        plain_text = str(content).encode(encoding='utf-8')
+    cipher_text = [encryptor.header]
+    for frag in _get_frags(plain_text, ENCRYPT_BLOCK_SIZE):
+        cipher_text.append(encryptor.encrypt(frag))
+    return b"".join(cipher_text)
+
+
+def do_decrypt(content):
+    """decrypt content generated by do_encrypt, EncryptFileHandler or
+    do_rsa_encrypt"""
+    if not isinstance(content, bytes) or not \
+            content.startswith(ENCRYPT_MAGIC):
+        return do_rsa_decrypt(content)
+
+    try:
+        import rsa
+        from cryptography.exceptions import InvalidTag
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ModuleNotFoundError as error:
+        error_msg = "decryption error occurs, %s" % error
+        LOG.error(error_msg, error_no="00114")
+        return error_msg
+
+    try:
+        pri_key = get_encrypt_context().get_private_key()
+        if not pri_key:
+            return content
+
+        plain_text = []
+        cipher, index = None, 0
+        while index < len(content):
+            if content.startswith(ENCRYPT_MAGIC, index):
+                # a new key block, log files get one after each open
+                index += len(ENCRYPT_MAGIC)
+                length, = struct.unpack_from(">H", content, index)
+                index += 2
+                cipher = AESGCM(rsa.decrypt(
+                    content[index:index + length], pri_key))
+            elif content.startswith(ENCRYPT_DATA_FLAG, index) and cipher:
+                length, = struct.unpack_from(">I", content, index + 1)
+                index += len(ENCRYPT_DATA_FLAG) + 4
+                nonce = content[index:index + ENCRYPT_NONCE_SIZE]
+                plain_text.append(cipher.decrypt(
+                    nonce, content[index + ENCRYPT_NONCE_SIZE:
+                                   index + length], None))
+            else:
+                raise ValueError("invalid block at offset %s" % index)
+            index += length
+        return b"".join(plain_text).decode(encoding='utf-8')
+    except (ValueError, TypeError, UnicodeError, struct.error, InvalidTag,
+            rsa.pkcs1.CryptoError) as error:
+        error_msg = "decryption error occurs, %s" % (
+            str(error) or type(error).__name__)
+        LOG.error(error_msg, error_no="00114")
+        return error_msg
+
+
+def decrypt_file(src_file, dst_file=None):
+    """decrypt an encrypted report or log file, return the plain text"""
+    if not os.path.exists(src_file):
+        LOG.error("file '%s' not exists!" % src_file)
+        return ""
+    with open(src_file, "rb") as src_handler:
+        plain_text = do_decrypt(src_handler.read())
+    if not isinstance(plain_text, str):
+        LOG.error("decrypt '%s' failed" % src_file)
+        return ""
+    if dst_file:
+        dst_file_open = os.open(dst_file, os.O_WRONLY | os.O_CREAT |
+                                os.O_TRUNC, 0o755)
+        with os.fdopen(dst_file_open, "w", encoding="utf-8") as dst_handler:
+            dst_handler.write(plain_text)
+            dst_handler.flush()
+    return plain_text
+
+
 def generate_key_file(length=2048):
     try:
         from rsa import key
@@ -16,8 +16,10 @@
 # limitations under the License.
 #
 
+import json
 import os
 import platform
+import re
 import time
 from ast import literal_eval
 from dataclasses import dataclass
@@ -25,7 +27,7 @@ from xml.etree import ElementTree
 
 from _core.logger import platform_logger
 from _core.report.encrypt import check_pub_key_exist
-from _core.report.encrypt import do_rsa_encrypt
+from _core.report.encrypt import do_encrypt
 from _core.exception import ParamError
 
 LOG = platform_logger("ReporterHelper")
@@ -38,6 +40,7 @@ class ReportConstant:
     summary_vision_report = "summary_report.html"
     details_vision_report = "details_report.html"
     failures_vision_report = "failures_report.html"
+    details_data_dir = "details"
     task_info_record = "task_info.record"
     summary_ini = "summary.ini"
     summary_report_hash = "summary_report.hash"
@@ -75,6 +78,7 @@ class ReportConstant:
     unavailable = "unavailable"
     not_run = "notrun"
     message = "message"
+    launches = "launches"
 
     # case result constants
     module_name = "modulename"
@@ -255,7 +259,7 @@ class DataHelper:
         if check_pub_key_exist():
             plain_text = DataHelper.to_string(element)
             try:
-                cipher_text = do_rsa_encrypt(plain_text)
+                cipher_text = do_encrypt(plain_text)
             except ParamError as error:
                 LOG.error(error, error_no=error.error_no)
                 cipher_text = b""
@@ -429,12 +433,24 @@ class ColorType:
 class VisionHelper:
     PLACE_HOLDER = "&nbsp;"
     MAX_LENGTH = 50
+    # above it, details report lazy-loads case data from module shards
+    MAX_DETAILS_CASES = 50000
+    SLOT_PATTERN = re.compile(r"<!--{([^{}]+)}-->")
+    CONTEXT_SLOTS = {
+        ReportConstant.summary_vision_report: "suites.context",
+        ReportConstant.details_vision_report: "cases.context",
+        ReportConstant.failures_vision_report: "failures.context"
+    }
+    # template file path -> (modify time, parsed chunks)
+    _templates = dict()
 
     def __init__(self):
         from xdevice import Variables
         self.summary_element = None
         self.template_name = os.path.join(Variables.res_dir, "template",
                                           "report.html")
+        self.paged_template_name = os.path.join(
+            Variables.res_dir, "template", "details_paged_report.html")
 
     def parse_element_data(self, summary_element, report_path, task_info):
         self.summary_element = summary_element
@@ -547,43 +563,129 @@ class VisionHelper:
 
     def render_data(self, title_name, parsed_data,
                     render_target=ReportConstant.summary_vision_report):
+        contexts = self.render_all(parsed_data, {render_target: title_name})
+        return contexts.get(render_target, "")
+
+    def render_all(self, parsed_data, render_targets):
+        """render vision reports in one pass over the parsed data
+
+        Args:
+            parsed_data: (exec_info, summary, suites) of parse_element_data
+            render_targets: dict of render target and its title name
+
+        Returns:
+            dict of render target and its rendered report context
+        """
         exec_info, summary, suites = parsed_data
-        if not os.path.exists(self.template_name):
+        template = self._get_template(self.template_name)
+        if template is None:
             LOG.error("template file not exists")
-            return ""
-        with open(self.template_name) as file_temp:
-            file_context = file_temp.read()
-        file_context = self._render_key("", ReportConstant.title_name,
-                                        title_name, file_context)
-        file_context = self._render_exec_info(file_context, exec_info)
-        file_context = self._render_summary(file_context, summary)
-        if render_target == ReportConstant.summary_vision_report:
-            file_context = self._render_suites(file_context, suites)
-        elif render_target == ReportConstant.details_vision_report:
-            file_context = self._render_cases(file_context, suites)
-        elif render_target == ReportConstant.failures_vision_report:
-            file_context = self._render_failure_cases(file_context, suites)
-        else:
-            LOG.error("unsupported vision report type: %s", render_target)
-        return file_context
+            return dict()
+        render_targets = dict(render_targets)
+        for render_target in list(render_targets.keys()):
+            if render_target not in self.CONTEXT_SLOTS:
+                LOG.error("unsupported vision report type: %s", render_target)
+                render_targets.pop(render_target)
+
+        slots = dict()
+        self._render_exec_info(slots, exec_info)
+        self._render_summary(slots, summary)
+        contexts = self._get_contexts(suites, render_targets)
+
+        report_contexts = dict()
+        for render_target, title_name in render_targets.items():
+            slots[ReportConstant.title_name] = title_name
+            context_slot = self.CONTEXT_SLOTS.get(render_target)
+            slots[context_slot] = contexts.get(render_target)
+            report_contexts[render_target] = "".join(
+                [slots.get(chunk[1], chunk[2]) if chunk[0] else chunk[1]
+                 for chunk in template])
+            slots.pop(context_slot, None)
+        return report_contexts
+
+    def generate_paged_details_report(self, report_path, title_name,
+                                      suites):
+        """generate details report which virtual-scrolls the case rows and
+        lazy-loads them from one js shard per module, the shard calls
+        xdeviceShard(module_index, [[suite_name, [[classname, name, time,
+        result], ...]], ...]) defined in the page
+        """
+        template = self._get_template(self.paged_template_name)
+        if template is None:
+            LOG.error("template file not exists")
+            return False
+        modules = dict()
+        for suite in suites:
+            modules.setdefault(suite.module_name, []).append(suite)
+
+        data_dir = os.path.join(report_path, ReportConstant.details_data_dir)
+        os.makedirs(data_dir, exist_ok=True)
+        manifest = {"modules": [], "anchors": {}}
+        row = 0
+        for index, (module_name, module_suites) in enumerate(modules.items()):
+            shard_name = "%s/%s.js" % (ReportConstant.details_data_dir, index)
+            shard_data = []
+            for suite in module_suites:
+                manifest["anchors"].setdefault(suite.name, row)
+                shard_data.append([suite.name, [
+                    [case.classname, case.name, case.time, case.get_result()]
+                    for case in suite.cases]])
+                row += len(suite.cases) + 1
+            with open(os.path.join(report_path, shard_name), "w",
+                      encoding="utf-8") as shard_file:
+                shard_file.write("xdeviceShard(%s,%s);" % (index, json.dumps(
+                    shard_data, separators=(",", ":"))))
+            manifest["modules"].append({
+                "name": module_name, "shard": shard_name,
+                "rows": sum(len(suite.cases) + 1 for suite in module_suites)})
+
+        slots = {ReportConstant.title_name: title_name,
+                 "details.manifest": json.dumps(
+                     manifest, separators=(",", ":")).replace("</", "<\\/")}
+        report_context = "".join(
+            [slots.get(chunk[1], chunk[2]) if chunk[0] else chunk[1]
+             for chunk in template])
+        self.generate_report(os.path.join(
+            report_path, ReportConstant.details_vision_report), report_context)
+        return True
 
     @classmethod
-    def _render_key(cls, prefix, key, new_str, update_context):
-        old_str = "<!--{%s%s}-->" % (prefix, key)
-        return update_context.replace(old_str, new_str)
+    def _get_template(cls, template_name):
+        """parse template into static chunks and named slots once
 
-    def _render_exec_info(self, file_context, exec_info):
+        every chunk is (False, text) for static text, or
+        (True, slot_name, origin_text) for "<!--{slot_name}-->"
+        """
+        if not os.path.exists(template_name):
+            return None
+        modify_time = os.path.getmtime(template_name)
+        template = cls._templates.get(template_name)
+        if template and template[0] == modify_time:
+            return template[1]
+        with open(template_name) as file_temp:
+            file_context = file_temp.read()
+        chunks = []
+        start = 0
+        for match in cls.SLOT_PATTERN.finditer(file_context):
+            if match.start() > start:
+                chunks.append((False, file_context[start:match.start()]))
+            chunks.append((True, match.group(1), match.group(0)))
+            start = match.end()
+        if start < len(file_context):
+            chunks.append((False, file_context[start:]))
+        cls._templates[template_name] = (modify_time, chunks)
+        return chunks
+
+    def _render_exec_info(self, slots, exec_info):
         prefix = "exec_info."
         for key in ExecInfo.keys:
             value = self._get_hidden_style_value(getattr(
                 exec_info, key, "None"))
-            file_context = self._render_key(prefix, key, value, file_context)
-        file_context = self._render_product_info(exec_info, file_context,
-                                                 prefix)
-        return file_context
+            slots["%s%s" % (prefix, key)] = value
+        self._render_product_info(exec_info, slots, prefix)
 
-    def _render_product_info(self, exec_info, file_context, prefix):
-        """construct product info context and render it to file context
+    def _render_product_info(self, exec_info, slots, prefix):
+        """construct product info context and render it to slots
 
         rendered product info sample:
             <tr>
@@ -595,11 +697,8 @@ class VisionHelper:
 
         Args:
             exec_info: dict that used to update file_content
-            file_context: exist html content
+            slots: dict of template slot and its rendered value
             prefix: target replace prefix key
-
-        Returns:
-            updated file context that includes rendered product info
         """
         row_start = True
         try:
@@ -608,21 +707,19 @@ class VisionHelper:
             LOG.error("product info error %s", exec_info.product_info)
             keys = []
 
-        render_value = ""
+        render_values = []
         for key in keys:
             value = exec_info.product_info[key]
             if row_start:
-                render_value = "%s<tr>\n" % render_value
-            render_value = "{}{}".format(
-                render_value, self._get_exec_info_td(key, value, row_start))
+                render_values.append("<tr>\n")
+            render_values.append(self._get_exec_info_td(key, value, row_start))
             if not row_start:
-                render_value = "%s</tr>\n" % render_value
+                render_values.append("</tr>\n")
             row_start = not row_start
         if not row_start:
-            render_value = "%s</tr>\n" % render_value
-        file_context = self._render_key(prefix, ReportConstant.product_info_,
-                                        render_value, file_context)
-        return file_context
+            render_values.append("</tr>\n")
+        slots["%s%s" % (prefix, ReportConstant.product_info_)] = "".join(
+            render_values)
 
     def _get_exec_info_td(self, key, value, row_start):
         if not value:
@@ -649,9 +746,8 @@ class VisionHelper:
             return value
         return "<div class='hidden' title='%s'>%s</div>" % (value, value)
 
-    def _render_summary(self, file_context, summary):
-        file_context = self._render_data_object(file_context, summary,
-                                                "summary.")
+    def _render_summary(self, slots, summary):
+        self._render_data_object(slots, summary, "summary.")
 
         # render color type
         color_type = ColorType()
@@ -663,15 +759,12 @@ class VisionHelper:
             color_type.ignored = ReportConstant.color_ignored
         if summary.result.unavailable != 0:
             color_type.unavailable = ReportConstant.color_unavailable
-        return self._render_data_object(file_context, color_type,
-                                        "color_type.")
+        self._render_data_object(slots, color_type, "color_type.")
 
-    def _render_data_object(self, file_context, data_object, prefix,
-                            default=None):
-        """construct data object context and render it to file context"""
+    def _render_data_object(self, slots, data_object, prefix, default=None):
+        """construct data object context and render it to slots"""
         if default is None:
             default = self.PLACE_HOLDER
-        update_context = file_context
         for key in getattr(data_object, "keys", []):
             if hasattr(Result(), key) and hasattr(
                     data_object, ReportConstant.result):
@@ -679,12 +772,32 @@ class VisionHelper:
                 new_str = str(getattr(result, key, default))
             else:
                 new_str = str(getattr(data_object, key, default))
-            update_context = self._render_key(prefix, key, new_str,
-                                              update_context)
-        return update_context
-
-    def _render_suites(self, file_context, suites):
-        """construct suites context and render it to file context
+            slots["%s%s" % (prefix, key)] = new_str
+
+    def _get_contexts(self, suites, render_targets):
+        suites_context, cases_context, failures_context = [], [], []
+        is_summary = ReportConstant.summary_vision_report in render_targets
+        is_details = ReportConstant.details_vision_report in render_targets
+        is_failures = ReportConstant.failures_vision_report in render_targets
+        if is_summary:
+            suites_context.append("<table class='suites'>\n")
+            suites_context.append(self._get_suites_title())
+        for index, suite in enumerate(suites):
+            if is_summary:
+                self._render_suite(suites_context, index, suite)
+            if is_details:
+                self._render_cases(cases_context, suite)
+            if is_failures:
+                self._render_failure_cases(failures_context, suite)
+        if is_summary:
+            suites_context.append("</table>\n")
+        return {ReportConstant.summary_vision_report: "".join(suites_context),
+                ReportConstant.details_vision_report: "".join(cases_context),
+                ReportConstant.failures_vision_report:
+                    "".join(failures_context)}
+
+    def _render_suite(self, suites_context, index, suite):
+        """construct suite context and append it to suites context
         suite record sample:
             <table class="suites">
             <tr>
@@ -719,38 +832,25 @@ class VisionHelper:
             ...
             </table>
         """
-        replace_str = "<!--{suites.context}-->"
-
-        suites_context = "<table class='suites'>\n"
-        suites_context = "%s%s" % (suites_context, self._get_suites_title())
-        for index, suite in enumerate(suites):
-            # construct suite context
-            suite_name = getattr(suite, "name", self.PLACE_HOLDER)
-            suite_context = "<tr>\n  " if index % 2 == 0 else \
-                "<tr class='background-color'>\n  "
-            for key in Suite.keys:
-                if hasattr(Result(), key):
-                    result = getattr(suite, ReportConstant.result, Result())
-                    text = getattr(result, key, self.PLACE_HOLDER)
-                else:
-                    text = getattr(suite, key, self.PLACE_HOLDER)
-                suite_context = "{}{}".format(
-                    suite_context, self._add_suite_td_context(key, text))
-            if suite.result.total == 0:
-                href = "%s#%s" % (
-                    ReportConstant.failures_vision_report, suite_name)
+        suite_name = getattr(suite, "name", self.PLACE_HOLDER)
+        suites_context.append("<tr>\n  " if index % 2 == 0 else
+                              "<tr class='background-color'>\n  ")
+        for key in Suite.keys:
+            if hasattr(Result(), key):
+                result = getattr(suite, ReportConstant.result, Result())
+                text = getattr(result, key, self.PLACE_HOLDER)
             else:
-                href = "%s#%s" % (
-                    ReportConstant.details_vision_report, suite_name)
-            suite_context = "{}{}".format(
-                suite_context,
-                "<td class='normal operate'><a href='%s'><div class='operate'>"
-                "</div></a></td>\n</tr>\n" % href)
-            # add suite context to suites context
-            suites_context = "{}{}".format(suites_context, suite_context)
-
-        suites_context = "%s</table>\n" % suites_context
-        return file_context.replace(replace_str, suites_context)
+                text = getattr(suite, key, self.PLACE_HOLDER)
+            suites_context.append(self._add_suite_td_context(key, text))
+        if suite.result.total == 0:
+            href = "%s#%s" % (
+                ReportConstant.failures_vision_report, suite_name)
+        else:
+            href = "%s#%s" % (
+                ReportConstant.details_vision_report, suite_name)
+        suites_context.append(
+            "<td class='normal operate'><a href='%s'><div class='operate'>"
+            "</div></a></td>\n</tr>\n" % href)
 
     @classmethod
     def _get_suites_title(cls):
@@ -777,8 +877,8 @@ class VisionHelper:
         td_style_class = "normal %s" % style
         return "<td class='%s'>%s</td>\n  " % (td_style_class, str(text))
 
-    def _render_cases(self, file_context, suites):
-        """construct cases context and render it to file context
+    def _render_cases(self, cases_context, suite):
+        """construct cases context of suite and append it to cases context
         case table sample:
             <table class="test-suite">
             <tr>
@@ -812,23 +912,13 @@ class VisionHelper:
             </table>
             ...
         """
-        replace_str = "<!--{cases.context}-->"
-        cases_context = ""
-        for suite in suites:
-            # construct case context
-            suite_name = getattr(suite, "name", self.PLACE_HOLDER)
-            case_context = "<table class='test-suite'>\n"
-            case_context = "{}{}".format(case_context,
-                                         self._get_case_title(suite_name))
-            for index, case in enumerate(suite.cases):
-                case_context = "{}{}".format(
-                    case_context,
-                    self._get_case_td_context(index, case, suite_name))
-            case_context = "%s</table>\n" % case_context
-
-            # add case context to cases context
-            cases_context = "{}{}".format(cases_context, case_context)
-        return file_context.replace(replace_str, cases_context)
+        suite_name = getattr(suite, "name", self.PLACE_HOLDER)
+        cases_context.append("<table class='test-suite'>\n")
+        cases_context.append(self._get_case_title(suite_name))
+        for index, case in enumerate(suite.cases):
+            cases_context.append(
+                self._get_case_td_context(index, case, suite_name))
+        cases_context.append("</table>\n")
 
     @classmethod
     def _get_case_td_context(cls, index, case, suite_name):
@@ -876,8 +966,9 @@ class VisionHelper:
                          ReportConstant.summary_vision_report)
         return case_title
 
-    def _render_failure_cases(self, file_context, suites):
-        """construct failure cases context and render it to file context
+    def _render_failure_cases(self, failures_context, suite):
+        """construct failure cases context of suite and append it to failure
+        cases context
         failure case table sample:
             <table class="failure-test">
             <tr>
@@ -910,42 +1001,30 @@ class VisionHelper:
             </table>
             ...
         """
-        replace_str = "<!--{failures.context}-->"
-        failure_cases_context = ""
-        for suite in suites:
-            if suite.result.total == (
-                    suite.result.passed + suite.result.ignored) and \
-                    suite.result.unavailable == 0:
-                continue
+        if suite.result.total == (
+                suite.result.passed + suite.result.ignored) and \
+                suite.result.unavailable == 0:
+            return
 
-            # construct failure cases context for failure suite
-            suite_name = getattr(suite, "name", self.PLACE_HOLDER)
-            case_context = "<table class='failure-test'>\n"
-            case_context = \
-                "{}{}".format(case_context, self._get_failure_case_title(
-                        suite_name, suite.result.total))
-            if suite.result.total == 0:
-                case_context = "{}{}".format(
-                    case_context, self._get_failure_case_td_context(
-                       0, suite, suite_name, ReportConstant.unavailable))
-            else:
-                skipped_num = 0
-                for index, case in enumerate(suite.cases):
-                    result = case.get_result()
-                    if result == ReportConstant.passed or \
-                            result == ReportConstant.ignored:
-                        skipped_num += 1
-                        continue
-                    case_context = "{}{}".format(
-                        case_context, self._get_failure_case_td_context(
-                          index - skipped_num, case, suite_name, result))
-
-            case_context = "%s</table>\n" % case_context
-
-            # add case context to cases context
-            failure_cases_context = \
-                "{}{}".format(failure_cases_context, case_context)
-        return file_context.replace(replace_str, failure_cases_context)
+        # construct failure cases context for failure suite
+        suite_name = getattr(suite, "name", self.PLACE_HOLDER)
+        failures_context.append("<table class='failure-test'>\n")
+        failures_context.append(self._get_failure_case_title(
+            suite_name, suite.result.total))
+        if suite.result.total == 0:
+            failures_context.append(self._get_failure_case_td_context(
+                0, suite, suite_name, ReportConstant.unavailable))
+        else:
+            skipped_num = 0
+            for index, case in enumerate(suite.cases):
+                result = case.get_result()
+                if result == ReportConstant.passed or \
+                        result == ReportConstant.ignored:
+                    skipped_num += 1
+                    continue
+                failures_context.append(self._get_failure_case_td_context(
+                    index - skipped_num, case, suite_name, result))
+        failures_context.append("</table>\n")
 
     @classmethod
     def _get_failure_case_td_context(cls, index, case, suite_name, result):
@@ -1008,7 +1087,7 @@ class VisionHelper:
         vision_file = os.fdopen(vision_file_open, "wb")
         if check_pub_key_exist():
             try:
-                cipher_text = do_rsa_encrypt(report_context)
+                cipher_text = do_encrypt(report_context)
             except ParamError as error:
                 LOG.error(error, error_no=error.error_no)
                 cipher_text = b""
@@ -16,12 +16,17 @@
 # limitations under the License.
 #
 
+import hashlib
 import os
 import platform
 import shutil
+import tempfile
 import time
 import zipfile
+import zlib
 from ast import literal_eval
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from _core.interface import IReporter
 from _core.plugin import Plugin
@@ -31,14 +36,19 @@ from _core.logger import platform_logger
 from _core.exception import ParamError
 from _core.utils import get_filename_extension
 from _core.report.encrypt import check_pub_key_exist
-from _core.report.encrypt import do_rsa_encrypt
-from _core.report.encrypt import get_file_summary
+from _core.report.encrypt import do_encrypt
 from _core.report.reporter_helper import DataHelper
 from _core.report.reporter_helper import ExecInfo
 from _core.report.reporter_helper import VisionHelper
 from _core.report.reporter_helper import ReportConstant
 
 LOG = platform_logger("ResultReporter")
+ARCHIVE_WORKERS = min(8, os.cpu_count() or 1)
+ARCHIVE_BUFFER_SIZE = 1024 * 1024
+ARCHIVE_SPOOL_SIZE = 16 * 1024 * 1024
+ARCHIVE_STORED_EXTENSIONS = (".zip", ".gz", ".hap")
+LATEST_STAGE_PREFIX = ".latest_"
+FICLONE = 0x40049409
 
 
 @Plugin(type=Plugin.REPORTER, id=TestType.all)
@@ -308,30 +318,42 @@ class ResultReporter(IReporter):
                  summary.result.ignored, summary.result.unavailable)
         LOG.info("Log path: %s", self.exec_info.log_path)
 
+        # render summary, details and failures vision reports in one pass
+        render_targets = {ReportConstant.summary_vision_report:
+                          ReportConstant.summary_title}
+        is_paged_details = summary.result.total > \
+            VisionHelper.MAX_DETAILS_CASES and not check_pub_key_exist()
+        if summary.result.total > 0 and not is_paged_details:
+            render_targets[ReportConstant.details_vision_report] = \
+                ReportConstant.details_title
+        if summary.result.total != (
+                summary.result.passed + summary.result.ignored) or \
+                summary.result.unavailable > 0:
+            render_targets[ReportConstant.failures_vision_report] = \
+                ReportConstant.failures_title
+        report_contexts = self.vision_helper.render_all(parsed_data,
+                                                        render_targets)
+
         # generate summary vision report
         report_generate_flag = self._generate_vision_report(
-            parsed_data, ReportConstant.summary_title,
-            ReportConstant.summary_vision_report)
+            report_contexts, ReportConstant.summary_vision_report)
 
         # generate details vision report
-        if report_generate_flag and summary.result.total > 0:
+        if report_generate_flag and is_paged_details:
+            _, _, suites = parsed_data
+            self.vision_helper.generate_paged_details_report(
+                self.report_path, ReportConstant.details_title, suites)
+        elif report_generate_flag and summary.result.total > 0:
             self._generate_vision_report(
-                parsed_data, ReportConstant.details_title,
-                ReportConstant.details_vision_report)
+                report_contexts, ReportConstant.details_vision_report)
 
         # generate failures vision report
-        if summary.result.total != (
-                summary.result.passed + summary.result.ignored) or \
-                summary.result.unavailable > 0:
+        if ReportConstant.failures_vision_report in render_targets:
             self._generate_vision_report(
-                parsed_data, ReportConstant.failures_title,
-                ReportConstant.failures_vision_report)
-
-    def _generate_vision_report(self, parsed_data, title, render_target):
+                report_contexts, ReportConstant.failures_vision_report)
 
-        # render data
-        report_context = self.vision_helper.render_data(
-            title, parsed_data, render_target=render_target)
+    def _generate_vision_report(self, report_contexts, render_target):
+        report_context = report_contexts.get(render_target, "")
 
         # generate report
         if report_context:
@@ -431,7 +453,7 @@ class ResultReporter(IReporter):
         with os.fdopen(summary_filepath_open, "wb") as file_handler:
             if check_pub_key_exist():
                 try:
-                    cipher_text = do_rsa_encrypt(summary_ini_content)
+                    cipher_text = do_encrypt(summary_ini_content)
                 except ParamError as error:
                     LOG.error(error, error_no=error.error_no)
                     cipher_text = b""
@@ -447,22 +469,63 @@ class ResultReporter(IReporter):
             return
 
         from xdevice import Variables
-        dst_path = os.path.join(Variables.exec_dir,
-                                Variables.report_vars.report_dir, "latest")
+        report_dir = os.path.join(Variables.exec_dir,
+                                  Variables.report_vars.report_dir)
+        dst_path = os.path.join(report_dir, "latest")
+        stage_path = os.path.join(report_dir, "%s%s" % (
+            LATEST_STAGE_PREFIX, os.path.basename(self.report_path)))
         try:
-            shutil.rmtree(dst_path, ignore_errors=True)
-            os.makedirs(dst_path, exist_ok=True)
+            shutil.rmtree(stage_path, ignore_errors=True)
+            os.makedirs(stage_path, exist_ok=True)
             LOG.info("copy summary files to %s", dst_path)
 
-            # copy reports to reports/latest folder
+            # link reports to the stage folder, then publish it as latest
             for report_file in os.listdir(self.report_path):
                 src_file = os.path.join(self.report_path, report_file)
-                dst_file = os.path.join(dst_path, report_file)
+                dst_file = os.path.join(stage_path, report_file)
                 if os.path.isfile(src_file):
-                    shutil.copyfile(src_file, dst_file)
-        except OSError:
+                    _link_file(src_file, dst_file)
+                elif report_file == ReportConstant.details_data_dir:
+                    shutil.copytree(src_file, dst_file,
+                                    copy_function=_link_file)
+            self._publish_latest(stage_path, dst_path)
+        except OSError as error:
+            LOG.warning("copy summary files error: %s", error)
             return
 
+    @classmethod
+    def _publish_latest(cls, stage_path, dst_path):
+        old_stage_path = ""
+        if os.path.islink(dst_path):
+            old_stage_path = os.path.realpath(dst_path)
+
+        link_path = "%s.link" % stage_path
+        try:
+            if os.path.lexists(link_path):
+                os.remove(link_path)
+            os.symlink(os.path.basename(stage_path), link_path,
+                       target_is_directory=True)
+            if os.path.isdir(dst_path) and not os.path.islink(dst_path):
+                # latest folder created by the copy based implementation
+                shutil.rmtree(dst_path, ignore_errors=True)
+            os.replace(link_path, dst_path)
+        except (OSError, NotImplementedError):
+            # symlink is not permitted, e.g. on windows, rename folders
+            if os.path.lexists(link_path):
+                os.remove(link_path)
+            backup_path = "%s.old" % stage_path
+            if os.path.islink(dst_path):
+                os.remove(dst_path)
+            elif os.path.exists(dst_path):
+                os.rename(dst_path, backup_path)
+            os.rename(stage_path, dst_path)
+            shutil.rmtree(backup_path, ignore_errors=True)
+        else:
+            if old_stage_path != os.path.realpath(stage_path) and \
+                    os.path.basename(old_stage_path).startswith(
+                        LATEST_STAGE_PREFIX):
+                shutil.rmtree(old_stage_path, ignore_errors=True)
+
     def _compress_report_folder(self):
         if self._check_mode(ModeType.decc):
             return
@@ -480,31 +543,85 @@ class ResultReporter(IReporter):
                 file_path_list.append(
                     (os.path.join(dir_path, filename), f_path + filename))
 
-        # compress file
-        zipped_file = "%s.zip" % os.path.join(
-            self.report_path, os.path.basename(self.report_path))
-        zip_object = zipfile.ZipFile(zipped_file, 'w', zipfile.ZIP_DEFLATED,
-                                     allowZip64=True)
-        try:
-            LOG.info("executing compress process, please wait...")
-            for src_path, target_path in file_path_list:
-                zip_object.write(src_path, target_path)
-            LOG.info("generate zip file: %s", zipped_file)
-        except zipfile.BadZipFile as bad_error:
-            LOG.error("zip report folder error: %s" % bad_error.args)
-        finally:
-            zip_object.close()
-
-        # generate hex digest, then save it to summary_report.hash
+        # compress file, the hex digest is computed while writing
+        from xdevice import Variables
+        LOG.info("executing compress process, please wait...")
+        archive_file, hex_digest = None, ""
+        archive_format = Variables.report_vars.archive_format
+        if archive_format == "tar.zst":
+            archive_file, hex_digest = self._compress_to_tar_zst(
+                file_path_list)
+        elif archive_format and archive_format != "zip":
+            LOG.warning("archive format '%s' is not supported, use zip "
+                        "instead" % archive_format)
+        if not archive_file:
+            archive_file, hex_digest = self._compress_to_zip(file_path_list)
+
+        # save hex digest to summary_report.hash
         hash_file = os.path.abspath(os.path.join(
             self.report_path, ReportConstant.summary_report_hash))
         hash_file_open = os.open(hash_file,
                                  os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o755)
         with os.fdopen(hash_file_open, "w") as hash_file_handler:
-            hash_file_handler.write(get_file_summary(zipped_file))
+            hash_file_handler.write(hex_digest)
             LOG.info("generate hash file: %s", hash_file)
             hash_file_handler.flush()
-        return zipped_file
+        return archive_file
+
+    def _compress_to_zip(self, file_path_list):
+        zipped_file = "%s.zip" % os.path.join(
+            self.report_path, os.path.basename(self.report_path))
+        with open(zipped_file, "wb") as file_handler:
+            hash_writer = _HashWriter(file_handler)
+            zip_object = zipfile.ZipFile(hash_writer, 'w',
+                                         zipfile.ZIP_DEFLATED,
+                                         allowZip64=True)
+            try:
+                # deflate files on worker threads, zlib releases the GIL,
+                # and keep a bounded window of pending files in order
+                with ThreadPoolExecutor(
+                        max_workers=ARCHIVE_WORKERS) as executor:
+                    pending = deque()
+                    for src_path, target_path in file_path_list:
+                        pending.append(executor.submit(
+                            _deflate_file, src_path, target_path))
+                        if len(pending) >= ARCHIVE_WORKERS * 2:
+                            _write_zip_entry(zip_object,
+                                             pending.popleft().result())
+                    while pending:
+                        _write_zip_entry(zip_object,
+                                         pending.popleft().result())
+                LOG.info("generate zip file: %s", zipped_file)
+            except (zipfile.BadZipFile, OSError) as error:
+                LOG.error("zip report folder error: %s" % error.args)
+            finally:
+                zip_object.close()
+        return zipped_file, hash_writer.hexdigest()
+
+    def _compress_to_tar_zst(self, file_path_list):
+        try:
+            import zstandard
+        except ModuleNotFoundError:
+            LOG.warning("zstandard is not installed, use zip instead")
+            return None, ""
+
+        import tarfile
+        tar_file = "%s.tar.zst" % os.path.join(
+            self.report_path, os.path.basename(self.report_path))
+        with open(tar_file, "wb") as file_handler:
+            hash_writer = _HashWriter(file_handler)
+            compressor = zstandard.ZstdCompressor(threads=-1)
+            try:
+                with compressor.stream_writer(
+                        hash_writer, closefd=False) as zst_writer, \
+                        tarfile.open(fileobj=zst_writer,
+                                     mode="w|") as tar_object:
+                    for src_path, target_path in file_path_list:
+                        tar_object.add(src_path, target_path)
+                LOG.info("generate tar file: %s", tar_file)
+            except (tarfile.TarError, zstandard.ZstdError, OSError) as error:
+                LOG.error("tar report folder error: %s" % error.args)
+        return tar_file, hash_writer.hexdigest()
 
     @classmethod
     def _check_mode(cls, mode):
@@ -644,3 +761,119 @@ class ResultReporter(IReporter):
     def get_path_of_summary_report(cls):
         if cls.summary_report_result:
             return cls.summary_report_result[0][0]
+
+
+class _HashWriter:
+    """write-only stream which hashes the data written to the file.
+    seek is not provided, so that zipfile writes the archive sequentially.
+    """
+
+    def __init__(self, file_handler, algorithm="sha256"):
+        self.file_handler = file_handler
+        self.hash_object = hashlib.new(algorithm)
+        self.position = 0
+
+    def write(self, data):
+        self.hash_object.update(data)
+        self.position += len(data)
+        return self.file_handler.write(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.file_handler.flush()
+
+    def hexdigest(self):
+        return self.hash_object.hexdigest()
+
+
+def _link_file(src_file, dst_file):
+    # hard link, then reflink, then copy when the former is not supported
+    try:
+        os.link(src_file, dst_file)
+        return dst_file
+    except OSError:
+        pass
+    try:
+        import fcntl
+        with open(src_file, "rb") as src_handler, \
+                open(dst_file, "wb") as dst_handler:
+            fcntl.ioctl(dst_handler.fileno(), FICLONE, src_handler.fileno())
+        return dst_file
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(src_file, dst_file)
+    return dst_file
+
+
+def _read_file(file_handler):
+    while True:
+        data = file_handler.read(ARCHIVE_BUFFER_SIZE)
+        if not data:
+            break
+        yield data
+
+
+def _deflate_file(src_path, target_path):
+    zip_info = zipfile.ZipInfo.from_file(src_path, target_path)
+    zip_info.CRC = 0
+    spool_file = None
+    if src_path.lower().endswith(ARCHIVE_STORED_EXTENSIONS):
+        # already compressed, only crc is calculated here
+        zip_info.compress_type = zipfile.ZIP_STORED
+        with open(src_path, "rb") as src_file:
+            for data in _read_file(src_file):
+                zip_info.CRC = zlib.crc32(data, zip_info.CRC)
+        zip_info.compress_size = zip_info.file_size
+        return zip_info, spool_file, src_path
+
+    zip_info.compress_type = zipfile.ZIP_DEFLATED
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED,
+                                  -zlib.MAX_WBITS)
+    spool_file = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_SIZE)
+    with open(src_path, "rb") as src_file:
+        for data in _read_file(src_file):
+            zip_info.CRC = zlib.crc32(data, zip_info.CRC)
+            spool_file.write(compressor.compress(data))
+    spool_file.write(compressor.flush())
+    zip_info.compress_size = spool_file.tell()
+    spool_file.seek(0)
+    return zip_info, spool_file, src_path
+
+
+def _can_write_raw_entry(zip_object):
+    # a deflated entry is appended through the internal state of ZipFile,
+    # which is checked here as it may change with the python version
+    for name in ["fp", "filelist", "NameToInfo", "start_dir"]:
+        if not hasattr(zip_object, name):
+            return False
+    if getattr(zip_object, "_writing", False):
+        return False
+    try:
+        return zip_object.fp.tell() == zip_object.start_dir
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def _write_zip_entry(zip_object, deflated_result):
+    zip_info, spool_file, src_path = deflated_result
+    if not _can_write_raw_entry(zip_object):
+        # compress the file again in ZipFile
+        if spool_file:
+            spool_file.close()
+        zip_object.write(src_path, zip_info.filename,
+                         compress_type=zip_info.compress_type)
+        return
+    file_handler = zip_object.fp
+    zip_info.header_offset = file_handler.tell()
+    file_handler.write(zip_info.FileHeader())
+    if spool_file:
+        with spool_file:
+            shutil.copyfileobj(spool_file, file_handler, ARCHIVE_BUFFER_SIZE)
+    else:
+        with open(src_path, "rb") as src_file:
+            shutil.copyfileobj(src_file, file_handler, ARCHIVE_BUFFER_SIZE)
+    zip_object.filelist.append(zip_info)
+    zip_object.NameToInfo[zip_info.filename] = zip_info
+    zip_object.start_dir = file_handler.tell()
@@ -21,6 +21,8 @@ import time
 from enum import Enum
 from threading import RLock
 
+from _core.context import TaskScoped
+from _core.context import TaskScopedMeta
 from _core.constants import ModeType
 from _core.logger import platform_logger
 from _core.report.encrypt import check_pub_key_exist
@@ -39,11 +41,12 @@ class ResultCode(Enum):
     SKIPPED = 2
 
 
-class SuiteReporter:
-    suite_list = []
-    suite_report_result = []
-    failed_case_list = []
-    history_report_result = []
+class SuiteReporter(metaclass=TaskScopedMeta):
+    # results of the task in the current task context
+    suite_list = TaskScoped(list)
+    suite_report_result = TaskScoped(list)
+    failed_case_list = TaskScoped(list)
+    history_report_result = TaskScoped(list)
 
     def __init__(self, results, report_name, report_path=None, **kwargs):
         """
@@ -167,6 +170,9 @@ class SuiteReporter:
         if self.args.get(ReportConstant.module_name, ""):
             test_suites_attributes[ReportConstant.name] = self.args.get(
                 ReportConstant.module_name, "")
+        if self.args.get(ReportConstant.launches, 0):
+            test_suites_attributes[ReportConstant.launches] = self.args.get(
+                ReportConstant.launches)
         need_update_attributes = [ReportConstant.time, ReportConstant.errors,
                                   ReportConstant.tests, ReportConstant.ignored,
                                   ReportConstant.disabled,
@@ -18,7 +18,9 @@
 
 import json
 import os
+import pickle
 import stat
+import threading
 from _core.exception import ParamError
 from _core.logger import platform_logger
 from _core.plugin import Config
@@ -26,6 +28,9 @@ from _core.plugin import Config
 __all__ = ["JsonParser"]
 LOG = platform_logger("JsonParser")
 
+# parsed json strings kept at most, json files are all kept
+JSON_CONTENT_CACHE_SIZE = 1024
+
 
 class JsonParser:
     """
@@ -53,6 +58,12 @@ class JsonParser:
     }
     """
 
+    # parsed and checked json content shared by all the instances, kept
+    # pickled so that it can not be changed, every load returns new objects,
+    # {key: ((mtime_ns, size), pickled json_content)}
+    _cache = dict()
+    _lock = threading.Lock()
+
     def __init__(self, path_or_content):
         """Instantiate the class using the manifest file denoted by path or
         content
@@ -61,39 +72,76 @@ class JsonParser:
         self._do_parse(path_or_content)
 
     def _do_parse(self, path_or_content):
+        json_content = self._load(path_or_content)
+
+        # set self.config, json_content belongs to this instance only, so
+        # callers may update the kits, environment and driver
+        self.config = Config()
+        self.config.description = json_content.get("description", "")
+        self.config.kits = json_content.get("kits", [])
+        self.config.environment = json_content.get("environment", [])
+        self.config.driver = json_content.get("driver") or {}
+
+    @classmethod
+    def _load(cls, path_or_content):
         try:
-            if path_or_content.find("{") != -1:
-                json_content = json.loads(
-                    path_or_content, encoding="utf-8")
+            if cls._is_content(path_or_content):
+                key, file_stat = ("content", path_or_content), None
             else:
-                if not os.path.exists(path_or_content):
+                key = os.path.abspath(path_or_content)
+                try:
+                    file_stat = os.stat(key)
+                except FileNotFoundError:
                     raise ParamError("The json file {} does not exist".format(
                         path_or_content), error_no="00110")
+                file_stat = (file_stat.st_mtime_ns, file_stat.st_size)
+        except (TypeError, AttributeError) as error:
+            raise ParamError("json file error: %s %s" % (
+                path_or_content, error), error_no="00111")
+
+        with cls._lock:
+            cached = cls._cache.get(key)
+        if cached and cached[0] == file_stat:
+            return pickle.loads(cached[1])
+
+        json_content = cls._parse(path_or_content, file_stat is None)
+        cls._check_config(json_content)
+        pickled_content = pickle.dumps(json_content, pickle.HIGHEST_PROTOCOL)
+        with cls._lock:
+            if file_stat is None and key not in cls._cache and \
+                    len(cls._cache) >= JSON_CONTENT_CACHE_SIZE:
+                for cached_key in list(cls._cache):
+                    if cached_key[0] == "content":
+                        del cls._cache[cached_key]
+            cls._cache[key] = (file_stat, pickled_content)
+        return json_content
 
-                flags = os.O_RDONLY
-                modes = stat.S_IWUSR | stat.S_IRUSR
-                with os.fdopen(os.open(path_or_content, flags, modes),
-                               "r") as file_content:
-                    json_content = json.load(file_content)
+    @classmethod
+    def _parse(cls, path_or_content, is_content):
+        try:
+            if is_content:
+                return json.loads(path_or_content)
+            flags = os.O_RDONLY
+            modes = stat.S_IWUSR | stat.S_IRUSR
+            with os.fdopen(os.open(path_or_content, flags, modes),
+                           "r") as file_content:
+                return json.load(file_content)
         except (TypeError, ValueError, AttributeError) as error:
             raise ParamError("json file error: %s %s" % (
                 path_or_content, error), error_no="00111")
-        self._check_config(json_content)
 
-        # set self.config
-        self.config = Config()
-        self.config.description = json_content.get("description", "")
-        self.config.kits = json_content.get("kits", [])
-        self.config.environment = json_content.get("environment", [])
-        self.config.driver = json_content.get("driver", {})
+    @classmethod
+    def _is_content(cls, path_or_content):
+        return path_or_content.lstrip().startswith("{")
 
-    def _check_config(self, json_content):
+    @classmethod
+    def _check_config(cls, json_content):
         for kit in json_content.get("kits", []):
-            self._check_type_key_exist("kits", kit)
+            cls._check_type_key_exist("kits", kit)
         for device in json_content.get("environment", []):
-            self._check_type_key_exist("environment", device)
+            cls._check_type_key_exist("environment", device)
         if json_content.get("driver", {}):
-            self._check_type_key_exist("driver", json_content.get("driver"))
+            cls._check_type_key_exist("driver", json_content.get("driver"))
 
     @classmethod
     def _check_type_key_exist(cls, key, value):
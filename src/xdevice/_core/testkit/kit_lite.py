@@ -46,6 +46,8 @@ from _core.exception import LiteDeviceConnectError
 from _core.constants import DeviceLabelType
 from _core.constants import FilePermission
 from _core.environment.manager_env import DeviceAllocationState
+from _core.environment.nfs_lite import SFTP_UPLOAD_WORKERS
+from _core.environment.nfs_lite import SftpSessionPool
 
 
 __all__ = ["DeployKit", "MountKit", "RootFsKit", "QueryKit", "LiteShellKit",
@@ -154,9 +156,13 @@ class MountKit(ITestKit):
         self.server = ""
         self.file_name_list = []
         self.remote_info = None
+        self.upload_workers = SFTP_UPLOAD_WORKERS
 
     def __check_config__(self, config):
         self.remote = get_config_value('server', config, is_list=False)
+        if str(get_config_value('parallel-upload', config, is_list=False,
+                                default="true")).lower() == "false":
+            self.upload_workers = 1
         self.paths = get_config_value('paths', config)
         self.mount_list = get_config_value('mount', config, is_list=True)
         self.server = get_config_value('server', config, is_list=False,
@@ -327,46 +333,49 @@ class MountKit(ITestKit):
         if not remote_ip or not port or not remote_dir:
             LOG.warning("nfs server's ip or port or dir is empty")
             return
-        for _file in file_local_paths:
+        if not is_remote.lower() == "false":
             # remote copy
+            LOG.info("Trying to copy {} files to nfs server".format(
+                len(file_local_paths)))
+            import paramiko
+            try:
+                failures = SftpSessionPool.upload_files(
+                    remote_info, file_local_paths, remote_dir,
+                    workers=self.upload_workers)
+            except (OSError, EOFError, paramiko.SSHException) as exception:
+                failures = dict.fromkeys(file_local_paths, exception)
+            for _file, exception in failures.items():
+                msg = "copy file {} to nfs server failed with error {}" \
+                    .format(_file, exception)
+                LOG.error(msg, error_no="00403")
+            self.file_name_list.extend(
+                [os.path.basename(_file) for _file in file_local_paths])
+            return self.file_name_list
+
+        # local copy
+        for _file in file_local_paths:
             LOG.info("Trying to copy the file from {} to nfs server".
                      format(_file))
-            if not is_remote.lower() == "false":
+            for count in range(1, 4):
                 try:
-                    import paramiko
-                    client = paramiko.Transport(remote_ip, int(port))
-                    client.connect(username=remote_info.get("username"),
-                                   password=remote_info.get("password"))
-                    sftp = paramiko.SFTPClient.from_transport(client)
-                    sftp.put(localpath=_file, remotepath=os.path.join(
-                        remote_info.get("dir"), os.path.basename(_file)))
-                    client.close()
-                except (OSError, Exception) as exception:
-                    msg = "copy file to nfs server failed with error {}" \
-                        .format(exception)
-                    LOG.error(msg, error_no="00403")
-            # local copy
-            else:
-                for count in range(1, 4):
-                    try:
-                        os.remove(os.path.join(remote_info.get("dir"),
-                                               os.path.basename(_file)))
-                    except Exception as _:
-                        pass
-                    shutil.copy(_file, remote_info.get("dir"))
-                    if check_server_file(_file, remote_info.get("dir")):
-                        break
-                    else:
-                        LOG.info(
-                            "Trying to copy the file from {} to nfs "
-                            "server {} times".format(_file, count))
-                        if count == 3:
-                            msg = "copy {} to nfs server " \
-                                  "failed {} times".format(
-                                os.path.basename(_file), count)
-                            LOG.error(msg, error_no="00403")
-                            LOG.debug("Nfs server:{}".format(glob.glob(
-                                os.path.join(remote_info.get("dir"), '*.*'))))
+                    os.remove(os.path.join(remote_info.get("dir"),
+                                           os.path.basename(_file)))
+                except Exception as _:
+                    pass
+                shutil.copy(_file, remote_info.get("dir"))
+                if check_server_file(_file, remote_info.get("dir")):
+                    break
+                else:
+                    LOG.info(
+                        "Trying to copy the file from {} to nfs "
+                        "server {} times".format(_file, count))
+                    if count == 3:
+                        msg = "copy {} to nfs server " \
+                              "failed {} times".format(
+                            os.path.basename(_file), count)
+                        LOG.error(msg, error_no="00403")
+                        LOG.debug("Nfs server:{}".format(glob.glob(
+                            os.path.join(remote_info.get("dir"), '*.*'))))
 
             self.file_name_list.append(os.path.basename(_file))
 
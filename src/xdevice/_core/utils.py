@@ -35,7 +35,7 @@ from _core.exception import ParamError
 from _core.exception import ExecuteTerminate
 from _core.logger import platform_logger
 from _core.report.suite_reporter import SuiteReporter
-from _core.plugin import get_plugin
+from _core.plugin import create_plugin
 from _core.plugin import Plugin
 from _core.constants import ModeType
 from _core.constants import ConfigConst
@@ -404,6 +404,25 @@ def check_result_report(report_root_dir, report_file, error_message="",
     return "%s.xml" % os.path.join(result_dir, suite_name)
 
 
+def is_result_passed(report_file, error_message=""):
+    """
+    whether the tests of report_file have run and all passed
+    """
+    from _core.report.reporter_helper import DataHelper
+    from _core.report.reporter_helper import ReportConstant
+    if error_message or not report_file or not os.path.exists(report_file):
+        return False
+    test_suites = DataHelper.parse_data_report(report_file)
+    try:
+        for attribute in [ReportConstant.failures, ReportConstant.errors,
+                          ReportConstant.unavailable]:
+            if int(test_suites.get(attribute) or 0):
+                return False
+        return int(test_suites.get(ReportConstant.tests) or 0) > 0
+    except ValueError:
+        return False
+
+
 def get_sub_path(test_suite_path):
     pattern = "%stests%s" % (os.sep, os.sep)
     file_dir = os.path.dirname(test_suite_path)
@@ -474,15 +493,12 @@ def convert_serial(serial):
 
 def get_shell_handler(request, parser_type):
     suite_name = request.root.source.test_name
-    parsers = get_plugin(Plugin.PARSER, parser_type)
-    parser_instances = []
+    parser_instances = create_plugin(Plugin.PARSER, parser_type)
     for listener in request.listeners:
         listener.device_sn = request.config.environment.devices[0].device_sn
-    for parser in parsers:
-        parser_instance = parser.__class__()
+    for parser_instance in parser_instances:
         parser_instance.suite_name = suite_name
         parser_instance.listeners = request.listeners
-        parser_instances.append(parser_instance)
     handler = ShellHandler(parser_instances)
     return handler
 
@@ -500,10 +516,10 @@ def get_kit_instances(json_config, resource_path="", testcases_path=""):
         kit["paths"] = [resource_path, testcases_path]
         kit_type = kit.get("type", "")
         device_name = kit.get("device_name", None)
-        if get_plugin(plugin_type=Plugin.TEST_KIT, plugin_id=kit_type):
-            test_kit = \
-                get_plugin(plugin_type=Plugin.TEST_KIT, plugin_id=kit_type)[0]
-            test_kit_instance = test_kit.__class__()
+        test_kits = create_plugin(plugin_type=Plugin.TEST_KIT,
+                                  plugin_id=kit_type, limit=1)
+        if test_kits:
+            test_kit_instance = test_kits[0]
             test_kit_instance.__check_config__(kit)
             setattr(test_kit_instance, "device_name", device_name)
             kit_instances.append(test_kit_instance)
@@ -34,6 +34,9 @@ sys.path.insert(2, TOP_DIR)
 sys.path.insert(3, SRC_ADAPTER_DIR)
 sys.path.insert(4, TOP_ADAPTER_DIR)
 
+from _core.context import TaskScoped
+from _core.context import TaskScopedMeta
+
 
 @dataclass
 class ReportVariables:
@@ -42,18 +45,20 @@ class ReportVariables:
     log_format = ""
     log_level = ""
     log_handler = ""
+    archive_format = ""
     pub_key_file = None
     pub_key_string = ""
 
 
 @dataclass
-class Variables:
+class Variables(metaclass=TaskScopedMeta):
     modules_dir = ""
     top_dir = ""
     res_dir = ""
     exec_dir = ""
     report_vars = ReportVariables()
-    task_name = ""
+    # report folder name of the task in the current task context
+    task_name = TaskScoped(str)
     source_code_rootpath = ""
 
 
@@ -74,6 +79,7 @@ def _init_global_config():
                                        "[%(levelname)s] %(message)s"
     Variables.report_vars.log_level = logging.INFO
     Variables.report_vars.log_handler = "console, file"
+    Variables.report_vars.archive_format = "zip"
 
     # set execution directory
     if not Variables.exec_dir:
@@ -133,34 +139,30 @@ def _init_logger():
                                    Variables.report_vars.log_format)
 
 
-def _iter_module_plugins(packages):
-    import importlib
-    import pkgutil
-    for package in packages:
-        pkg_path = getattr(package, "__path__", "")
-        pkg_name = getattr(package, "__name__", "")
-        if not pkg_name or not pkg_path:
-            continue
-
-        _iter_modules = pkgutil.iter_modules(pkg_path, "%s%s" % (
-            pkg_name, "."))
-        for _, name, _ in _iter_modules:
-            importlib.import_module(name)
-
-
-def _load_internal_plugins():
-    import _core.driver
-    import _core.testkit
-    import _core.environment
-    import _core.executor
-    _iter_module_plugins([_core.driver, _core.testkit, _core.environment,
-                          _core.executor])
+def _add_internal_plugins():
+    from _core.plugin import Plugin
+    from _core.plugin import add_plugin_modules
+
+    # the internal plugin modules are imported on the first lookup of
+    # their plugin type
+    internal_plugins = {
+        Plugin.SCHEDULER: ["_core.executor.scheduler"],
+        Plugin.DRIVER: ["_core.driver.drivers_lite",
+                        "_core.driver.device_test"],
+        Plugin.DEVICE: ["_core.environment.device_lite"],
+        Plugin.PARSER: ["_core.driver.parser_lite"],
+        Plugin.LISTENER: ["_core.executor.listener"],
+        Plugin.TEST_KIT: ["_core.testkit.kit_lite"],
+        Plugin.MANAGER: ["_core.environment.manager_lite"],
+        Plugin.REPORTER: ["_core.report.result_reporter"]
+    }
+    for plugin_type, module_names in internal_plugins.items():
+        add_plugin_modules(plugin_type, module_names)
 
 
 _init_global_config()
-_load_internal_plugins()
+_add_internal_plugins()
 
 del _init_global_config
 del _init_logger
-del _load_internal_plugins
-del _iter_module_plugins
+del _add_internal_plugins
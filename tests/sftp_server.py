@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import socket
+import threading
+
+import paramiko
+
+__all__ = ["LocalSftpServer"]
+
+# the password accepted for every user name
+PASSWORD = "test"
+
+
+class _SftpHandle(paramiko.SFTPHandle):
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(
+            os.fstat(self.readfile.fileno()))
+
+
+class _SftpServer(paramiko.SFTPServerInterface):
+    """
+    sftp server on the local file system, paths are used as they are
+    """
+
+    def __init__(self, server, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.stats = server.stats
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(path))
+        except OSError as error:
+            return paramiko.SFTPServer.convert_errno(error.errno)
+
+    lstat = stat
+
+    def list_folder(self, path):
+        try:
+            return [paramiko.SFTPAttributes.from_stat(
+                os.stat(os.path.join(path, name)), name)
+                for name in os.listdir(path)]
+        except OSError as error:
+            return paramiko.SFTPServer.convert_errno(error.errno)
+
+    def open(self, path, flags, attr):
+        try:
+            file_descriptor = os.open(path, flags, 0o644)
+        except OSError as error:
+            return paramiko.SFTPServer.convert_errno(error.errno)
+        if flags & os.O_WRONLY:
+            mode = "wb"
+        elif flags & os.O_RDWR:
+            mode = "r+b"
+        else:
+            mode = "rb"
+        file_object = os.fdopen(file_descriptor, mode)
+        handle = _SftpHandle(flags)
+        handle.filename = path
+        handle.readfile = file_object
+        handle.writefile = file_object
+        if flags & (os.O_WRONLY | os.O_RDWR):
+            self.stats["puts"] += 1
+        return handle
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError as error:
+            return paramiko.SFTPServer.convert_errno(error.errno)
+        return paramiko.SFTP_OK
+
+    def chattr(self, path, attr):
+        try:
+            if getattr(attr, "st_mtime", None) is not None:
+                os.utime(path, (attr.st_atime, attr.st_mtime))
+        except OSError as error:
+            return paramiko.SFTPServer.convert_errno(error.errno)
+        return paramiko.SFTP_OK
+
+
+class _ServerInterface(paramiko.ServerInterface):
+    def __init__(self, stats):
+        self.stats = stats
+
+    def check_auth_password(self, username, password):
+        if password == PASSWORD:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+
+class LocalSftpServer:
+    """
+    Stand-in sftp server on localhost for testing the remote nfs code
+    offline, any user and password is accepted. stats counts the
+    connections and the files opened for writing.
+    """
+
+    def __init__(self):
+        self.stats = {"connections": 0, "puts": 0}
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.server_socket = None
+        self.transports = []
+        self.port = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def get_remote_nfs(self):
+        return {"ip": "127.0.0.1", "port": str(self.port), "username": "test",
+                "password": PASSWORD, "remote": "true"}
+
+    def start(self):
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR,
+                                      1)
+        self.server_socket.bind(("127.0.0.1", 0))
+        self.server_socket.listen(8)
+        self.port = self.server_socket.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def stop(self):
+        self.server_socket.close()
+        for transport in self.transports:
+            transport.close()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self.server_socket.accept()
+            except OSError:
+                return
+            self.stats["connections"] += 1
+            transport = paramiko.Transport(connection)
+            transport.add_server_key(self.host_key)
+            transport.set_subsystem_handler("sftp", paramiko.SFTPServer,
+                                            _SftpServer)
+            transport.start_server(server=_ServerInterface(self.stats))
+            self.transports.append(transport)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import socket
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+try:
+    import paramiko
+except ModuleNotFoundError:
+    paramiko = None
+
+import xdevice  # noqa: F401, sets the path of _core
+from _core.environment import nfs_lite
+from _core.environment.nfs_lite import SftpSessionPool
+
+
+@unittest.skipIf(paramiko is None, "paramiko is not installed")
+class SftpSessionPoolTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from sftp_server import LocalSftpServer
+        cls.server = LocalSftpServer()
+        cls.server.start()
+        cls.remote_nfs = cls.server.get_remote_nfs()
+
+    @classmethod
+    def tearDownClass(cls):
+        SftpSessionPool.close_all()
+        cls.server.stop()
+
+    def setUp(self):
+        SftpSessionPool.close_all()
+        self.idle_timeout = nfs_lite.SFTP_IDLE_TIMEOUT
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.src_dir = os.path.join(self.temp_dir.name, "src")
+        self.dst_dir = os.path.join(self.temp_dir.name, "dst")
+        os.makedirs(self.src_dir)
+        os.makedirs(self.dst_dir)
+        self.file_paths = []
+        for index in range(6):
+            file_path = os.path.join(self.src_dir, "file%s.bin" % index)
+            with open(file_path, "wb") as file_handler:
+                file_handler.write(os.urandom(64 * 1024))
+            self.file_paths.append(file_path)
+
+    def tearDown(self):
+        nfs_lite.SFTP_IDLE_TIMEOUT = self.idle_timeout
+        self.temp_dir.cleanup()
+
+    def _read(self, file_path):
+        with open(file_path, "rb") as file_handler:
+            return file_handler.read()
+
+    def test_acquire_reuses_session(self):
+        with SftpSessionPool.acquire(self.remote_nfs) as session:
+            session.sftp.listdir(self.dst_dir)
+        connections = self.server.stats["connections"]
+        with SftpSessionPool.acquire(self.remote_nfs) as reused_session:
+            self.assertIs(reused_session, session)
+        self.assertEqual(connections, self.server.stats["connections"])
+
+    def test_upload_files_skips_unchanged(self):
+        failures = SftpSessionPool.upload_files(
+            self.remote_nfs, self.file_paths, self.dst_dir, workers=3)
+        self.assertEqual({}, failures)
+        for file_path in self.file_paths:
+            self.assertEqual(self._read(file_path), self._read(os.path.join(
+                self.dst_dir, os.path.basename(file_path))))
+
+        puts = self.server.stats["puts"]
+        SftpSessionPool.upload_files(self.remote_nfs, self.file_paths,
+                                     self.dst_dir, workers=3)
+        self.assertEqual(puts, self.server.stats["puts"])
+
+        with open(self.file_paths[0], "ab") as file_handler:
+            file_handler.write(b"changed")
+        SftpSessionPool.upload_files(self.remote_nfs, self.file_paths,
+                                     self.dst_dir)
+        self.assertEqual(puts + 1, self.server.stats["puts"])
+
+    def test_upload_files_reports_failures(self):
+        missing_file = os.path.join(self.src_dir, "missing.bin")
+        failures = SftpSessionPool.upload_files(
+            self.remote_nfs, self.file_paths + [missing_file], self.dst_dir,
+            workers=2)
+        self.assertEqual([missing_file], list(failures))
+
+    def test_upload_files_raises_connection_errors(self):
+        # MountKit.copy_to_server reports these errors for all the files
+        expected_errors = (OSError, EOFError, paramiko.SSHException)
+        remote_nfs = dict(self.remote_nfs, password="wrong")
+        with self.assertRaises(paramiko.AuthenticationException):
+            SftpSessionPool.upload_files(remote_nfs, self.file_paths,
+                                         self.dst_dir)
+
+        with socket.socket() as free_socket:
+            free_socket.bind(("127.0.0.1", 0))
+            free_port = free_socket.getsockname()[1]
+        remote_nfs = dict(self.remote_nfs, port=str(free_port))
+        with self.assertRaises(expected_errors):
+            SftpSessionPool.upload_files(remote_nfs, self.file_paths,
+                                         self.dst_dir)
+
+    def test_idle_and_broken_sessions_are_replaced(self):
+        with SftpSessionPool.acquire(self.remote_nfs) as session:
+            pass
+        nfs_lite.SFTP_IDLE_TIMEOUT = 0
+        with SftpSessionPool.acquire(self.remote_nfs) as idle_session:
+            self.assertIsNot(idle_session, session)
+            self.assertFalse(session.transport.is_active())
+        nfs_lite.SFTP_IDLE_TIMEOUT = self.idle_timeout
+
+        with SftpSessionPool.acquire(self.remote_nfs) as broken_session:
+            broken_session.transport.close()
+        with SftpSessionPool.acquire(self.remote_nfs) as new_session:
+            self.assertIsNot(new_session, broken_session)
+            new_session.sftp.listdir(self.dst_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+measure the collection of started test cases and the removal of executed
+tests from the expected list
+
+usage: python tools/collect_bench.py [--cases N] [--old-cases N]
+
+Every case is reported started twice, as a rerun does, then half of the
+cases are removed from the expected list. The list based listener and
+remove_test, as they were before TestDescription was hashable, grow
+quadratically, so they run with --old-cases only, and their results are
+compared with CollectingTestListener and TestDescription.remove_test on
+the same cases.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+import xdevice  # noqa: E402, F401, sets the path of _core
+from _core.executor.listener import CollectingTestListener  # noqa: E402
+from _core.executor.listener import TestDescription  # noqa: E402
+from _core.interface import LifeCycle  # noqa: E402
+
+CaseResult = namedtuple("CaseResult", "test_class test_name")
+
+
+class OldTestDescription(object):
+    def __init__(self, class_name, test_name):
+        self.class_name = class_name
+        self.test_name = test_name
+
+    def __eq__(self, other):
+        return self.class_name == other.class_name and \
+               self.test_name == other.test_name
+
+    @classmethod
+    def remove_test(cls, tests, execute_tests):
+        for execute_test in execute_tests:
+            if execute_test in tests:
+                tests.remove(execute_test)
+        return tests
+
+
+class OldCollectingTestListener(object):
+    def __init__(self):
+        self.tests = []
+
+    def __started__(self, lifecycle, test_result):
+        if lifecycle == LifeCycle.TestCase:
+            if not test_result.test_class or not test_result.test_name:
+                return
+            test = OldTestDescription(test_result.test_class,
+                                      test_result.test_name)
+            if test not in self.tests:
+                self.tests.append(test)
+
+    def get_current_run_results(self):
+        return self.tests
+
+
+def _run(listener_class, description_class, cases):
+    results = [CaseResult("Suite%04d" % (index // 100), "test%06d" % index)
+               for index in range(cases)]
+    listener = listener_class()
+    start_time = time.perf_counter()
+    for _ in range(2):
+        for result in results:
+            listener.__started__(LifeCycle.TestCase, result)
+    tests = list(listener.get_current_run_results())
+    collect_time = time.perf_counter() - start_time
+
+    expected_tests = [description_class(result.test_class, result.test_name)
+                      for result in results]
+    start_time = time.perf_counter()
+    description_class.remove_test(expected_tests, tests[::2])
+    remove_time = time.perf_counter() - start_time
+    names = [(test.class_name, test.test_name) for test in tests]
+    left_names = [(test.class_name, test.test_name) for test in expected_tests]
+    return collect_time, remove_time, names, left_names
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="measure the collection and removal of test cases")
+    parser.add_argument("--cases", type=int, default=100000,
+                        help="cases collected, the default is 100000")
+    parser.add_argument("--old-cases", type=int, default=10000,
+                        help="cases collected by the list based listener, "
+                             "the default is 10000")
+    args = parser.parse_args()
+
+    old_collect, old_remove, old_names, old_left = _run(
+        OldCollectingTestListener, OldTestDescription, args.old_cases)
+    collect, remove, names, left = _run(
+        CollectingTestListener, TestDescription, args.old_cases)
+    print("%7d cases  list:         collect %7.2fs  remove %7.2fs" % (
+        args.old_cases, old_collect, old_remove))
+    print("%7d cases  ordered dict: collect %7.2fs  remove %7.2fs" % (
+        args.old_cases, collect, remove))
+    print("same results: %s" % (old_names == names and old_left == left))
+
+    collect, remove, _, _ = _run(CollectingTestListener, TestDescription,
+                                 args.cases)
+    print("%7d cases  ordered dict: collect %7.2fs  remove %7.2fs" % (
+        args.cases, collect, remove))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+measure the report encryption with the rsa fragments only and with the
+rsa wrapped aes-gcm key
+
+usage: python tools/encrypt_bench.py [--size MB] [--key-bits N]
+
+A temporary key pair is written to config/pub.key and config/pri.key of a
+temporary exec dir. Both outputs are decrypted with do_decrypt and
+compared with the content. rsa and cryptography are required. The rsa
+only decryption runs in pure python and takes about 45 seconds per MB.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+import xdevice  # noqa: E402, F401, sets the path of _core
+from _core.report.encrypt import PRIVATE_KEY_FILE  # noqa: E402
+from _core.report.encrypt import PUBLIC_KEY_FILE  # noqa: E402
+from _core.report.encrypt import do_decrypt  # noqa: E402
+from _core.report.encrypt import do_encrypt  # noqa: E402
+from _core.report.encrypt import do_rsa_encrypt  # noqa: E402
+from _core.report.encrypt import reset_encrypt_context  # noqa: E402
+
+
+def _write_keys(exec_dir, key_bits):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    private_key = rsa.generate_private_key(public_exponent=65537,
+                                           key_size=key_bits)
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption())
+    os.makedirs(os.path.join(exec_dir, "config"))
+    for key_file, key_pem in ((PUBLIC_KEY_FILE, public_pem),
+                              (PRIVATE_KEY_FILE, private_pem)):
+        with open(os.path.join(exec_dir, key_file), "wb") as file_handler:
+            file_handler.write(key_pem)
+
+
+def _report_content(size):
+    line = '<testcase name="testCase%06d" status="run" time="0.012" ' \
+           'classname="ActsUtilsTest" result="true" level="1"/>\n'
+    lines = []
+    length = 0
+    index = 0
+    while length < size:
+        lines.append(line % index)
+        length += len(lines[-1])
+        index += 1
+    return "".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="measure the report encryption")
+    parser.add_argument("--size", type=float, default=0.2,
+                        help="MB of report content, the default is 0.2")
+    parser.add_argument("--key-bits", type=int, default=2048,
+                        help="bits of the rsa key, the default is 2048")
+    args = parser.parse_args()
+
+    try:
+        import rsa  # noqa: F401
+        import cryptography  # noqa: F401
+    except ModuleNotFoundError as error:
+        print("rsa and cryptography are required, %s" % error)
+        return 1
+
+    from xdevice import Variables
+    content = _report_content(int(args.size * 1024 * 1024))
+    with tempfile.TemporaryDirectory() as exec_dir:
+        _write_keys(exec_dir, args.key_bits)
+        Variables.exec_dir = exec_dir
+        Variables.top_dir = exec_dir
+        Variables.report_vars.pub_key_string = ""
+        Variables.report_vars.pub_key_file = None
+        reset_encrypt_context()
+
+        results = []
+        for name, encrypt in (("rsa only", do_rsa_encrypt),
+                              ("rsa + aes-gcm", do_encrypt)):
+            start_time = time.perf_counter()
+            cipher_text = encrypt(content)
+            encrypt_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            plain_text = do_decrypt(cipher_text)
+            decrypt_time = time.perf_counter() - start_time
+            same = plain_text == content
+            results.append(same)
+            print("%-14s encrypt %7.3fs  decrypt %7.3fs  %6.2f MB out  "
+                  "decrypted content is the same: %s" % (
+                      name, encrypt_time, decrypt_time,
+                      len(cipher_text) / 1024 / 1024, same))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
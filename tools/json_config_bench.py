@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+measure the parsing of the module test configs of a large task
+
+usage: python tools/json_config_bench.py [--modules N] [--parses N]
+
+The module json files are written to a temporary directory. Every module
+config is parsed --parses times, as source discovery, the scheduler, the
+driver and get_kit_instances do in one task. The parse without the cache,
+as JsonParser did before, is compared with JsonParser.
+"""
+
+import argparse
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+import xdevice  # noqa: E402, F401, sets the path of _core
+from _core.plugin import Config  # noqa: E402
+from _core.testkit.json_parser import JsonParser  # noqa: E402
+
+
+def _module_config(index):
+    name = "Module%05d" % index
+    return {
+        "description": "Config for %s test cases" % name,
+        "environment": [{"type": "device", "label": "wifiiot"}],
+        "kits": [
+            {"type": "PushKit",
+             "push": ["%s/%s.bin->/data/test/" % (name, name),
+                      "%s/resource->/data/test/resource" % name],
+             "post-push": ["chmod -R 777 /data/test/*"]},
+            {"type": "ShellKit",
+             "run-command": ["mkdir -p /data/test", "remount"],
+             "teardown-command": ["rm -rf /data/test/%s.bin" % name]},
+            {"type": "MountKit", "server": "NfsServer",
+             "mount": [{"source": "testcases/%s" % name,
+                        "target": "/test_root/%s" % name}]},
+        ],
+        "driver": {"type": "CppTest", "module-name": name,
+                   "runtime-hint": "15s", "native-test-timeout": "90000"},
+    }
+
+
+def uncached_parse(file_path):
+    flags = os.O_RDONLY
+    modes = stat.S_IWUSR | stat.S_IRUSR
+    with os.fdopen(os.open(file_path, flags, modes), "r") as file_content:
+        json_content = json.load(file_content)
+    for kit in json_content.get("kits", []):
+        JsonParser._check_type_key_exist("kits", kit)
+    for device in json_content.get("environment", []):
+        JsonParser._check_type_key_exist("environment", device)
+    if json_content.get("driver", {}):
+        JsonParser._check_type_key_exist("driver", json_content.get("driver"))
+    config = Config()
+    config.description = json_content.get("description", "")
+    config.kits = json_content.get("kits", [])
+    config.environment = json_content.get("environment", [])
+    config.driver = json_content.get("driver", {})
+    return config
+
+
+def _run_task(parse, file_paths, parses):
+    start_time = time.perf_counter()
+    for _ in range(parses):
+        for file_path in file_paths:
+            parse(file_path)
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="measure the parsing of module test configs")
+    parser.add_argument("--modules", type=int, default=10000,
+                        help="module configs, the default is 10000")
+    parser.add_argument("--parses", type=int, default=4,
+                        help="parses of every module in one task, the "
+                             "default is 4")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_paths = []
+        for index in range(args.modules):
+            file_path = os.path.join(temp_dir, "Module%05d.json" % index)
+            with open(file_path, "w") as file_handler:
+                json.dump(_module_config(index), file_handler, indent=4)
+            file_paths.append(file_path)
+
+        uncached_time = _run_task(uncached_parse, file_paths, args.parses)
+        cached_time = _run_task(JsonParser, file_paths, args.parses)
+        next_pass_time = _run_task(JsonParser, file_paths, 1)
+        for file_path in file_paths[:100]:
+            if JsonParser(file_path).get_kits() != \
+                    uncached_parse(file_path).kits:
+                raise ValueError("different kits of %s" % file_path)
+
+    print("%s modules, %s parses per module" % (args.modules, args.parses))
+    print("without cache: %6.2fs" % uncached_time)
+    print("JsonParser:    %6.2fs  then %.2fs per pass" % (
+        cached_time, next_pass_time))
+
+
+if __name__ == "__main__":
+    main()
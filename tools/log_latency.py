@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+measure the log call latency of driver threads, writing with the file
+handler in the calling thread and through AsyncHandler
+
+usage: python tools/log_latency.py [--threads N] [--interval MS]
+                                   [--flush-delay MS] [--duration S]
+
+Every thread stands for a device and logs a line every interval. The
+file handler sleeps flush-delay on every flush, like a slow disk.
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+import xdevice  # noqa: E402, F401, sets the path of _core
+from _core.logger import AsyncHandler  # noqa: E402
+from _core.logger import flush_log  # noqa: E402
+
+
+class SlowFileHandler(logging.FileHandler):
+    def __init__(self, filename, flush_delay):
+        super().__init__(filename, encoding="utf-8")
+        self.flush_delay = flush_delay
+
+    def flush(self):
+        super().flush()
+        time.sleep(self.flush_delay)
+
+
+def _run(logger, threads, interval, duration):
+    latencies = [[] for _ in range(threads)]
+
+    def _log(index):
+        device = "device-%02d" % index
+        end_time = time.time() + duration
+        while time.time() < end_time:
+            start_time = time.perf_counter()
+            logger.info("[%s] execute shell command: %s", device,
+                        "hilog -r")
+            latencies[index].append(time.perf_counter() - start_time)
+            time.sleep(interval)
+
+    workers = [threading.Thread(target=_log, args=(index,))
+               for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return [latency * 1000 for thread_latencies in latencies
+            for latency in thread_latencies]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="measure the log call latency of driver threads")
+    parser.add_argument("--threads", type=int, default=64,
+                        help="logging threads, the default is 64")
+    parser.add_argument("--interval", type=float, default=50,
+                        help="ms between the lines of a thread, the default "
+                             "is 50")
+    parser.add_argument("--flush-delay", type=float, default=0.5,
+                        help="ms every flush of the file takes, the default "
+                             "is 0.5")
+    parser.add_argument("--duration", type=float, default=5,
+                        help="seconds every scenario runs, the default is 5")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in ("sync", "async"):
+            handler = SlowFileHandler(os.path.join(temp_dir, name + ".log"),
+                                      args.flush_delay / 1000)
+            if name == "async":
+                handler = AsyncHandler(handler)
+            logger = logging.getLogger("LogLatency.%s" % name)
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.addHandler(handler)
+            latencies = _run(logger, args.threads, args.interval / 1000,
+                             args.duration)
+            start_time = time.perf_counter()
+            flush_log()
+            flush_time = (time.perf_counter() - start_time) * 1000
+            logger.removeHandler(handler)
+            handler.close()
+            print("%-5s %6d calls  avg %7.3fms  median %7.3fms  "
+                  "max %7.2fms  flush at end %7.2fms" % (
+                      name, len(latencies), statistics.mean(latencies),
+                      statistics.median(latencies), max(latencies),
+                      flush_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+replay a recorded lite serial capture through the serial read loops
+
+usage: python tools/serial_replay.py [--repeat N] [--chunk BYTES]
+                                     [--capture FILE]
+
+The readline loop with the full rescan of check_read_test_end, as it was
+before ReadEndChecker, and LiteHelper.read_local_output_test read the same
+capture from a fake serial port. The test cases of the capture are
+repeated N times to make a long run. The end must be detected on the same
+line by both, and the output of the old loop must be a prefix of the new
+one, which also keeps the rest of the last chunk read.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TOOLS_DIR, "..", "src"))
+
+import xdevice  # noqa: E402, sets the path of _core
+from _core.environment import dmlib_lite  # noqa: E402
+from _core.environment.dmlib_lite import LiteHelper  # noqa: E402
+from _core.environment.dmlib_lite import ReadEndChecker  # noqa: E402
+from _core.environment.dmlib_lite import PATTERN  # noqa: E402
+
+DEFAULT_CAPTURE = os.path.join(TOOLS_DIR, "data", "gtest_serial_capture.txt")
+CASE_START = b"[ RUN      ]"
+TEAR_DOWN = b"[----------] Global test environment tear-down"
+
+
+class ReplaySerial:
+    """
+    a serial port returning the capture, the bytes waiting are handed out
+    in chunks, reads after the end return nothing like a serial timeout
+    """
+    port = "replay"
+
+    def __init__(self, data, chunk):
+        self.data = data
+        self.chunk = chunk
+        self.position = 0
+
+    @property
+    def in_waiting(self):
+        return min(self.chunk, len(self.data) - self.position)
+
+    def read(self, size=1):
+        data = self.data[self.position:self.position + size]
+        self.position += len(data)
+        return data
+
+    def readline(self):
+        index = self.data.find(b"\n", self.position)
+        end = len(self.data) if index == -1 else index + 1
+        return self.read(end - self.position)
+
+
+def old_check_read_test_end(result=None, input_command=None):
+    index = result.find(input_command) + len(input_command)
+    result_output = result[index:]
+    if input_command.startswith("./"):
+        if result_output.find(dmlib_lite.CPP_TEST_STANDARD_SIGN) != -1:
+            if result_output.count(dmlib_lite.CPP_TEST_STANDARD_SIGN) == 2 \
+                    or result_output.find(dmlib_lite.CPP_TEST_END_SIGN) != -1:
+                return True
+        if dmlib_lite.check_open_source_test(result_output):
+            return True
+        if result_output.find(dmlib_lite._START_JSUNIT_RUN_MARKER) >= 1 and \
+                result_output.find(dmlib_lite._END_JSUNIT_RUN_MARKER) >= 1:
+            return True
+        if result_output.find(dmlib_lite.INSTALL_END_MARKER) != -1:
+            return True
+        if (result_output.find(dmlib_lite.CPP_TEST_MOUNT_SIGN) != -1
+                and result_output.find(dmlib_lite.CPP_TEST_STOP_SIGN) != -1):
+            return True
+    elif input_command.startswith("zcat"):
+        return False
+    else:
+        if "OHOS #" in result_output or "# " in result_output:
+            if input_command == "reboot" or input_command == "reset":
+                return False
+            if input_command.startswith("mount"):
+                if "Mount nfs finished." not in result_output:
+                    return False
+            return True
+    return False
+
+
+def old_read_local_output_test(com, command):
+    result = ""
+    while True:
+        data = com.readline().decode('gbk', errors='ignore')
+        if not data:
+            return result, False
+        data = PATTERN.sub('', data).replace("\r", "")
+        result = "{}{}".format(result, data)
+        if old_check_read_test_end(result, command):
+            return result, True
+
+
+def load_capture(capture_file, repeat):
+    with open(capture_file, "rb") as file_handler:
+        data = file_handler.read()
+    start = data.find(CASE_START)
+    start = data.rfind(b"\n", 0, start) + 1
+    end = data.rfind(b"\n", 0, data.find(TEAR_DOWN)) + 1
+    data = b"".join((data[:start], data[start:end] * repeat, data[end:]))
+    command = PATTERN.sub("", data[:data.find(b"\n")].decode(
+        "gbk", errors="ignore")).strip()
+    command = command[command.find("./"):]
+    return data, command
+
+
+def check_end_lines(data, command):
+    """
+    returns the lines where the old check and ReadEndChecker find the end
+    """
+    lines = PATTERN.sub("", data.decode("gbk", errors="ignore")).replace(
+        "\r", "").splitlines(keepends=True)
+    checker = ReadEndChecker(command)
+    old_end, new_end = None, None
+    result = ""
+    for index, line in enumerate(lines):
+        result = "{}{}".format(result, line)
+        if old_end is None and old_check_read_test_end(result, command):
+            old_end = index
+        if new_end is None and checker.feed(line):
+            new_end = index
+        if old_end is not None and new_end is not None:
+            break
+    return old_end, new_end
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="replay a lite serial capture through the read loops")
+    parser.add_argument("--capture", default=DEFAULT_CAPTURE,
+                        help="the serial capture to replay")
+    parser.add_argument("--repeat", type=int, default=12,
+                        help="times the test cases are repeated, the "
+                             "default is 12")
+    parser.add_argument("--chunk", type=int, default=4096,
+                        help="bytes waiting on the port for every read, the "
+                             "default is 4096")
+    args = parser.parse_args()
+
+    from xdevice import Scheduler
+    Scheduler.is_execute = True
+    data, command = load_capture(args.capture, args.repeat)
+    print("capture: %s lines, %s bytes, command: %s" % (
+        data.count(b"\n") + 1, len(data), command))
+
+    start_time = time.time()
+    old_result, old_status = old_read_local_output_test(
+        ReplaySerial(data, args.chunk), command)
+    old_time = time.time() - start_time
+
+    start_time = time.time()
+    new_result, new_status, _ = LiteHelper.read_local_output_test(
+        ReplaySerial(data, args.chunk), command, timeout=60)
+    new_time = time.time() - start_time
+
+    old_end, new_end = check_end_lines(data, command)
+    print("readline + check_read_test_end: %8.3fs  end found: %s" % (
+        old_time, old_status))
+    print("SerialReader + ReadEndChecker:  %8.3fs  end found: %s" % (
+        new_time, new_status))
+    print("end line: %s before, %s after" % (old_end, new_end))
+    same = old_status == new_status and old_end == new_end and \
+        new_result.startswith(old_result)
+    print("same results: %s" % same)
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
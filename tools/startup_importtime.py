@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+#
+# Copyright (c) 2020-2021 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+measure the startup of xdevice with python -X importtime
+
+usage: python tools/startup_importtime.py [--runs N] [--src DIR]
+
+Without --src the installed xdevice (and xdevice_extension, when it is
+installed through entry points) is measured. To compare two trees, run it
+once with --src pointing at the src directory of each tree.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = [
+    ("import xdevice", "import xdevice"),
+    ("import xdevice + device managers",
+     "import xdevice\n"
+     "xdevice.get_plugin(xdevice.Plugin.MANAGER)"),
+]
+
+
+def _measure(python, statement, env):
+    proc = subprocess.run([python, "-X", "importtime", "-c", statement],
+                          env=env, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, universal_newlines=True)
+    if proc.returncode != 0:
+        raise RuntimeError("'%s' failed:\n%s" % (statement, proc.stderr))
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        # only the top level imports, the nested ones are in their
+        # cumulative time
+        if fields[2].startswith("  "):
+            continue
+        total += int(fields[1])
+    return total / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="measure the startup of xdevice with -X importtime")
+    parser.add_argument("--runs", type=int, default=10,
+                        help="runs of each scenario, the default is 10")
+    parser.add_argument("--src", default="",
+                        help="the src directory of the xdevice to measure")
+    parser.add_argument("--python", default=sys.executable,
+                        help="the python interpreter to run")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.src:
+        paths = [os.path.abspath(args.src)]
+        if env.get("PYTHONPATH"):
+            paths.append(env["PYTHONPATH"])
+        env["PYTHONPATH"] = os.pathsep.join(paths)
+
+    for name, statement in SCENARIOS:
+        # the first run warms the bytecode cache
+        _measure(args.python, statement, env)
+        results = [_measure(args.python, statement, env)
+                   for _ in range(args.runs)]
+        print("%-34s min %6.1fms  median %6.1fms  max %6.1fms" % (
+            name, min(results), statistics.median(results), max(results)))
+
+
+if __name__ == "__main__":
+    main()